@@ -0,0 +1,291 @@
+# HRM/benchmark.py
+"""
+In-process endpoint benchmarks.
+
+Each case issues real requests through the full middleware / DRF stack
+with an authenticated APIClient, against whatever data is in the
+configured database (see `manage.py generate_synthetic_data`). Every
+request runs inside a transaction that is rolled back, so write
+endpoints such as clock-in/out can be repeated without changing data.
+A DatabaseCache would lose its writes to the same rollback, so the
+suite runs against a process-local cache in that case.
+
+Per endpoint the report records p50/p95/mean/max latency over the timed
+iterations, plus the SQL query count, peak Python memory (tracemalloc)
+and response size of one separately instrumented request, so timings
+are not skewed by the instrumentation.
+"""
+import statistics
+import time
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Callable, Optional
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.conf import settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from emp.models import Attendance, EmployeeProfile
+from HRM.cache import invalidate_groups, GROUP_ATTENDANCE, GROUP_LEAVE, GROUP_EMPLOYEES
+
+
+User = get_user_model()
+
+REPORT_VERSION = 1
+
+DATABASE_CACHE = "django.core.cache.backends.db.DatabaseCache"
+
+
+@dataclass
+class Case:
+    name: str
+    role: str
+    path: Callable
+    method: str = "get"
+    setup: Optional[Callable] = None
+    expected_status: tuple = (200,)
+
+
+@dataclass
+class Context:
+    """Actors and sample values resolved once from the dataset."""
+    actors: dict
+    today: object = field(default_factory=timezone.localdate)
+
+    @property
+    def month(self):
+        return self.today.strftime("%Y-%m")
+
+    def actor(self, role):
+        return self.actors[role]
+
+    def emp_id(self, role):
+        return self.actors[role].employeeprofile.emp_id
+
+
+def _reset_today(ctx, user):
+    Attendance.objects.filter(user=user, date=ctx.today).delete()
+
+
+def _open_today(ctx, user):
+    Attendance.objects.update_or_create(
+        user=user,
+        date=ctx.today,
+        defaults={
+            "clock_in": timezone.now() - timedelta(hours=9, minutes=5),
+            "clock_out": None,
+            "status": "working",
+        },
+    )
+
+
+CASES = [
+    Case("clock_in", User.ROLE_EMPLOYEE,
+         lambda ctx: "/api/attendance/clock-in/",
+         method="post", setup=_reset_today, expected_status=(201,)),
+    Case("clock_out", User.ROLE_EMPLOYEE,
+         lambda ctx: "/api/attendance/clock-out/",
+         method="post", setup=_open_today),
+    Case("dashboard_summary", User.ROLE_EMPLOYEE,
+         lambda ctx: "/api/dashboard/summary/"),
+    Case("hr_attendance_list", User.ROLE_HR,
+         lambda ctx: f"/api/attendance/?month={ctx.month}"),
+    Case("hr_timesheet_report", User.ROLE_HR,
+         lambda ctx: f"/api/timesheet/hr/report/?month={ctx.month}"),
+    Case("hr_timesheet_yearly", User.ROLE_HR,
+         lambda ctx: f"/api/timesheet/hr/yearly/?emp_id={ctx.emp_id(User.ROLE_EMPLOYEE)}"
+                     f"&year={ctx.today.year}"),
+    Case("hr_dashboard_stats", User.ROLE_HR,
+         lambda ctx: "/api/hr/dashboard/stats/"),
+    Case("dm_project_list", User.ROLE_DM,
+         lambda ctx: "/api/dm/projects/"),
+    Case("support_queue", User.ROLE_HR,
+         lambda ctx: "/support/tickets/queue/"),
+    Case("admin_dashboard", User.ROLE_MANAGEMENT,
+         lambda ctx: "/api/admin/dashboard/"),
+    Case("admin_attendance_trend", User.ROLE_MANAGEMENT,
+         lambda ctx: f"/api/admin/attendance-trend/?year={ctx.today.year}"),
+    Case("admin_total_present", User.ROLE_MANAGEMENT,
+         lambda ctx: "/api/admin/total-present/"),
+]
+
+
+def percentile(values, pct):
+    """Linear-interpolated percentile of a non-empty list."""
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def resolve_context(prefix=None):
+    """
+    Pick one active user per role needed by CASES (lowest id, optionally
+    restricted to a username prefix) so runs are repeatable.
+    """
+    actors = {}
+    missing = []
+    for role in sorted({case.role for case in CASES}):
+        qs = User.objects.filter(role=role, is_active=True, employeeprofile__isnull=False)
+        if prefix:
+            qs = qs.filter(username__startswith=prefix)
+        user = qs.select_related("employeeprofile").order_by("id").first()
+        if user is None:
+            missing.append(role)
+        actors[role] = user
+
+    if missing:
+        raise ValueError(
+            "No active user with role(s) " + ", ".join(missing) +
+            "; generate a dataset with `manage.py generate_synthetic_data`")
+    return Context(actors=actors)
+
+
+def dataset_summary():
+    return {
+        "users": User.objects.count(),
+        "employees": EmployeeProfile.objects.count(),
+        "attendance": Attendance.objects.count(),
+    }
+
+
+class BenchmarkRunner:
+
+    def __init__(self, iterations=20, warmup=2, cold=False, log=None):
+        self.iterations = iterations
+        self.warmup = warmup
+        self.cold = cold
+        self.log = log or (lambda message: None)
+
+    def _request(self, client, case, ctx):
+        user = ctx.actor(case.role)
+        with transaction.atomic():
+            if case.setup:
+                case.setup(ctx, user)
+            if self.cold:
+                invalidate_groups(GROUP_ATTENDANCE, GROUP_LEAVE, GROUP_EMPLOYEES)
+
+            started = time.perf_counter()
+            response = getattr(client, case.method)(case.path(ctx))
+            elapsed = time.perf_counter() - started
+
+            transaction.set_rollback(True)
+        return response, elapsed
+
+    def _instrumented(self, client, case, ctx):
+        tracemalloc.start()
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                response, _ = self._request(client, case, ctx)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return response, len(queries), peak
+
+    def run_case(self, case, ctx):
+        # Server errors are reported as a status, not raised.
+        client = APIClient(raise_request_exception=False)
+        client.force_authenticate(ctx.actor(case.role))
+
+        for _ in range(self.warmup):
+            self._request(client, case, ctx)
+
+        timings = []
+        statuses = set()
+        for _ in range(self.iterations):
+            response, elapsed = self._request(client, case, ctx)
+            timings.append(elapsed * 1000)
+            statuses.add(response.status_code)
+
+        response, query_count, peak = self._instrumented(client, case, ctx)
+        statuses.add(response.status_code)
+
+        return {
+            "method": case.method.upper(),
+            "path": case.path(ctx),
+            "role": case.role,
+            "status": sorted(statuses),
+            "ok": statuses <= set(case.expected_status),
+            "iterations": self.iterations,
+            "p50_ms": round(percentile(timings, 50), 3),
+            "p95_ms": round(percentile(timings, 95), 3),
+            "mean_ms": round(statistics.fmean(timings), 3),
+            "max_ms": round(max(timings), 3),
+            "queries": query_count,
+            "peak_memory_kb": round(peak / 1024, 1),
+            "response_bytes": len(response.content),
+        }
+
+    def run(self, ctx, only=None):
+        cases = [case for case in CASES if not only or case.name in only]
+        results = {}
+        # APIClient sends Host: testserver, and every case would soon hit
+        # the per-user rate limit (see HRM/throttling.py).
+        unthrottled = {
+            **settings.REST_FRAMEWORK,
+            "DEFAULT_THROTTLE_RATES": {"anon": None, "user": None},
+        }
+        overrides = {}
+        if settings.CACHES["default"]["BACKEND"] == DATABASE_CACHE:
+            overrides["CACHES"] = {"default": {
+                "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                "LOCATION": "hrm-benchmark",
+            }}
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+            REST_FRAMEWORK=unthrottled,
+            **overrides,
+        ):
+            cache_backend = settings.CACHES["default"]["BACKEND"]
+            for case in cases:
+                self.log(f"  {case.name} ...")
+                results[case.name] = self.run_case(case, ctx)
+
+        return {
+            "version": REPORT_VERSION,
+            "generated_at": timezone.now().isoformat(timespec="seconds"),
+            "database": connection.vendor,
+            "cache": cache_backend,
+            "cold_cache": self.cold,
+            "warmup": self.warmup,
+            "dataset": dataset_summary(),
+            "endpoints": results,
+        }
+
+
+COMPARED_METRICS = ("p50_ms", "p95_ms", "queries", "peak_memory_kb")
+
+
+def compare(baseline, current, threshold=20.0):
+    """
+    Diff two reports. Returns (rows, regressions) where each row is
+    (endpoint, metric, before, after, change_pct). A regression is any
+    increase in query count or an increase above `threshold` percent in
+    latency / memory.
+    """
+    rows = []
+    regressions = []
+    for name, after in current["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(name)
+        if not before:
+            continue
+        for metric in COMPARED_METRICS:
+            old, new = before.get(metric), after.get(metric)
+            if old is None or new is None:
+                continue
+            change = ((new - old) / old * 100) if old else (0.0 if new == old else 100.0)
+            row = (name, metric, old, new, round(change, 1))
+            rows.append(row)
+            if metric == "queries":
+                if new > old:
+                    regressions.append(row)
+            elif change > threshold:
+                regressions.append(row)
+    return rows, regressions
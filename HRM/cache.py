@@ -0,0 +1,258 @@
+# HRM/cache.py
+"""
+Shared caching for the HRM API.
+
+TieredCache
+    Django cache backend: a small per-process LRU in front of Redis.
+    Only keys whose value never changes under that key (versioned response
+    payloads, see LOCAL_PREFIXES) are held locally, so invalidation through
+    Redis is seen by every worker immediately.
+
+cache_response
+    Decorator for APIView handlers. Caches successful response data keyed
+    by view, role, user (optional), query params and the version of each
+    invalidation group the view depends on.
+
+invalidate_groups
+    Bumps group versions; called from model signals (emp/signals.py).
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.redis import RedisCache
+from django.utils import timezone
+from rest_framework.response import Response
+
+
+RESPONSE_PREFIX = "resp:"
+GROUP_VERSION_PREFIX = "cachever:"
+
+# Invalidation groups used by cached views
+GROUP_ATTENDANCE = "attendance"
+GROUP_LEAVE = "leave"
+GROUP_EMPLOYEES = "employees"
+
+
+class CacheStats:
+    """Per-process hit/miss counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {}
+
+    def incr(self, name, field):
+        with self._lock:
+            entry = self._counts.setdefault(name, {"hits": 0, "misses": 0})
+            entry[field] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                name: dict(entry, hit_rate=round(
+                    entry["hits"] / (entry["hits"] + entry["misses"]), 3
+                ) if entry["hits"] + entry["misses"] else 0.0)
+                for name, entry in self._counts.items()
+            }
+
+
+stats = CacheStats()
+
+
+class TieredCache(BaseCache):
+    """
+    OPTIONS:
+        LOCAL_MAX_ENTRIES   size of the in-process LRU (default 1000)
+        LOCAL_TIMEOUT       seconds an entry may live locally (default 30)
+        LOCAL_PREFIXES      keys eligible for the local tier
+        REDIS_OPTIONS       passed through to Django's RedisCache
+    """
+
+    def __init__(self, server, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self._remote = RedisCache(server, {
+            "TIMEOUT": params.get("TIMEOUT", 300),
+            "KEY_PREFIX": params.get("KEY_PREFIX", ""),
+            "VERSION": params.get("VERSION", 1),
+            "OPTIONS": options.get("REDIS_OPTIONS", {}),
+        })
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_entries = options.get("LOCAL_MAX_ENTRIES", 1000)
+        self._local_timeout = options.get("LOCAL_TIMEOUT", 30)
+        self._local_prefixes = tuple(
+            options.get("LOCAL_PREFIXES", (RESPONSE_PREFIX,)))
+
+    # ---------------- local tier ----------------
+
+    def _is_local(self, key):
+        return key.startswith(self._local_prefixes)
+
+    def _local_get(self, key, version):
+        full_key = self._remote.make_key(key, version)
+        with self._lock:
+            entry = self._local.get(full_key)
+            if entry is None:
+                return False, None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._local[full_key]
+                return False, None
+            self._local.move_to_end(full_key)
+            return True, value
+
+    def _local_set(self, key, value, version):
+        full_key = self._remote.make_key(key, version)
+        with self._lock:
+            self._local[full_key] = (time.monotonic() + self._local_timeout, value)
+            self._local.move_to_end(full_key)
+            while len(self._local) > self._max_entries:
+                self._local.popitem(last=False)
+
+    def _local_delete(self, key, version):
+        with self._lock:
+            self._local.pop(self._remote.make_key(key, version), None)
+
+    # ---------------- cache API ----------------
+
+    def get(self, key, default=None, version=None):
+        if self._is_local(key):
+            found, value = self._local_get(key, version)
+            if found:
+                stats.incr("tiered_cache", "hits")
+                return value
+
+        sentinel = object()
+        value = self._remote.get(key, sentinel, version=version)
+        if value is sentinel:
+            stats.incr("tiered_cache", "misses")
+            return default
+
+        stats.incr("tiered_cache", "hits")
+        if self._is_local(key):
+            self._local_set(key, value, version)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._remote.set(key, value, timeout=timeout, version=version)
+        if self._is_local(key):
+            self._local_set(key, value, version)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self._remote.add(key, value, timeout=timeout, version=version)
+        if added and self._is_local(key):
+            self._local_set(key, value, version)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self._remote.touch(key, timeout=timeout, version=version)
+
+    def delete(self, key, version=None):
+        self._local_delete(key, version)
+        return self._remote.delete(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        for key in keys:
+            self._local_delete(key, version)
+        self._remote.delete_many(keys, version=version)
+
+    def get_many(self, keys, version=None):
+        found = {}
+        remote_keys = []
+        for key in keys:
+            if self._is_local(key):
+                hit, value = self._local_get(key, version)
+                if hit:
+                    found[key] = value
+                    continue
+            remote_keys.append(key)
+
+        if remote_keys:
+            fetched = self._remote.get_many(remote_keys, version=version)
+            for key, value in fetched.items():
+                if self._is_local(key):
+                    self._local_set(key, value, version)
+            found.update(fetched)
+        return found
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        for key, value in data.items():
+            if self._is_local(key):
+                self._local_set(key, value, version)
+        return self._remote.set_many(data, timeout=timeout, version=version)
+
+    def has_key(self, key, version=None):
+        return self._remote.has_key(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        self._local_delete(key, version)
+        return self._remote.incr(key, delta, version=version)
+
+    def clear(self):
+        with self._lock:
+            self._local.clear()
+        self._remote.clear()
+
+    def close(self, **kwargs):
+        self._remote.close(**kwargs)
+
+
+# ---------------- invalidation groups ----------------
+
+def group_version(group):
+    return cache.get_or_set(f"{GROUP_VERSION_PREFIX}{group}", time.time_ns, None)
+
+
+def invalidate_groups(*groups):
+    now = time.time_ns()
+    cache.set_many({f"{GROUP_VERSION_PREFIX}{group}": now for group in groups}, None)
+
+
+# ---------------- response caching ----------------
+
+def cache_response(name, groups=(), timeout=300, per_user=False):
+    """
+    Cache a DRF handler's 200 responses.
+
+    The key covers the view name, the requesting user's role (and id when
+    per_user=True), the sorted query params, today's date, and the current
+    version of every group in `groups`; bumping a group invalidates all
+    responses that depend on it.
+    """
+    def decorator(handler):
+        @wraps(handler)
+        def wrapper(self, request, *args, **kwargs):
+            user = request.user
+            parts = [
+                name,
+                getattr(user, "role", "") or "",
+                str(user.pk) if per_user else "-",
+                timezone.localdate().isoformat(),
+                repr(sorted(kwargs.items())),
+                repr(sorted(request.query_params.lists())),
+            ]
+            parts += [f"{group}={group_version(group)}" for group in groups]
+            digest = hashlib.md5("|".join(parts).encode()).hexdigest()
+            key = f"{RESPONSE_PREFIX}{name}:{digest}"
+
+            data = cache.get(key)
+            if data is not None:
+                stats.incr(name, "hits")
+                response = Response(data)
+                response["X-Cache"] = "HIT"
+                return response
+
+            stats.incr(name, "misses")
+            response = handler(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response.data, timeout)
+            response["X-Cache"] = "MISS"
+            return response
+
+        return wrapper
+    return decorator
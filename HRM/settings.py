@@ -63,8 +63,8 @@ REST_FRAMEWORK = {
 
 
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        "HRM.throttling.AnonRateThrottle",
+        "HRM.throttling.UserRateThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {
         "anon": "10/min",
@@ -78,6 +78,54 @@ if 'test' in sys.argv:
     REST_FRAMEWORK['DEFAULT_THROTTLE_CLASSES'] = []
     REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'] = {}
 
+# Notification fan-out queue (see emp/notifications.py):
+# "redis" when REDIS_URL is configured, otherwise the database job table.
+# Tests deliver inline so notifications exist as soon as the request returns.
+REDIS_URL = os.environ.get("REDIS_URL")
+
+NOTIFICATION_BACKEND = os.environ.get(
+    "NOTIFICATION_BACKEND", "redis" if REDIS_URL else "db")
+
+if 'test' in sys.argv:
+    NOTIFICATION_BACKEND = "inline"
+
+# Shared cache. Cache versions (response caching, attendance rollups, the
+# typeahead index) must be seen by every worker, so the cache is always
+# shared outside tests: an in-process LRU in front of Redis (HRM/cache.py),
+# or without Redis the database cache table (created by emp migration 0017).
+# Only tests use a per-process locmem cache.
+if 'test' in sys.argv:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "hrm-default",
+        }
+    }
+elif REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "HRM.cache.TieredCache",
+            "LOCATION": REDIS_URL,
+            "TIMEOUT": 300,
+            "KEY_PREFIX": "hrm",
+            "OPTIONS": {
+                "LOCAL_MAX_ENTRIES": 1000,
+                "LOCAL_TIMEOUT": 30,
+                "LOCAL_PREFIXES": ["resp:", "attendance_trend:"],
+            },
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "hrm_cache",
+            "TIMEOUT": 300,
+            "KEY_PREFIX": "hrm",
+            "OPTIONS": {"MAX_ENTRIES": 20000},
+        }
+    }
+
 SPECTACULAR_SETTINGS = {
     'TITLE': 'HRM API',
     'DESCRIPTION': 'HRM REST API',
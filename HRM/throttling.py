@@ -0,0 +1,23 @@
+# HRM/throttling.py
+"""
+DRF's rate throttles copy DEFAULT_THROTTLE_RATES onto the class at import
+time. These read the rate from api_settings on every request instead, so
+a REST_FRAMEWORK override (override_settings, e.g. in HRM/benchmark.py)
+takes effect; a rate of None disables the throttle.
+"""
+from rest_framework import throttling
+from rest_framework.settings import api_settings
+
+
+class _LiveRateMixin:
+
+    def get_rate(self):
+        return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+
+
+class AnonRateThrottle(_LiveRateMixin, throttling.AnonRateThrottle):
+    pass
+
+
+class UserRateThrottle(_LiveRateMixin, throttling.UserRateThrottle):
+    pass
@@ -2,6 +2,7 @@
 from django.contrib import admin
 from . import models
 from .models import SalaryStructure, EmployeeSalary, Payslip
+from .services import LeaveLedgerService
 
 
 @admin.register(models.EmployeeProfile)
@@ -16,6 +17,12 @@ class NotificationAdmin(admin.ModelAdmin):
     list_filter = ('notif_type', 'is_read')
 
 
+@admin.register(models.BroadcastNotification)
+class BroadcastNotificationAdmin(admin.ModelAdmin):
+    list_display = ('title', 'audience', 'notif_type', 'created_at')
+    list_filter = ('audience', 'notif_type')
+
+
 @admin.register(models.Attendance)
 class AttendanceAdmin(admin.ModelAdmin):
     list_display = ('user', 'date', 'clock_in',
@@ -23,6 +30,27 @@ class AttendanceAdmin(admin.ModelAdmin):
     list_filter = ('status', 'date')
 
 
+@admin.register(models.AttendanceMonthlySummary)
+class AttendanceMonthlySummaryAdmin(admin.ModelAdmin):
+    list_display = ('user', 'year', 'month', 'days_present',
+                    'halfdays', 'absent_days', 'late_count', 'updated_at')
+    list_filter = ('year', 'month')
+
+
+@admin.register(models.LeaveDay)
+class LeaveDayAdmin(admin.ModelAdmin):
+    list_display = ('date', 'profile', 'department', 'leave_type', 'status')
+    list_filter = ('status', 'leave_type', 'department')
+    date_hierarchy = 'date'
+    raw_id_fields = ('leave', 'profile')
+
+
+@admin.register(models.EmployeeIDBlock)
+class EmployeeIDBlockAdmin(admin.ModelAdmin):
+    list_display = ('first', 'last', 'purpose', 'created_at')
+    list_filter = ('purpose',)
+
+
 @admin.register(models.Shift)
 class ShiftAdmin(admin.ModelAdmin):
     list_display = ('name', 'start_time', 'end_time')
@@ -36,6 +64,35 @@ class LeaveTypeAdmin(admin.ModelAdmin):
 @admin.register(models.LeaveBalance)
 class LeaveBalanceAdmin(admin.ModelAdmin):
     list_display = ('profile', 'leave_type', 'total_allocated', 'used')
+    # Balances only change through ledger entries.
+    readonly_fields = ('total_allocated', 'used')
+
+
+@admin.register(models.LeaveAccrualRun)
+class LeaveAccrualRunAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'period', 'status', 'employees', 'entries',
+                    'started_at', 'finished_at')
+    list_filter = ('kind', 'status')
+
+
+@admin.register(models.LeaveLedgerEntry)
+class LeaveLedgerEntryAdmin(admin.ModelAdmin):
+    list_display = ('created_at', 'profile', 'leave_type', 'entry_type',
+                    'reason', 'amount', 'leave', 'created_by')
+    list_filter = ('entry_type', 'reason', 'leave_type')
+    raw_id_fields = ('profile', 'leave')
+    exclude = ('created_by', 'accrual_run')
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def save_model(self, request, obj, form, change):
+        LeaveLedgerService.post(
+            obj.profile_id, obj.leave_type, obj.entry_type, obj.amount, obj.reason,
+            leave=obj.leave, created_by=request.user, note=obj.note)
 
 
 @admin.register(models.LeaveRequest)
@@ -9,6 +9,17 @@ LEAVE_TYPE_CHOICES = [
     ("PATERNITY", "Paternity_Leave"),
 ]
 
+# Accrual policy per leave type, applied by emp.services.LeaveAccrualService.
+# yearly: days earned per year, credited in monthly instalments.
+# carry_forward: most unused days kept at year end; the rest lapse
+#   (None = no cap).
+# Types not listed here (unpaid, maternity, paternity) are granted by hand.
+LEAVE_ACCRUAL_POLICY = {
+    "CASUAL": {"yearly": 12, "carry_forward": 0},
+    "SICK": {"yearly": 8, "carry_forward": 0},
+    "PAID": {"yearly": 15, "carry_forward": 30},
+}
+
 # IMPORTANT:
 # First value = DB-safe constant
 # Second value = human readable label
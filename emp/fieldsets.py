@@ -0,0 +1,118 @@
+"""
+Sparse fieldsets for employee profile list endpoints.
+
+    GET /api/employees/?fields=id,emp_id,first_name,last_name
+    GET /api/employees/?exclude=job_description,profile_photo
+
+SparseFieldsetSerializerMixin drops unrequested fields from a serializer
+built with fields= / exclude=. SparseFieldsetViewMixin reads the query
+parameters on GET, passes them to the view's serializer (not to nested
+ones) and narrows the queryset with only() to the columns the remaining
+fields read, so wide EmployeeProfile rows are neither loaded nor sent.
+
+A field's columns are its source's root attribute. Fields whose source is
+not a model field or an annotation (SerializerMethodField, properties)
+name their columns in Meta.field_sources; if any selected field's columns
+are unknown the queryset is left unprojected.
+"""
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+
+FIELDS_PARAM = "fields"
+EXCLUDE_PARAM = "exclude"
+
+
+def parse_fieldset(value):
+    """ "a, b,,c" -> ("a", "b", "c"); None when the parameter was not given."""
+    if value is None:
+        return None
+    return tuple(name.strip() for name in value.split(",") if name.strip())
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Serializer(..., fields=("id", "emp_id")) keeps only those fields;
+    exclude=(...) drops the named ones. Unknown names are a ValidationError.
+    """
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop("fields", None)
+        exclude = kwargs.pop("exclude", None)
+        super().__init__(*args, **kwargs)
+
+        errors = {}
+        for param, names in ((FIELDS_PARAM, fields), (EXCLUDE_PARAM, exclude)):
+            unknown = sorted(set(names or ()) - set(self.fields))
+            if unknown:
+                errors[param] = [f"Unknown field(s): {', '.join(unknown)}."]
+        if errors:
+            raise ValidationError(errors)
+
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        for name in exclude or ():
+            self.fields.pop(name, None)
+
+    def source_columns(self):
+        """
+        Root attributes read by the remaining fields, or None if some field
+        reads something that cannot be named (see Meta.field_sources).
+        """
+        declared = getattr(self.Meta, "field_sources", {})
+        columns = set()
+        for name, field in self.fields.items():
+            if name in declared:
+                columns.update(declared[name])
+            elif field.source == "*" or isinstance(field, serializers.SerializerMethodField):
+                return None
+            else:
+                columns.add(field.source.split(".", 1)[0])
+        return columns
+
+
+class SparseFieldsetViewMixin:
+    """
+    For generic views whose serializer uses SparseFieldsetSerializerMixin:
+    ?fields= / ?exclude= on GET select the serializer fields and the
+    queryset columns. Writes always use the full serializer.
+    """
+
+    def sparse_fieldset(self):
+        request = getattr(self, "request", None)
+        if request is None or request.method != "GET":
+            return {}
+        params = request.query_params
+        fieldset = {
+            key: parse_fieldset(params.get(key))
+            for key in (FIELDS_PARAM, EXCLUDE_PARAM)
+        }
+        return {key: value for key, value in fieldset.items() if value}
+
+    def get_serializer(self, *args, **kwargs):
+        for key, value in self.sparse_fieldset().items():
+            kwargs.setdefault(key, value)
+        return super().get_serializer(*args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        fieldset = self.sparse_fieldset()
+        if not fieldset:
+            return queryset
+
+        serializer = self.get_serializer_class()(
+            context=self.get_serializer_context(), **fieldset)
+        columns = serializer.source_columns()
+        if columns is None:
+            return queryset
+
+        opts = queryset.model._meta
+        concrete = {field.name for field in opts.concrete_fields}
+        columns -= set(queryset.query.annotations)
+        if not columns <= concrete:
+            return queryset
+
+        # select_related relations cannot be deferred
+        if isinstance(queryset.query.select_related, dict):
+            columns.update(queryset.query.select_related)
+        return queryset.only(opts.pk.name, *sorted(columns))
@@ -0,0 +1,624 @@
+# emp/importers.py
+"""
+Batch employee CSV import.
+
+Rows are streamed from the reader and handled in batches:
+
+    1. normalise + validate each row (formats, lengths, in-file duplicates)
+    2. one query for existing users and one for existing profiles that
+       clash with the batch (email / username / emp_id / work_email)
+    3. bulk_create Users, then EmployeeProfiles, in one transaction
+
+bulk_create does not send post_save, so the automatic profile signal in
+emp/signals.py never fires and does not need to be disconnected.
+Team leads given by emp_id are resolved after all batches, so a lead may
+appear later in the file than their reports. The emp_id sequence is
+moved past the highest imported id at the end.
+
+Every rejected row is recorded in ImportResult.errors as
+{"line", "emp_id", "field", "code", "message"} for a machine-readable report.
+"""
+import csv
+import hashlib
+import json
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from django.db.models import Max, Q
+
+from emp.models import EmployeeProfile, emp_id_validator
+from emp import search, typeahead
+from emp.services import LeaveCalendarService
+from emp.utils import EMP_ID_PREFIX, advance_emp_id_sequence
+from HRM.cache import invalidate_groups, GROUP_EMPLOYEES
+
+
+User = get_user_model()
+
+BATCH_SIZE = 1000
+
+DEFAULT_REQUIRED_COLUMNS = ("emp_id", "work_email")
+
+DEFAULT_DATE_FORMATS = ("%Y-%m-%d", "%d-%m-%Y")
+
+# Optional text / file-path columns copied onto EmployeeProfile as-is.
+PROFILE_TEXT_FIELDS = (
+    "middle_name", "personal_email", "phone_number", "alternate_number",
+    "blood_group", "gender", "marital_status", "profile_photo",
+    "aadhaar_number", "aadhaar_front_image", "aadhaar_back_image",
+    "pan", "pan_front_image", "pan_back_image", "passport_number",
+    "id_card_number", "job_title", "department", "designation",
+    "employment_type", "location", "job_description", "id_image",
+    "bank_name", "account_number", "ifsc_code", "branch",
+)
+
+PROFILE_DATE_FIELDS = ("dob", "date_of_joining", "start_date")
+
+ROLES = {value for value, _ in User.ROLE_CHOICES}
+
+HASHED_KEYS = (
+    "emp_id", "email", "username", "first_name", "last_name", "role",
+    "is_active", "team_lead",
+)
+
+TRUE_VALUES = ("true", "1", "yes", "y")
+FALSE_VALUES = ("false", "0", "no", "n")
+
+
+@dataclass
+class ImportResult:
+    dry_run: bool = False
+    processed: int = 0
+    created: int = 0
+    skipped: int = 0
+    failed: int = 0
+    team_leads_linked: int = 0
+    errors: list = field(default_factory=list)
+
+    def as_dict(self):
+        return asdict(self)
+
+
+class RowError(Exception):
+
+    def __init__(self, field, code, message):
+        super().__init__(message)
+        self.field = field
+        self.code = code
+        self.message = message
+
+
+def row_hash(cleaned):
+    """
+    Fingerprint of the synced values of a cleaned row (the password
+    column is not synced).
+    """
+    payload = {key: cleaned[key] for key in HASHED_KEYS}
+    payload["profile"] = cleaned["profile"]
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+def normalize_header(name):
+    return (name or "").replace("\ufeff", "").strip().lower()
+
+
+def _max_length(model, name):
+    return getattr(model._meta.get_field(name), "max_length", None)
+
+
+class EmployeeImporter:
+
+    def __init__(self, batch_size=BATCH_SIZE, dry_run=False,
+                 required_columns=DEFAULT_REQUIRED_COLUMNS,
+                 date_formats=DEFAULT_DATE_FORMATS):
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.required_columns = set(required_columns)
+        self.date_formats = date_formats
+        self.result = ImportResult(dry_run=dry_run)
+
+        self._seen = {"emp_id": set(), "email": set(), "username": set()}
+        # Every emp_id in the file, valid or not.
+        self._present = set()
+        self._pending_leads = []
+        self._unusable_password = None
+
+    # ---------------- row validation ----------------
+
+    def _error(self, line, emp_id, field, code, message):
+        self.result.errors.append({
+            "line": line,
+            "emp_id": emp_id or None,
+            "field": field,
+            "code": code,
+            "message": message,
+        })
+
+    def _parse_date(self, name, raw):
+        if not raw:
+            return None
+        for fmt in self.date_formats:
+            try:
+                return datetime.strptime(raw, fmt).date()
+            except ValueError:
+                continue
+        raise RowError(name, "invalid_date",
+                       f"Invalid {name} '{raw}'; expected one of {', '.join(self.date_formats)}")
+
+    def _parse_bool(self, name, raw, default=True):
+        if not raw:
+            return default
+        value = raw.lower()
+        if value in TRUE_VALUES:
+            return True
+        if value in FALSE_VALUES:
+            return False
+        raise RowError(name, "invalid", f"Invalid {name} '{raw}'")
+
+    def _password(self, raw):
+        if raw:
+            return make_password(raw)
+        # No password: the user must reset it. One unusable hash serves
+        # every such row.
+        if self._unusable_password is None:
+            self._unusable_password = make_password(None)
+        return self._unusable_password
+
+    def clean_row(self, row):
+        """
+        Validate one normalised row; returns a dict of cleaned values or
+        raises RowError.
+        """
+        emp_id = row.get("emp_id", "")
+        try:
+            emp_id_validator(emp_id)
+        except ValidationError:
+            raise RowError("emp_id", "invalid",
+                           f"emp_id '{emp_id}' must look like {EMP_ID_PREFIX}-0000")
+
+        email = row.get("work_email", "").lower()
+        try:
+            validate_email(email)
+        except ValidationError:
+            raise RowError("work_email", "invalid", f"Invalid work_email '{email}'")
+
+        username = row.get("username") or email.split("@")[0]
+        role = (row.get("role") or User.ROLE_EMPLOYEE).lower()
+        if role not in ROLES:
+            raise RowError("role", "invalid", f"Unknown role '{role}'")
+
+        cleaned = {
+            "emp_id": emp_id,
+            "email": email,
+            "username": username,
+            "first_name": row.get("first_name", ""),
+            "last_name": row.get("last_name", ""),
+            "role": role,
+            "password": row.get("password", ""),
+            "is_active": self._parse_bool("is_active", row.get("is_active")),
+            "team_lead": row.get("team_lead_id", ""),
+            "profile": {},
+        }
+
+        for name in PROFILE_TEXT_FIELDS:
+            value = row.get(name, "")
+            limit = _max_length(EmployeeProfile, name)
+            if limit and len(value) > limit:
+                raise RowError(name, "too_long",
+                               f"{name} is longer than {limit} characters")
+            cleaned["profile"][name] = value or None
+
+        for name in PROFILE_DATE_FIELDS:
+            cleaned["profile"][name] = self._parse_date(name, row.get(name, ""))
+
+        for name, model, model_field in (
+            ("username", User, "username"),
+            ("first_name", EmployeeProfile, "first_name"),
+            ("last_name", EmployeeProfile, "last_name"),
+        ):
+            limit = _max_length(model, model_field)
+            if limit and len(cleaned[name]) > limit:
+                raise RowError(name, "too_long",
+                               f"{name} is longer than {limit} characters")
+
+        for key, name in (("emp_id", "emp_id"), ("email", "work_email"),
+                          ("username", "username")):
+            if cleaned[key] in self._seen[key]:
+                raise RowError(name, "duplicate_in_file",
+                               f"{name} '{cleaned[key]}' appears earlier in the file")
+        for key in self._seen:
+            self._seen[key].add(cleaned[key])
+
+        cleaned["hash"] = row_hash(cleaned)
+        return cleaned
+
+    # ---------------- batches ----------------
+
+    def _existing(self, rows):
+        """
+        Two IN queries: clashes with existing users and existing profiles.
+        """
+        emails = [row["email"] for _, row in rows]
+        usernames = [row["username"] for _, row in rows]
+        emp_ids = [row["emp_id"] for _, row in rows]
+
+        users = User.objects.filter(
+            Q(email__in=emails) | Q(username__in=usernames)
+        ).values_list("email", "username")
+        existing_emails = {email.lower() for email, _ in users if email}
+        existing_usernames = {username for _, username in users}
+
+        profiles = EmployeeProfile.objects.filter(
+            Q(emp_id__in=emp_ids) | Q(work_email__in=emails)
+        ).values_list("emp_id", "work_email")
+        existing_emp_ids = {emp_id for emp_id, _ in profiles}
+        existing_emails |= {email.lower() for _, email in profiles}
+
+        return existing_emp_ids, existing_emails, existing_usernames
+
+    def _write(self, rows):
+        users = User.objects.bulk_create([
+            User(
+                username=row["username"],
+                email=row["email"],
+                first_name=row["first_name"],
+                last_name=row["last_name"],
+                role=row["role"],
+                password=self._password(row["password"]),
+                is_active=row["is_active"],
+            )
+            for _, row in rows
+        ])
+
+        profiles = []
+        for user, (_, row) in zip(users, rows):
+            profiles.append(EmployeeProfile(
+                user_id=user.pk,
+                emp_id=row["emp_id"],
+                work_email=row["email"],
+                username=row["username"],
+                first_name=row["first_name"],
+                last_name=row["last_name"],
+                role=row["role"],
+                is_active=row["is_active"],
+                team_lead_id=int(row["team_lead"]) if row["team_lead"].isdigit() else None,
+                source_hash=row["hash"],
+                **row["profile"],
+            ))
+        EmployeeProfile.objects.bulk_create(profiles)
+        search.index_profiles(profiles)
+
+    def _clean_batch(self, batch):
+        """
+        Validate a batch of (line, row) pairs; returns the valid ones.
+        Numeric team_lead_id values are checked with one query.
+        """
+        valid = []
+        for line, row in batch:
+            self.result.processed += 1
+            self._present.add(row.get("emp_id", ""))
+            try:
+                valid.append((line, self.clean_row(row)))
+            except RowError as e:
+                self.result.failed += 1
+                self._error(line, row.get("emp_id"), e.field, e.code, e.message)
+
+        lead_user_ids = {int(row["team_lead"]) for _, row in valid
+                         if row["team_lead"].isdigit()}
+        if lead_user_ids:
+            known = set(User.objects.filter(
+                id__in=lead_user_ids).values_list("id", flat=True))
+            for line, row in valid:
+                if row["team_lead"].isdigit() and int(row["team_lead"]) not in known:
+                    self._error(line, row["emp_id"], "team_lead_id", "not_found",
+                                f"Team lead user {row['team_lead']} not found; "
+                                "imported without a lead")
+                    row["team_lead"] = ""
+        return valid
+
+    def _apply(self, rows, writer):
+        """
+        Run `writer(rows)` in one transaction (skipped in a dry run).
+        Returns False if the batch was rejected by the database.
+        """
+        if self.dry_run or not rows:
+            return True
+        try:
+            with transaction.atomic():
+                writer(rows)
+        except IntegrityError as e:
+            # Lost a race with another writer or hit a unique clash; report
+            # the batch.
+            self.result.failed += len(rows)
+            for line, row in rows:
+                self._error(line, row["emp_id"], None, "integrity", str(e))
+            return False
+        return True
+
+    def _queue_leads(self, rows):
+        self._pending_leads += [
+            (row["emp_id"], row["team_lead"]) for _, row in rows
+            if row["team_lead"] and not row["team_lead"].isdigit()
+        ]
+
+    def _insert(self, rows):
+        existing_emp_ids, existing_emails, existing_usernames = self._existing(rows)
+        fresh = []
+        for line, row in rows:
+            clash = (
+                ("emp_id", row["emp_id"]) if row["emp_id"] in existing_emp_ids
+                else ("work_email", row["email"]) if row["email"] in existing_emails
+                else ("username", row["username"]) if row["username"] in existing_usernames
+                else None
+            )
+            if clash:
+                self.result.skipped += 1
+                self._error(line, row["emp_id"], clash[0], "exists",
+                            f"{clash[0]} '{clash[1]}' already exists")
+            else:
+                fresh.append((line, row))
+
+        if fresh and self._apply(fresh, self._write):
+            self.result.created += len(fresh)
+            self._queue_leads(fresh)
+
+    def process_batch(self, batch):
+        """
+        batch: list of (line_number, normalised row dict).
+        """
+        valid = self._clean_batch(batch)
+        if valid:
+            self._insert(valid)
+
+    # ---------------- finishing ----------------
+
+    def _link_team_leads(self):
+        """Resolve team_lead_id columns given as a lead's emp_id."""
+        if not self._pending_leads:
+            return
+
+        lead_ids = {lead for _, lead in self._pending_leads}
+        users_by_emp_id = dict(
+            EmployeeProfile.objects.filter(
+                emp_id__in=lead_ids).values_list("emp_id", "user_id"))
+
+        # In a dry run, leads defined in the file itself do not exist yet.
+        known = set(users_by_emp_id) | (self._seen["emp_id"] if self.dry_run else set())
+        for emp_id, lead in self._pending_leads:
+            if lead not in known:
+                self._error(None, emp_id, "team_lead_id", "not_found",
+                            f"Team lead '{lead}' not found; imported without a lead")
+
+        if self.dry_run:
+            return
+
+        profiles = list(EmployeeProfile.objects.filter(
+            emp_id__in=[emp_id for emp_id, lead in self._pending_leads
+                        if lead in users_by_emp_id]).only("id", "emp_id"))
+        leads = dict(self._pending_leads)
+        for profile in profiles:
+            profile.team_lead_id = users_by_emp_id[leads[profile.emp_id]]
+        EmployeeProfile.objects.bulk_update(
+            profiles, ["team_lead"], batch_size=self.batch_size)
+        self.result.team_leads_linked = len(profiles)
+
+    def _advance_sequence(self):
+        """Keep generate_emp_id() from handing out an imported emp_id."""
+        highest = EmployeeProfile.objects.filter(
+            emp_id__startswith=f"{EMP_ID_PREFIX}-"
+        ).aggregate(value=Max("emp_id"))["value"]
+        if highest:
+            advance_emp_id_sequence(int(highest.rsplit("-", 1)[1]), purpose="import")
+
+    def run(self, reader):
+        """
+        reader: csv.DictReader (or any iterator of dicts with a
+        `fieldnames` attribute). Header names are normalised.
+        """
+        headers = [normalize_header(name) for name in reader.fieldnames or []]
+        missing = self.required_columns - set(headers)
+        if missing:
+            raise ValueError(f"CSV missing columns: {', '.join(sorted(missing))}")
+        reader.fieldnames = headers
+
+        # Header is line 1; blank rows keep their line numbers.
+        rows = (
+            (line, {key: (value or "").strip() for key, value in row.items() if key})
+            for line, row in enumerate(reader, start=2)
+            if any((value or "").strip() for value in row.values() if isinstance(value, str))
+        )
+
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                break
+            self.process_batch(batch)
+
+        self._finish()
+        return self.result
+
+    def _finish(self):
+        self._link_team_leads()
+        if not self.dry_run and self.result.created:
+            self._advance_sequence()
+            # bulk writes send no signals
+            invalidate_groups(GROUP_EMPLOYEES)
+            typeahead.invalidate()
+
+
+@dataclass
+class SyncResult(ImportResult):
+    updated: int = 0
+    unchanged: int = 0
+    deactivated: int = 0
+
+
+# Cleaned-row keys mirrored onto the User row on update.
+USER_SYNC_FIELDS = {
+    "email": "email",
+    "first_name": "first_name",
+    "last_name": "last_name",
+    "role": "role",
+    "is_active": "is_active",
+}
+
+
+class EmployeeSync(EmployeeImporter):
+    """
+    Delta sync keyed by emp_id.
+
+    Each profile stores the hash of the source row it was last written
+    from (EmployeeProfile.source_hash). Per batch, one query fetches the
+    stored hashes; rows with a matching hash are skipped without loading
+    the profile, new emp_ids are inserted, and only changed rows are
+    loaded and written back with bulk_update. Previously synced, active
+    profiles whose emp_id is absent from the file are deactivated, unless
+    that would exceed `max_deactivate` (a fraction of synced profiles),
+    which usually means a truncated file.
+    """
+
+    def __init__(self, deactivate_missing=True, max_deactivate=0.1, **options):
+        super().__init__(**options)
+        self.result = SyncResult(dry_run=self.dry_run)
+        self.deactivate_missing = deactivate_missing
+        self.max_deactivate = max_deactivate
+
+    @staticmethod
+    def _profile_values(row):
+        values = {
+            "work_email": row["email"],
+            "username": row["username"],
+            "first_name": row["first_name"],
+            "last_name": row["last_name"],
+            "role": row["role"],
+            "is_active": row["is_active"],
+            **row["profile"],
+        }
+        lead = row["team_lead"]
+        if lead.isdigit():
+            values["team_lead_id"] = int(lead)
+        elif not lead:
+            values["team_lead_id"] = None
+        # emp_id leads are linked after the last batch
+        return values
+
+    def _update(self, rows):
+        profiles = {
+            profile.emp_id: profile
+            for profile in EmployeeProfile.objects.filter(
+                emp_id__in=[row["emp_id"] for _, row in rows]
+            ).select_related("user")
+        }
+
+        profile_fields = {"source_hash"}
+        user_fields = set()
+        changed_profiles = []
+        changed_users = []
+        for _, row in rows:
+            profile = profiles[row["emp_id"]]
+            for name, value in self._profile_values(row).items():
+                if getattr(profile, name) != value:
+                    setattr(profile, name, value)
+                    profile_fields.add(name)
+            profile.source_hash = row["hash"]
+            changed_profiles.append(profile)
+
+            user = profile.user
+            user_changed = False
+            for key, name in USER_SYNC_FIELDS.items():
+                if getattr(user, name) != row[key]:
+                    setattr(user, name, row[key])
+                    user_fields.add(name)
+                    user_changed = True
+            if user_changed:
+                changed_users.append(user)
+
+        EmployeeProfile.objects.bulk_update(
+            changed_profiles, sorted(profile_fields), batch_size=self.batch_size)
+        if "department" in profile_fields:
+            LeaveCalendarService.refresh_departments(
+                [profile.id for profile in changed_profiles])
+        search.index_profiles(changed_profiles)
+        if changed_users:
+            User.objects.bulk_update(
+                changed_users, sorted(user_fields), batch_size=self.batch_size)
+
+    def process_batch(self, batch):
+        valid = self._clean_batch(batch)
+        if not valid:
+            return
+
+        stored = dict(EmployeeProfile.objects.filter(
+            emp_id__in=[row["emp_id"] for _, row in valid]
+        ).values_list("emp_id", "source_hash"))
+
+        new, changed = [], []
+        for line, row in valid:
+            if row["emp_id"] not in stored:
+                new.append((line, row))
+            elif stored[row["emp_id"]] != row["hash"]:
+                changed.append((line, row))
+            else:
+                self.result.unchanged += 1
+
+        if new:
+            self._insert(new)
+        if changed and self._apply(changed, self._update):
+            self.result.updated += len(changed)
+            self._queue_leads(changed)
+
+    def _deactivate_missing(self):
+        synced = dict(EmployeeProfile.objects.filter(
+            is_active=True).exclude(source_hash="").values_list("emp_id", "id"))
+        missing = [pk for emp_id, pk in synced.items() if emp_id not in self._present]
+        if not missing:
+            return
+
+        if len(missing) > self.max_deactivate * len(synced):
+            self._error(None, None, None, "deactivation_limit",
+                        f"{len(missing)} of {len(synced)} synced employees are missing "
+                        "from the file; nothing was deactivated")
+            return
+
+        if not self.dry_run:
+            for offset in range(0, len(missing), self.batch_size):
+                chunk = missing[offset:offset + self.batch_size]
+                with transaction.atomic():
+                    # Clearing the hash makes the next sync rewrite the row,
+                    # reactivating the employee if they reappear unchanged.
+                    EmployeeProfile.objects.filter(id__in=chunk).update(
+                        is_active=False, source_hash="")
+                    User.objects.filter(employeeprofile__id__in=chunk).update(is_active=False)
+        self.result.deactivated = len(missing)
+
+    def _finish(self):
+        if self.deactivate_missing:
+            self._deactivate_missing()
+        super()._finish()
+        if not self.dry_run and (self.result.updated or self.result.deactivated):
+            invalidate_groups(GROUP_EMPLOYEES)
+            typeahead.invalidate()
+
+
+def sync_csv(path, encoding="utf-8-sig", **options):
+    """
+    Stream `path` through EmployeeSync. Returns a SyncResult.
+    """
+    with open(path, newline="", encoding=encoding) as fh:
+        return EmployeeSync(**options).run(csv.DictReader(fh))
+
+
+def import_csv(path, encoding="utf-8-sig", **options):
+    """
+    Stream `path` through EmployeeImporter. Returns an ImportResult.
+    """
+    with open(path, newline="", encoding=encoding) as fh:
+        return EmployeeImporter(**options).run(csv.DictReader(fh))
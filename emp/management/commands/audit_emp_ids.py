@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+
+from emp.models import EmployeeIDBlock, EmployeeProfile
+from emp.utils import EMP_ID_PREFIX, contiguous_runs, format_emp_id
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare allocated emp_id blocks with the emp_ids actually in use: "
+        "list reserved-but-unused numbers and numbers used outside any block"
+    )
+
+    def handle(self, *args, **options):
+        used = {
+            int(emp_id.rsplit("-", 1)[1])
+            for emp_id in EmployeeProfile.objects.filter(
+                emp_id__startswith=f"{EMP_ID_PREFIX}-"
+            ).values_list("emp_id", flat=True)
+            if emp_id.rsplit("-", 1)[1].isdigit()
+        }
+
+        allocated = set()
+        unused_by_purpose = {}
+        for block in EmployeeIDBlock.objects.all():
+            numbers = set(range(block.first, block.last + 1))
+            allocated |= numbers
+            unused = numbers - used
+            if unused:
+                unused_by_purpose.setdefault(block.purpose or "-", set()).update(unused)
+
+        for purpose, numbers in sorted(unused_by_purpose.items()):
+            ranges = ", ".join(
+                format_emp_id(first) if first == last
+                else f"{format_emp_id(first)}..{format_emp_id(last)}"
+                for first, last in contiguous_runs(sorted(numbers))
+            )
+            self.stdout.write(f"Unused ({purpose}, {len(numbers)}): {ranges}")
+
+        unallocated = sorted(used - allocated)
+        if unallocated:
+            self.stdout.write(self.style.WARNING(
+                f"In use but never allocated ({len(unallocated)}): " +
+                ", ".join(format_emp_id(n) for n in unallocated[:50])))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(used)} emp_ids in use, {len(allocated)} allocated, "
+            f"{sum(map(len, unused_by_purpose.values()))} unused, "
+            f"{len(unallocated)} unallocated"))
@@ -0,0 +1,85 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from HRM.benchmark import CASES, BenchmarkRunner, compare, resolve_context
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark key API endpoints in-process and write p50/p95 latency, "
+        "query counts and peak memory to a JSON report"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument("--output", default="benchmark.json",
+                            help="Report path ('-' for stdout)")
+        parser.add_argument("--compare", metavar="BASELINE",
+                            help="Previous report to diff against")
+        parser.add_argument("--threshold", type=float, default=20.0,
+                            help="Allowed latency/memory increase in percent")
+        parser.add_argument("--only", nargs="+", metavar="ENDPOINT",
+                            choices=[case.name for case in CASES])
+        parser.add_argument("--prefix",
+                            help="Only use actors whose username starts with this")
+        parser.add_argument("--cold", action="store_true",
+                            help="Invalidate response caches before every request")
+
+    def handle(self, *args, **options):
+        if options["iterations"] < 1:
+            raise CommandError("--iterations must be at least 1")
+
+        try:
+            ctx = resolve_context(prefix=options["prefix"])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        runner = BenchmarkRunner(
+            iterations=options["iterations"],
+            warmup=options["warmup"],
+            cold=options["cold"],
+            log=self.stdout.write,
+        )
+        report = runner.run(ctx, only=options["only"])
+
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options["output"] == "-":
+            self.stdout.write(output)
+        else:
+            with open(options["output"], "w") as fh:
+                fh.write(output + "\n")
+
+        self.stdout.write(
+            f"\n{'endpoint':<24}{'p50 ms':>10}{'p95 ms':>10}{'queries':>9}{'peak KB':>10}  status")
+        for name, row in report["endpoints"].items():
+            self.stdout.write(
+                f"{name:<24}{row['p50_ms']:>10.2f}{row['p95_ms']:>10.2f}"
+                f"{row['queries']:>9}{row['peak_memory_kb']:>10.1f}  "
+                f"{','.join(map(str, row['status']))}")
+
+        failed = [name for name, row in report["endpoints"].items() if not row["ok"]]
+        if failed:
+            self.stdout.write(self.style.WARNING(
+                "Unexpected status for: " + ", ".join(failed)))
+
+        if options["compare"]:
+            try:
+                with open(options["compare"]) as fh:
+                    baseline = json.load(fh)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Cannot read baseline: {e}")
+
+            rows, regressions = compare(baseline, report, options["threshold"])
+            self.stdout.write(f"\nCompared with {options['compare']}:")
+            for name, metric, old, new, change in rows:
+                self.stdout.write(f"  {name:<24}{metric:<16}{old:>10} -> {new:<10} ({change:+.1f}%)")
+
+            if regressions:
+                raise CommandError(
+                    f"{len(regressions)} regression(s): " + ", ".join(
+                        f"{name}.{metric}" for name, metric, *_ in regressions))
+
+        if options["output"] != "-":
+            self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
@@ -0,0 +1,67 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from django.test.utils import override_settings
+
+from emp.models import EmployeeProfile
+from emp.serializers import EmployeeProfileReadSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Time EmployeeProfileReadSerializer over N profiles: one serializer per "
+        "row, each with its own context, against one many=True serializer that "
+        "shares its document URL templates across rows, checking that both "
+        "produce identical output"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000)
+        parser.add_argument("--iterations", type=int, default=5)
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        iterations = max(1, options["iterations"])
+        queryset = EmployeeProfile.objects.select_related(
+            "user", "team_lead").order_by("id")[:rows]
+        found = queryset.count()
+        if not found:
+            raise CommandError("No employee profiles; run generate_synthetic_data first.")
+        if found < rows:
+            self.stdout.write(self.style.WARNING(f"Only {found} profiles available."))
+
+        # build_absolute_uri validates the Host header
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]):
+            request = RequestFactory().get("/api/employees/")
+            cases = {
+                "per_row": lambda: [
+                    EmployeeProfileReadSerializer(profile, context={"request": request}).data
+                    for profile in queryset.all()
+                ],
+                "list": lambda: EmployeeProfileReadSerializer(
+                    queryset.all(), many=True, context={"request": request}).data,
+            }
+
+            outputs, timings = {}, {}
+            for name, case in cases.items():
+                outputs[name] = [dict(row) for row in case()]   # warm-up
+                timings[name] = []
+                for _ in range(iterations):
+                    started = time.perf_counter()
+                    case()
+                    timings[name].append((time.perf_counter() - started) * 1000)
+
+        for name, output in outputs.items():
+            if output != outputs["per_row"]:
+                raise CommandError(f"{name} output differs from per_row.")
+
+        baseline = statistics.median(timings["per_row"])
+        for name, times in timings.items():
+            median = statistics.median(times)
+            self.stdout.write(
+                f"{name:<14} {median:9.1f} ms median over {iterations}  "
+                f"x{baseline / median:.1f}")
+        self.stdout.write(self.style.SUCCESS(f"Identical output for {found} profiles."))
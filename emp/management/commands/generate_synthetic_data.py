@@ -0,0 +1,50 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from emp.synthetic import SyntheticDataGenerator
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-generate a deterministic synthetic organisation (employees, "
+        "attendance, timesheets, leaves, notifications, projects, tickets) "
+        "for load testing"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--employees", type=int, default=1000)
+        parser.add_argument("--years", type=int, default=1,
+                            help="Years of attendance history to generate")
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument("--until", type=date.fromisoformat,
+                            help="Last day of generated history (YYYY-MM-DD, default yesterday)")
+        parser.add_argument("--team-size", type=int, default=8)
+        parser.add_argument("--notifications", type=int, default=20,
+                            help="Notifications per employee")
+        parser.add_argument("--prefix", default="synth",
+                            help="Username prefix for generated users")
+        parser.add_argument("--password", default="Password@123")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            generator = SyntheticDataGenerator(
+                options["employees"],
+                years=options["years"],
+                seed=options["seed"],
+                until=options["until"],
+                team_size=options["team_size"],
+                notifications=options["notifications"],
+                prefix=options["prefix"],
+                password=options["password"],
+                batch_size=options["batch_size"],
+                log=self.stdout.write,
+            )
+            counts = generator.run()
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        for label, count in sorted(counts.items()):
+            self.stdout.write(f"  {label}: {count}")
+        self.stdout.write(self.style.SUCCESS("Synthetic data generated"))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from emp.services import AttendanceRollupService
+
+
+class Command(BaseCommand):
+    help = "Rebuild the monthly attendance rollup from raw attendance rows"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--year", type=int)
+        parser.add_argument("--month", type=int)
+
+    def handle(self, *args, **options):
+        year, month = options["year"], options["month"]
+
+        if month and not year:
+            raise CommandError("--month requires --year")
+        if month and not 1 <= month <= 12:
+            raise CommandError("Invalid month")
+
+        written = AttendanceRollupService.rebuild(year=year, month=month)
+
+        scope = (
+            f"{month:02d}/{year}" if month
+            else str(year) if year
+            else "all months"
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt attendance rollup for {scope}: {written} summaries"))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from emp.services import LeaveCalendarService
+from HRM.cache import invalidate_groups, GROUP_LEAVE
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-day leave calendar (LeaveDay) from leave requests"
+
+    def handle(self, *args, **options):
+        written = LeaveCalendarService.rebuild()
+        invalidate_groups(GROUP_LEAVE)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt leave calendar: {written} leave days"))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from emp import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the employee directory search documents"
+
+    def handle(self, *args, **options):
+        indexed = search.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {indexed} employees ({search.backend()} backend)"))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from emp.services import LeaveLedgerService
+
+
+class Command(BaseCommand):
+    help = (
+        "Check every leave balance against the leave ledger and optionally "
+        "reset drifted balances to the ledger totals"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fix", action="store_true",
+                            help="Overwrite mismatched balances with the ledger totals")
+
+    def handle(self, *args, **options):
+        mismatches = LeaveLedgerService.reconcile(fix=options["fix"])
+
+        for row in mismatches[:50]:
+            balance = row["balance"]
+            current = (f"{balance['total_allocated']}/{balance['used']}"
+                       if balance else "missing")
+            self.stdout.write(self.style.WARNING(
+                f"profile {row['profile_id']} {row['leave_type']}: balance {current}, "
+                f"ledger {row['ledger']['total_allocated']}/{row['ledger']['used']}"))
+        if len(mismatches) > 50:
+            self.stdout.write(self.style.WARNING(f"... {len(mismatches) - 50} more"))
+
+        verb = "Fixed" if options["fix"] else "Found"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {len(mismatches)} mismatched balance(s)"))
@@ -0,0 +1,55 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from emp.models import LeaveRequest
+from emp.services import LeaveRoutingService
+
+
+class Command(BaseCommand):
+    help = (
+        "Reassign pending leave requests whose team lead is on leave for "
+        "the same dates"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--from", dest="start",
+                            help="First day to check (YYYY-MM-DD, default today)")
+        parser.add_argument("--days", type=int, default=30,
+                            help="Number of days to check from --from")
+        parser.add_argument("--tl", type=int,
+                            help="Only reroute leaves waiting on this TL user id")
+
+    def handle(self, *args, **options):
+        start = timezone.localdate()
+        if options["start"]:
+            start = parse_date(options["start"])
+            if start is None:
+                raise CommandError("--from must be YYYY-MM-DD")
+        if options["days"] < 1:
+            raise CommandError("--days must be at least 1")
+        end = start + timedelta(days=options["days"] - 1)
+
+        absences = LeaveRequest.objects.exclude(
+            status__in=LeaveRoutingService.INACTIVE_LEAVE_STATUSES
+        ).filter(
+            profile__user__role=get_user_model().ROLE_TL,
+            start_date__lte=end,
+            end_date__gte=start,
+        )
+        if options["tl"]:
+            absences = absences.filter(profile__user_id=options["tl"])
+
+        rerouted = to_hr = 0
+        for tl_id, leave_start, leave_end in absences.order_by(
+                "start_date").values_list("profile__user_id", "start_date", "end_date"):
+            moved, escalated = LeaveRoutingService.reroute_pending(
+                tl_id, max(leave_start, start), min(leave_end, end))
+            rerouted += moved
+            to_hr += escalated
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{rerouted} leave request(s) reassigned, {to_hr} sent to HR"))
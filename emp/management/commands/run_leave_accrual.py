@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from emp.services import LeaveAccrualService
+
+
+class Command(BaseCommand):
+    help = (
+        "Credit a month's leave accrual to every active employee, or close a "
+        "year (--year-end) by lapsing unused days above the carry-forward cap. "
+        "Re-running a finished period does nothing. A year can only be closed "
+        "once it is over and before January of the next one is accrued"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--year", type=int)
+        parser.add_argument("--month", type=int)
+        parser.add_argument("--year-end", action="store_true",
+                            help="Run year-end carry forward for --year (default: last year)")
+        parser.add_argument("--batch-size", type=int, default=LeaveAccrualService.BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+
+        if options["year_end"]:
+            if options["month"]:
+                raise CommandError("--month cannot be combined with --year-end")
+            year = options["year"] or today.year - 1
+            try:
+                run = LeaveAccrualService.run_year_end(year, batch_size=options["batch_size"])
+            except ValueError as e:
+                raise CommandError(str(e))
+            label = f"year-end {year}"
+        else:
+            year = options["year"] or today.year
+            month = options["month"] or (today.month if not options["year"] else None)
+            if not month:
+                raise CommandError("--year requires --month")
+            if not 1 <= month <= 12:
+                raise CommandError("Invalid month")
+            try:
+                run = LeaveAccrualService.run_monthly(year, month, batch_size=options["batch_size"])
+            except ValueError as e:
+                raise CommandError(str(e))
+            label = f"accrual {year}-{month:02d}"
+
+        if run is None:
+            self.stdout.write(self.style.WARNING(f"{label.capitalize()} already done"))
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{label.capitalize()}: {run.employees} employees, {run.entries} ledger entries"))
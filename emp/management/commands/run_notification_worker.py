@@ -0,0 +1,51 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from emp import notifications
+
+
+class Command(BaseCommand):
+    help = "Deliver queued notification fan-outs in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Drain the queue and exit instead of polling forever")
+        parser.add_argument(
+            "--batch-size", type=int, default=notifications.BATCH_SIZE)
+        parser.add_argument(
+            "--idle-sleep", type=float, default=2.0,
+            help="Seconds to wait when the queue is empty")
+        parser.add_argument(
+            "--requeue-failed", action="store_true",
+            help="Put jobs that ran out of attempts back on the queue first")
+
+    def handle(self, *args, **options):
+        backend = notifications.get_backend()
+        batch_size = options["batch_size"]
+        timeout = 0 if options["once"] else int(options["idle_sleep"]) or 1
+
+        self.stdout.write(
+            f"Notification worker started ({backend.__class__.__name__})")
+
+        if options["requeue_failed"]:
+            self.stdout.write(f"Requeued {backend.requeue_failed()} failed jobs")
+
+        processed = 0
+        beat_at = 0.0
+        while True:
+            if time.monotonic() - beat_at > notifications.WORKER_HEARTBEAT_TTL / 3:
+                notifications.heartbeat()
+                beat_at = time.monotonic()
+
+            if backend.process_next(timeout=timeout, batch_size=batch_size):
+                processed += 1
+                continue
+
+            if options["once"]:
+                break
+            time.sleep(options["idle_sleep"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {processed} notification jobs"))
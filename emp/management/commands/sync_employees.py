@@ -0,0 +1,62 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from emp.importers import BATCH_SIZE, sync_csv
+
+
+class Command(BaseCommand):
+    help = (
+        "Delta-sync employee master data from a CSV keyed by emp_id: insert "
+        "new rows, update changed ones, deactivate synced employees missing "
+        "from the file"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--encoding", default="utf-8-sig")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Report what would change without writing")
+        parser.add_argument("--report",
+                            help="Write a JSON report of the run and every rejected row")
+        parser.add_argument("--no-deactivate", action="store_true",
+                            help="Leave employees missing from the file active")
+        parser.add_argument("--max-deactivate", type=float, default=0.1,
+                            help="Refuse to deactivate more than this fraction of synced employees")
+
+    def handle(self, *args, **options):
+        if not os.path.exists(options["path"]):
+            raise CommandError(f"{options['path']} not found")
+        if not 0 <= options["max_deactivate"] <= 1:
+            raise CommandError("--max-deactivate must be between 0 and 1")
+
+        try:
+            result = sync_csv(
+                options["path"],
+                encoding=options["encoding"],
+                batch_size=options["batch_size"],
+                dry_run=options["dry_run"],
+                deactivate_missing=not options["no_deactivate"],
+                max_deactivate=options["max_deactivate"],
+            )
+        except (ValueError, UnicodeDecodeError) as e:
+            raise CommandError(str(e))
+
+        if options["report"]:
+            with open(options["report"], "w") as fh:
+                json.dump(result.as_dict(), fh, indent=2)
+
+        for error in result.errors[:20]:
+            self.stdout.write(self.style.WARNING(
+                f"line {error['line']}: {error['message']}"))
+        if len(result.errors) > 20:
+            self.stdout.write(self.style.WARNING(
+                f"... {len(result.errors) - 20} more (see --report)"))
+
+        prefix = "[dry run] " if result.dry_run else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}{result.processed} rows: {result.created} inserted, "
+            f"{result.updated} updated, {result.unchanged} unchanged, "
+            f"{result.deactivated} deactivated, {result.failed} invalid"))
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:54
+
+from django.db import migrations, models
+
+
+SEQUENCE = "emp_employee_id_seq"
+
+
+def create_allocator(apps, schema_editor):
+    """
+    Record everything allocated so far as one legacy block and, on
+    PostgreSQL, start the native sequence after it.
+    """
+    EmployeeIDSequence = apps.get_model("emp", "EmployeeIDSequence")
+    EmployeeIDBlock = apps.get_model("emp", "EmployeeIDBlock")
+
+    seq = EmployeeIDSequence.objects.filter(id=1).first()
+    last_value = seq.last_value if seq else 0
+    if last_value:
+        EmployeeIDBlock.objects.create(first=1, last=last_value, purpose="legacy")
+
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            f"CREATE SEQUENCE IF NOT EXISTS {SEQUENCE} START WITH {last_value + 1}")
+
+
+def drop_allocator(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(f"DROP SEQUENCE IF EXISTS {SEQUENCE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emp', '0011_employeeprofile_source_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeIDBlock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first', models.PositiveIntegerField()),
+                ('last', models.PositiveIntegerField()),
+                ('purpose', models.CharField(blank=True, max_length=50)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['first'],
+            },
+        ),
+        migrations.RunPython(create_allocator, drop_allocator),
+    ]
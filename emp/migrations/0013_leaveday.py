@@ -0,0 +1,57 @@
+# Generated by Django 5.2.7 on 2026-10-18 06:59
+
+import django.db.models.deletion
+from datetime import timedelta
+
+from django.db import migrations, models
+
+
+def populate_leave_days(apps, schema_editor):
+    LeaveRequest = apps.get_model("emp", "LeaveRequest")
+    LeaveDay = apps.get_model("emp", "LeaveDay")
+
+    batch = []
+    leaves = LeaveRequest.objects.exclude(
+        status__in=("tl_rejected", "hr_rejected", "cancelled")
+    ).values_list("id", "profile_id", "profile__department",
+                  "start_date", "end_date", "leave_type", "status")
+    for leave_id, profile_id, department, start, end, leave_type, status in leaves.iterator():
+        day = start
+        while day <= end:
+            batch.append(LeaveDay(
+                leave_id=leave_id, profile_id=profile_id, date=day,
+                department=department, leave_type=leave_type, status=status))
+            day += timedelta(days=1)
+        if len(batch) >= 1000:
+            LeaveDay.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        LeaveDay.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emp', '0012_employee_id_allocator'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaveDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('department', models.CharField(blank=True, max_length=100, null=True)),
+                ('leave_type', models.CharField(choices=[('CASUAL', 'Casual_Leave'), ('SICK', 'Sick_Leave'), ('PAID', 'Paid_Leave'), ('UNPAID', 'Unpaid_Leave'), ('MATERNITY', 'Maternity_Leave'), ('PATERNITY', 'Paternity_Leave')], max_length=20)),
+                ('status', models.CharField(choices=[('applied', 'Applied'), ('tl_approved', 'TL Approved'), ('tl_rejected', 'TL Rejected'), ('hr_approved', 'HR Approved'), ('hr_rejected', 'HR Rejected'), ('pending_hr', 'Pending HR'), ('cancelled', 'Cancelled'), ('completed', 'Completed')], max_length=20)),
+                ('leave', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leave_days', to='emp.leaverequest')),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leave_days', to='emp.employeeprofile')),
+            ],
+            options={
+                'ordering': ['date'],
+                'indexes': [models.Index(fields=['date', 'department'], name='emp_leaveda_date_bf465e_idx'), models.Index(fields=['profile', 'date'], name='emp_leaveda_profile_fad1e8_idx')],
+                'unique_together': {('leave', 'date')},
+            },
+        ),
+        migrations.RunPython(populate_leave_days, migrations.RunPython.noop),
+    ]
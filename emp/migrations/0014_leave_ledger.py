@@ -0,0 +1,76 @@
+# Generated by Django 5.2.7 on 2026-10-18 07:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def open_ledger(apps, schema_editor):
+    """
+    Fold duplicate (profile, leave_type) balances into one row, then record
+    every balance as opening ledger entries so the ledger and the cached
+    balances agree from the start.
+    """
+    LeaveBalance = apps.get_model("emp", "LeaveBalance")
+    LeaveLedgerEntry = apps.get_model("emp", "LeaveLedgerEntry")
+
+    kept = {}
+    for balance in LeaveBalance.objects.order_by("id"):
+        key = (balance.profile_id, balance.leave_type)
+        if key not in kept:
+            kept[key] = balance
+            continue
+        first = kept[key]
+        first.total_allocated += balance.total_allocated
+        first.used += balance.used
+        first.save(update_fields=["total_allocated", "used"])
+        balance.delete()
+
+    entries = []
+    for balance in kept.values():
+        for entry_type, amount in (("credit", balance.total_allocated),
+                                   ("debit", balance.used)):
+            if amount:
+                entries.append(LeaveLedgerEntry(
+                    profile_id=balance.profile_id,
+                    leave_type=balance.leave_type,
+                    entry_type=entry_type,
+                    reason="opening",
+                    amount=amount,
+                ))
+    LeaveLedgerEntry.objects.bulk_create(entries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emp', '0013_leaveday'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaveLedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('leave_type', models.CharField(choices=[('CASUAL', 'Casual_Leave'), ('SICK', 'Sick_Leave'), ('PAID', 'Paid_Leave'), ('UNPAID', 'Unpaid_Leave'), ('MATERNITY', 'Maternity_Leave'), ('PATERNITY', 'Paternity_Leave')], max_length=20)),
+                ('entry_type', models.CharField(choices=[('credit', 'Credit'), ('debit', 'Debit')], max_length=10)),
+                ('reason', models.CharField(choices=[('opening', 'Opening balance'), ('allocation', 'Allocation'), ('accrual', 'Accrual'), ('leave', 'Leave taken'), ('reversal', 'Reversal'), ('adjustment', 'Adjustment')], max_length=20)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=6)),
+                ('note', models.CharField(blank=True, default='', max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('leave', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ledger_entries', to='emp.leaverequest')),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leave_ledger', to='emp.employeeprofile')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['profile', 'leave_type', 'created_at'], name='emp_leavele_profile_d24c1a_idx')],
+            },
+        ),
+        migrations.RunPython(open_ledger, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='leavebalance',
+            unique_together={('profile', 'leave_type')},
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-18 07:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emp', '0014_leave_ledger'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='leaveledgerentry',
+            name='reason',
+            field=models.CharField(choices=[('opening', 'Opening balance'), ('allocation', 'Allocation'), ('accrual', 'Accrual'), ('leave', 'Leave taken'), ('reversal', 'Reversal'), ('adjustment', 'Adjustment'), ('lapse', 'Lapse')], max_length=20),
+        ),
+        migrations.CreateModel(
+            name='LeaveAccrualRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('monthly', 'Monthly accrual'), ('year_end', 'Year-end carry forward')], max_length=20)),
+                ('period', models.DateField()),
+                ('status', models.CharField(choices=[('running', 'Running'), ('done', 'Done')], default='running', max_length=20)),
+                ('employees', models.PositiveIntegerField(default=0)),
+                ('entries', models.PositiveIntegerField(default=0)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['-period'],
+                'unique_together': {('kind', 'period')},
+            },
+        ),
+        migrations.AddField(
+            model_name='leaveledgerentry',
+            name='accrual_run',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='ledger_entries', to='emp.leaveaccrualrun'),
+        ),
+    ]
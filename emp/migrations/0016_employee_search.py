@@ -0,0 +1,105 @@
+# Generated by Django 5.2.7 on 2026-10-18 07:06
+
+import django.db.models.deletion
+import re
+
+from django.db import DatabaseError, migrations, models, transaction
+
+
+TABLE = "emp_employeesearchdocument"
+FTS_TABLE = "emp_employeesearch_fts"
+
+POSTGRES_SQL = [
+    f"""ALTER TABLE {TABLE} ADD COLUMN vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', name), 'A') ||
+        setweight(to_tsvector('simple', document), 'B')
+    ) STORED""",
+    f"CREATE INDEX emp_search_vector_gin ON {TABLE} USING GIN (vector)",
+]
+
+SQLITE_SQL = [
+    f"""CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        name, document, content='{TABLE}', content_rowid='profile_id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON {TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, document)
+        VALUES (new.profile_id, new.name, new.document);
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON {TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, document)
+        VALUES ('delete', old.profile_id, old.name, old.document);
+    END""",
+    f"""CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE ON {TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, document)
+        VALUES ('delete', old.profile_id, old.name, old.document);
+        INSERT INTO {FTS_TABLE}(rowid, name, document)
+        VALUES (new.profile_id, new.name, new.document);
+    END""",
+]
+
+
+def create_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        for sql in POSTGRES_SQL:
+            schema_editor.execute(sql)
+    elif vendor == "sqlite":
+        # SQLite builds without FTS5 fall back to icontains (emp.search)
+        try:
+            with transaction.atomic(using=schema_editor.connection.alias):
+                for sql in SQLITE_SQL:
+                    schema_editor.execute(sql)
+        except DatabaseError:
+            pass
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "sqlite":
+        for suffix in ("ai", "ad", "au"):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+def populate(apps, schema_editor):
+    EmployeeProfile = apps.get_model("emp", "EmployeeProfile")
+    EmployeeSearchDocument = apps.get_model("emp", "EmployeeSearchDocument")
+
+    def normalize(*values):
+        return " ".join(
+            word for value in values if value
+            for word in re.findall(r"\w+", str(value).lower())
+        )
+
+    batch = []
+    for profile in EmployeeProfile.objects.iterator():
+        batch.append(EmployeeSearchDocument(
+            profile_id=profile.pk,
+            name=normalize(profile.first_name, profile.last_name, profile.emp_id),
+            document=normalize(profile.work_email, profile.department, profile.designation,
+                               profile.job_title, profile.location),
+        ))
+        if len(batch) >= 1000:
+            EmployeeSearchDocument.objects.bulk_create(batch)
+            batch = []
+    EmployeeSearchDocument.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('emp', '0015_leave_accrual'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeeSearchDocument',
+            fields=[
+                ('profile', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='emp.employeeprofile')),
+                ('name', models.TextField(blank=True, default='')),
+                ('document', models.TextField(blank=True, default='')),
+            ],
+        ),
+        migrations.RunPython(create_index, drop_index),
+        migrations.RunPython(populate, migrations.RunPython.noop),
+    ]
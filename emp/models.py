@@ -153,6 +153,10 @@ class EmployeeProfile(models.Model):
     role = models.CharField(max_length=30)
     is_active = models.BooleanField(default=True)
 
+    # sha256 of the source CSV row this profile was last imported/synced
+    # from (emp.importers); empty for profiles created in the app.
+    source_hash = models.CharField(max_length=64, blank=True, default="")
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -167,17 +171,7 @@ class EmployeeProfile(models.Model):
         Returns True if this employee has any leave overlapping start..end.
         We exclude rejected and cancelled leaves.
         """
-        from django.apps import apps
-        LeaveRequest = apps.get_model('emp', 'LeaveRequest')
-
-        return LeaveRequest.objects.filter(
-            profile=self,
-        ).exclude(
-            status__in=['tl_rejected', 'hr_rejected', 'cancelled']
-        ).filter(
-            start_date__lte=end,
-            end_date__gte=start
-        ).exists()
+        return self.leave_days.filter(date__range=(start, end)).exists()
 
     class Meta:
         ordering = ['-created_at']
@@ -205,11 +199,94 @@ class Notification(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # unread feed / unread count
+            models.Index(fields=['to_user', 'is_read', '-created_at'],
+                         name='emp_notif_user_read_idx'),
+            # full feed, newest first
+            models.Index(fields=['to_user', '-created_at'],
+                         name='emp_notif_user_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} → {self.to_user}"
 
 
+class BroadcastNotification(models.Model):
+    """
+    A notification shown to a whole audience from a single row, instead of
+    one Notification per user. Users only see broadcasts created after they
+    joined. Read state is stored sparsely in BroadcastReceipt.
+    """
+    AUDIENCE_CHOICES = [
+        ('all', 'All users'),
+        ('employees', 'Employees'),
+    ]
+    title = models.CharField(max_length=250)
+    body = models.TextField()
+    notif_type = models.CharField(
+        max_length=50, choices=Notification.NOTIF_TYPES, default='announcement')
+    audience = models.CharField(
+        max_length=20, choices=AUDIENCE_CHOICES, default='employees')
+    extra = models.JSONField(null=True, blank=True)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, blank=True,
+        on_delete=models.SET_NULL, related_name='broadcasts_sent')
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.title} → {self.audience}"
+
+
+class BroadcastReceipt(models.Model):
+    """Marks a broadcast as read by one user; absence means unread."""
+    broadcast = models.ForeignKey(
+        BroadcastNotification, on_delete=models.CASCADE, related_name='receipts')
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='broadcast_receipts')
+    read_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('broadcast', 'user')
+
+    def __str__(self):
+        return f"{self.user} read {self.broadcast_id}"
+
+
+class NotificationJob(models.Model):
+    """
+    A queued notification fan-out, used by the database dispatch backend
+    (see emp.notifications). The worker resolves the audience in `payload`
+    and bulk-inserts Notification rows.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    payload = models.JSONField()
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default='pending', db_index=True)
+    attempts = models.PositiveIntegerField(default=0)
+    delivered = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    # set when a worker takes the job; a processing job whose claim is
+    # older than notifications.PROCESSING_TIMEOUT is taken again
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        return f"NotificationJob #{self.pk} ({self.status})"
+
+
 class Shift(models.Model):
     name = models.CharField(max_length=120)
     start_time = models.TimeField()
@@ -284,6 +361,36 @@ class Attendance(models.Model):
         return end_time - self.clock_in
 
 
+class AttendanceMonthlySummary(models.Model):
+    """
+    Per-user monthly rollup of Attendance rows.
+    Maintained by AttendanceRollupService; dashboards read from here
+    instead of scanning raw attendance.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='attendance_summaries')
+    year = models.PositiveIntegerField()
+    month = models.PositiveIntegerField()
+
+    days_present = models.PositiveIntegerField(default=0)
+    halfdays = models.PositiveIntegerField(default=0)
+    absent_days = models.PositiveIntegerField(default=0)
+    total_seconds = models.BigIntegerField(default=0)
+    overtime_seconds = models.BigIntegerField(default=0)
+    late_count = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('user', 'year', 'month')
+        indexes = [
+            models.Index(fields=['year', 'month']),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.month}/{self.year}"
+
+
 class CalendarEvent(models.Model):
     EVENT_TYPES = [
         ('meeting', 'Meeting'),
@@ -426,6 +533,9 @@ class LeaveBalance(models.Model):
         max_digits=6, decimal_places=2, default=0.0)
     used = models.DecimalField(max_digits=6, decimal_places=2, default=0.0)
 
+    class Meta:
+        unique_together = ('profile', 'leave_type')
+
     def available(self):
         return self.total_allocated - self.used
 
@@ -433,6 +543,90 @@ class LeaveBalance(models.Model):
         return f"{self.profile.emp_id} - {self.leave_type} : {self.available()}"
 
 
+class LeaveAccrualRun(models.Model):
+    """
+    One row per accrual period processed by LeaveAccrualService.
+    A finished run is never repeated; an interrupted one resumes, skipping
+    employees whose entries it already wrote.
+    """
+    KIND_CHOICES = [
+        ('monthly', 'Monthly accrual'),
+        ('year_end', 'Year-end carry forward'),
+    ]
+    STATUS_CHOICES = [
+        ('running', 'Running'),
+        ('done', 'Done'),
+    ]
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    period = models.DateField()
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default='running')
+    employees = models.PositiveIntegerField(default=0)
+    entries = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ('kind', 'period')
+        ordering = ['-period']
+
+    def __str__(self):
+        return f"{self.kind} {self.period} ({self.status})"
+
+
+class LeaveLedgerEntry(models.Model):
+    """
+    Append-only record of every change to a LeaveBalance.
+    Credits move total_allocated, debits move used; amounts are signed so
+    corrections and reversals are new entries, never edits.
+    Written through LeaveLedgerService, which applies each entry to the
+    balance row with an F() update.
+    """
+    ENTRY_TYPES = [
+        ('credit', 'Credit'),
+        ('debit', 'Debit'),
+    ]
+    REASONS = [
+        ('opening', 'Opening balance'),
+        ('allocation', 'Allocation'),
+        ('accrual', 'Accrual'),
+        ('leave', 'Leave taken'),
+        ('reversal', 'Reversal'),
+        ('adjustment', 'Adjustment'),
+        ('lapse', 'Lapse'),
+    ]
+    profile = models.ForeignKey(
+        EmployeeProfile, on_delete=models.CASCADE, related_name='leave_ledger')
+    leave_type = models.CharField(max_length=20, choices=LEAVE_TYPE_CHOICES)
+    entry_type = models.CharField(max_length=10, choices=ENTRY_TYPES)
+    reason = models.CharField(max_length=20, choices=REASONS)
+    amount = models.DecimalField(max_digits=6, decimal_places=2)
+    leave = models.ForeignKey(
+        'LeaveRequest', null=True, blank=True, on_delete=models.SET_NULL,
+        related_name='ledger_entries')
+    note = models.CharField(max_length=255, blank=True, default='')
+    accrual_run = models.ForeignKey(
+        LeaveAccrualRun, null=True, blank=True, on_delete=models.PROTECT,
+        related_name='ledger_entries')
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['profile', 'leave_type', 'created_at']),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.pk:
+            raise ValidationError("Ledger entries cannot be modified.")
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.profile_id} {self.leave_type} {self.entry_type} {self.amount}"
+
+
 class LeaveRequest(models.Model):
     STATUS_CHOICES = [
         ('applied', 'Applied'),
@@ -550,6 +744,34 @@ class LeaveRequest(models.Model):
         )
 
 
+class LeaveDay(models.Model):
+    """
+    One row per employee per calendar day covered by a live leave request
+    (anything not rejected or cancelled).
+    Maintained by LeaveCalendarService; "who is out" lookups read from
+    here instead of range-scanning LeaveRequest.
+    """
+    leave = models.ForeignKey(
+        LeaveRequest, on_delete=models.CASCADE, related_name='leave_days')
+    profile = models.ForeignKey(
+        EmployeeProfile, on_delete=models.CASCADE, related_name='leave_days')
+    date = models.DateField()
+    department = models.CharField(max_length=100, blank=True, null=True)
+    leave_type = models.CharField(max_length=20, choices=LEAVE_TYPE_CHOICES)
+    status = models.CharField(max_length=20, choices=LeaveRequest.STATUS_CHOICES)
+
+    class Meta:
+        unique_together = ('leave', 'date')
+        ordering = ['date']
+        indexes = [
+            models.Index(fields=['date', 'department']),
+            models.Index(fields=['profile', 'date']),
+        ]
+
+    def __str__(self):
+        return f"{self.profile} - {self.date} ({self.leave_type})"
+
+
 class Policy(models.Model):
     POLICY_TYPES = [
         ('policy', 'Company Policy'),
@@ -682,3 +904,42 @@ class EmployeeIDSequence(models.Model):
 
     def __str__(self):
         return f"EmployeeIDSequence(last_value={self.last_value})"
+
+
+class EmployeeSearchDocument(models.Model):
+    """
+    Normalised searchable text of an employee, maintained by emp.search.
+    The full-text index over it is created per database in migration 0016;
+    on SQLite, altering this model rebuilds the table and drops the FTS
+    triggers, so such a migration must recreate them.
+    """
+    profile = models.OneToOneField(
+        EmployeeProfile, on_delete=models.CASCADE, primary_key=True,
+        related_name='search_document')
+    name = models.TextField(blank=True, default='')
+    document = models.TextField(blank=True, default='')
+
+    def __str__(self):
+        return self.name
+
+
+class EmployeeIDBlock(models.Model):
+    """
+    Audit trail of emp_id numbers handed out by emp.utils.reserve_emp_ids.
+    Every allocated number lies in exactly one block, so any number not
+    used by a profile can be traced to the allocation that skipped it.
+    """
+    first = models.PositiveIntegerField()
+    last = models.PositiveIntegerField()
+    purpose = models.CharField(max_length=50, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['first']
+
+    @property
+    def count(self):
+        return self.last - self.first + 1
+
+    def __str__(self):
+        return f"{self.first}-{self.last} ({self.purpose})"
@@ -0,0 +1,551 @@
+# emp/notifications.py
+"""
+Asynchronous notification fan-out.
+
+Views describe who should be notified (an audience) and call dispatch().
+The job is queued once the surrounding transaction commits. The
+run_notification_worker command then resolves the recipients and
+bulk-inserts Notification rows in batches, off the request path.
+
+Announcements that go to everyone are stored once as a
+BroadcastNotification (see broadcast()) rather than fanned out; feed()
+merges personal and broadcast items for a user in a single UNION query.
+
+Backends (settings.NOTIFICATION_BACKEND):
+    redis   - Redis list at settings.REDIS_URL; falls back to the DB
+              queue if Redis is unreachable when enqueueing
+    db      - NotificationJob table
+    inline  - deliver immediately in-process (tests)
+
+Failed deliveries are retried up to MAX_ATTEMPTS, then parked (failed
+jobs / REDIS_FAILED_KEY) until `run_notification_worker --requeue-failed`.
+A DB job left "processing" by a crashed worker is taken again after
+PROCESSING_TIMEOUT. The worker writes a heartbeat to the cache; while no
+worker is alive, dispatch() queues in the NotificationJob table, which
+every worker drains first once one starts.
+"""
+import base64
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import CharField, Exists, F, OuterRef, Q, Value
+from django.utils import timezone
+
+from .models import (
+    BroadcastNotification,
+    BroadcastReceipt,
+    EmployeeProfile,
+    Notification,
+    NotificationJob,
+)
+
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+MAX_ATTEMPTS = 3
+REDIS_QUEUE_KEY = "hrm:notifications:queue"
+REDIS_FAILED_KEY = "hrm:notifications:failed"
+
+PROCESSING_TIMEOUT = 10 * 60
+WORKER_HEARTBEAT_KEY = "notifications:worker_heartbeat"
+WORKER_HEARTBEAT_TTL = 60
+
+
+# ---------------- Audiences ----------------
+
+def everyone():
+    return {"kind": "all"}
+
+
+def employees():
+    """Users that have an employee profile."""
+    return {"kind": "employees"}
+
+
+def roles(*role_names, active_only=False):
+    return {"kind": "roles", "roles": list(role_names), "active_only": active_only}
+
+
+def users(*user_ids):
+    return {"kind": "users", "ids": list(user_ids)}
+
+
+def team(tl_user_id):
+    """Active employees reporting to a Team Lead."""
+    return {"kind": "team", "tl": tl_user_id}
+
+
+def resolve_recipients(audience):
+    User = get_user_model()
+    kind = audience["kind"]
+
+    if kind == "all":
+        qs = User.objects.all()
+    elif kind == "employees":
+        qs = User.objects.filter(employeeprofile__isnull=False)
+    elif kind == "roles":
+        qs = User.objects.filter(role__in=audience["roles"])
+        if audience.get("active_only"):
+            qs = qs.filter(is_active=True)
+    elif kind == "users":
+        qs = User.objects.filter(id__in=audience["ids"])
+    elif kind == "team":
+        qs = User.objects.filter(
+            employeeprofile__team_lead_id=audience["tl"],
+            employeeprofile__is_active=True
+        )
+    else:
+        raise ValueError(f"Unknown notification audience: {kind}")
+
+    return qs.order_by("id").values_list("id", flat=True)
+
+
+# ---------------- Delivery ----------------
+
+@transaction.atomic
+def deliver(payload, batch_size=BATCH_SIZE):
+    """
+    Create one Notification per recipient, batch_size rows per INSERT.
+    Returns the number of notifications created.
+    """
+    fields = {
+        "title": payload["title"],
+        "body": payload["body"],
+        "notif_type": payload["notif_type"],
+        "extra": payload.get("extra"),
+    }
+
+    delivered = 0
+    batch = []
+    for user_id in resolve_recipients(payload["audience"]).iterator(chunk_size=batch_size):
+        batch.append(Notification(to_user_id=user_id, **fields))
+        if len(batch) >= batch_size:
+            _insert(batch)
+            delivered += len(batch)
+            batch = []
+
+    if batch:
+        _insert(batch)
+        delivered += len(batch)
+
+    return delivered
+
+
+def send(notifications, batch_size=BATCH_SIZE):
+    """
+    Insert prebuilt per-recipient Notification objects (each with its own
+    title/body) in bulk.
+    """
+    for offset in range(0, len(notifications), batch_size):
+        _insert(notifications[offset:offset + batch_size])
+
+
+def _insert(batch):
+    # bulk_create skips post_save, so unread counters are cleared here
+    Notification.objects.bulk_create(batch)
+    user_ids = [n.to_user_id for n in batch]
+    transaction.on_commit(lambda: invalidate_unread(*user_ids))
+
+
+# ---------------- Backends ----------------
+
+class InlineBackend:
+
+    def enqueue(self, payload):
+        deliver(payload)
+
+    def process_next(self, timeout=0, batch_size=BATCH_SIZE):
+        return False
+
+    def requeue_failed(self):
+        return 0
+
+
+class DatabaseBackend:
+
+    def enqueue(self, payload):
+        NotificationJob.objects.create(payload=payload)
+
+    def process_next(self, timeout=0, batch_size=BATCH_SIZE):
+        now = timezone.now()
+        # deliver() is atomic, so a job abandoned mid-delivery left no rows
+        abandoned = Q(status="processing") & (
+            Q(claimed_at__lt=now - timedelta(seconds=PROCESSING_TIMEOUT)) |
+            Q(claimed_at__isnull=True)
+        )
+        with transaction.atomic():
+            job = NotificationJob.objects.select_for_update(
+                skip_locked=True
+            ).filter(Q(status="pending") | abandoned).order_by("id").first()
+            if not job:
+                return False
+            if job.status == "processing" and job.attempts >= MAX_ATTEMPTS:
+                job.status = "failed"
+                job.error = "Worker stopped while processing the job."
+                job.processed_at = now
+                job.save(update_fields=["status", "error", "processed_at"])
+                return True
+            job.status = "processing"
+            job.attempts += 1
+            job.claimed_at = now
+            job.save(update_fields=["status", "attempts", "claimed_at"])
+
+        try:
+            job.delivered = deliver(job.payload, batch_size=batch_size)
+        except Exception as e:
+            logger.exception("Notification job #%s failed", job.id)
+            job.status = "failed" if job.attempts >= MAX_ATTEMPTS else "pending"
+            job.error = str(e)
+        else:
+            job.status = "done"
+            job.error = ""
+        job.processed_at = timezone.now()
+        job.save(update_fields=["status", "delivered", "error", "processed_at"])
+        return True
+
+    def requeue_failed(self):
+        return NotificationJob.objects.filter(status="failed").update(
+            status="pending", attempts=0, error="", claimed_at=None)
+
+
+class RedisBackend:
+
+    def __init__(self):
+        import redis
+
+        self.redis = redis
+        self.client = redis.Redis.from_url(settings.REDIS_URL)
+
+    def enqueue(self, payload):
+        try:
+            self.client.rpush(REDIS_QUEUE_KEY, json.dumps(payload))
+        except self.redis.RedisError:
+            logger.exception("Redis unavailable, queueing notification in DB")
+            DatabaseBackend().enqueue(payload)
+
+    def process_next(self, timeout=0, batch_size=BATCH_SIZE):
+        # Jobs that fell back to the DB queue are drained first.
+        if DatabaseBackend().process_next(batch_size=batch_size):
+            return True
+
+        if timeout:
+            item = self.client.blpop([REDIS_QUEUE_KEY], timeout=timeout)
+            raw = item[1] if item else None
+        else:
+            raw = self.client.lpop(REDIS_QUEUE_KEY)
+        if raw is None:
+            return False
+
+        try:
+            payload = json.loads(raw)
+        except ValueError:
+            logger.exception("Unreadable notification job, moved to %s",
+                             REDIS_FAILED_KEY)
+            self.client.rpush(REDIS_FAILED_KEY, raw)
+            return True
+
+        try:
+            deliver(payload, batch_size=batch_size)
+        except Exception:
+            payload["attempts"] = payload.get("attempts", 0) + 1
+            retry = payload["attempts"] < MAX_ATTEMPTS
+            logger.exception("Notification delivery failed (attempt %s), %s",
+                             payload["attempts"],
+                             "requeued" if retry else f"moved to {REDIS_FAILED_KEY}")
+            self.client.rpush(REDIS_QUEUE_KEY if retry else REDIS_FAILED_KEY,
+                              json.dumps(payload))
+        return True
+
+    def requeue_failed(self):
+        """Move parked jobs back onto the queue with a fresh attempt count."""
+        moved = DatabaseBackend().requeue_failed()
+        for _ in range(self.client.llen(REDIS_FAILED_KEY)):
+            raw = self.client.lpop(REDIS_FAILED_KEY)
+            if raw is None:
+                break
+            try:
+                payload = json.loads(raw)
+                payload.pop("attempts", None)
+                raw = json.dumps(payload)
+            except ValueError:
+                pass
+            self.client.rpush(REDIS_QUEUE_KEY, raw)
+            moved += 1
+        return moved
+
+
+BACKENDS = {
+    "inline": InlineBackend,
+    "db": DatabaseBackend,
+    "redis": RedisBackend,
+}
+
+_backend = None
+
+
+def get_backend():
+    global _backend
+    name = getattr(settings, "NOTIFICATION_BACKEND", "db")
+    if name not in BACKENDS:
+        raise ImproperlyConfigured(
+            f"NOTIFICATION_BACKEND must be one of {', '.join(BACKENDS)}, got {name!r}")
+    if _backend is None or not isinstance(_backend, BACKENDS[name]):
+        _backend = BACKENDS[name]()
+    return _backend
+
+
+def heartbeat():
+    """Called by run_notification_worker while it is polling."""
+    cache.set(WORKER_HEARTBEAT_KEY, time.time(), WORKER_HEARTBEAT_TTL)
+
+
+def worker_alive():
+    return cache.get(WORKER_HEARTBEAT_KEY) is not None
+
+
+def _enqueue(backend, payload):
+    if not isinstance(backend, InlineBackend) and not worker_alive():
+        logger.warning("No notification worker running, notification queued "
+                       "in the database until one starts")
+        backend = DatabaseBackend()
+    backend.enqueue(payload)
+
+
+def dispatch(audience, title, body, notif_type="announcement", extra=None):
+    """
+    Queue a notification for every user in `audience`.
+    Enqueued on commit, so the worker never sees objects that were rolled back.
+    Queued in the database when no worker has sent a heartbeat recently.
+    """
+    payload = {
+        "audience": audience,
+        "title": title,
+        "body": body,
+        "notif_type": notif_type,
+        "extra": extra,
+    }
+    backend = get_backend()
+    transaction.on_commit(lambda: _enqueue(backend, payload))
+
+
+# ---------------- Broadcasts ----------------
+
+FEED_FIELDS = ("id", "title", "body", "notif_type",
+               "is_read", "created_at", "extra", "source")
+
+
+def broadcast(title, body, notif_type="announcement", extra=None,
+              audience="employees", created_by=None):
+    """
+    Notify a whole audience ("all" users or "employees") with one row.
+    """
+    item = BroadcastNotification.objects.create(
+        title=title,
+        body=body,
+        notif_type=notif_type,
+        extra=extra,
+        audience=audience,
+        created_by=created_by,
+    )
+    transaction.on_commit(bump_broadcast_version)
+    return item
+
+
+def visible_broadcasts(user):
+    audiences = ["all"]
+    if EmployeeProfile.objects.filter(user=user).exists():
+        audiences.append("employees")
+
+    return BroadcastNotification.objects.filter(
+        audience__in=audiences,
+        created_at__gte=user.date_joined,
+    )
+
+
+def _older_than(cursor, source):
+    """
+    Keyset filter for one branch of the feed, which is ordered by
+    (-created_at, source, -id). Returns items strictly after `cursor`.
+    """
+    created_at, cursor_source, cursor_id = cursor
+    if source > cursor_source:
+        return Q(created_at__lte=created_at)
+    if source < cursor_source:
+        return Q(created_at__lt=created_at)
+    return Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=cursor_id)
+
+
+def _feed_branches(user, unread_only=False, cursor=None, since=None):
+    """
+    The personal and broadcast halves of the feed as unordered values_list
+    querysets with FEED_FIELDS columns.
+
+    cursor: (created_at, source, id) of the last item already seen;
+            only older items are returned.
+    since:  only items created after this datetime (polling).
+    """
+    personal = Notification.objects.filter(to_user=user)
+    broadcasts = visible_broadcasts(user)
+    if unread_only:
+        personal = personal.filter(is_read=False)
+    if cursor:
+        personal = personal.filter(_older_than(cursor, "personal"))
+        broadcasts = broadcasts.filter(_older_than(cursor, "broadcast"))
+    if since:
+        personal = personal.filter(created_at__gt=since)
+        broadcasts = broadcasts.filter(created_at__gt=since)
+
+    personal = personal.annotate(
+        src=Value("personal", output_field=CharField()),
+        read=F("is_read"),
+    ).values_list("id", "title", "body", "notif_type",
+                  "read", "created_at", "extra", "src").order_by()
+
+    broadcasts = broadcasts.annotate(
+        src=Value("broadcast", output_field=CharField()),
+        read=Exists(BroadcastReceipt.objects.filter(
+            broadcast=OuterRef("pk"), user=user)),
+    )
+    if unread_only:
+        broadcasts = broadcasts.filter(read=False)
+    broadcasts = broadcasts.values_list(
+        "id", "title", "body", "notif_type",
+        "read", "created_at", "extra", "src").order_by()
+
+    return personal, broadcasts
+
+
+def feed(user, unread_only=False, cursor=None, since=None):
+    """
+    Personal notifications and visible broadcasts for `user`, newest first,
+    as one UNION query yielding rows with FEED_FIELDS. `source` is
+    "personal" or "broadcast"; ids are only unique within a source.
+    Reads the user's whole history; use feed_head() for the first N items.
+    """
+    personal, broadcasts = _feed_branches(user, unread_only, cursor, since)
+    return personal.union(broadcasts, all=True).order_by("-created_at", "src", "-id")
+
+
+def _feed_order(row):
+    # (-created_at, source, -id), the order of feed()
+    return (-row[5].timestamp(), row[7], -row[0])
+
+
+def feed_head(user, limit, unread_only=False, cursor=None, since=None):
+    """
+    The first `limit` rows of feed(). Each half is ordered and cut to
+    `limit` in its own query and the two are merged here, so the cost
+    follows the page size rather than the user's history.
+    """
+    personal, broadcasts = _feed_branches(user, unread_only, cursor, since)
+    rows = list(personal.order_by("-created_at", "-id")[:limit])
+    rows += broadcasts.order_by("-created_at", "-id")[:limit]
+    rows.sort(key=_feed_order)
+    return rows[:limit]
+
+
+def feed_items(rows):
+    return [dict(zip(FEED_FIELDS, row)) for row in rows]
+
+
+def mark_read(user, ids=None, broadcast_ids=None):
+    """
+    Mark notifications read. With no ids, marks everything visible to the
+    user (personal rows in one UPDATE, broadcasts via bulk receipts).
+    """
+    mark_all = ids is None and broadcast_ids is None
+
+    personal = Notification.objects.filter(to_user=user, is_read=False)
+    if not mark_all:
+        personal = personal.filter(id__in=ids or [])
+    updated = personal.update(is_read=True)
+
+    unread = visible_broadcasts(user).exclude(receipts__user=user)
+    if not mark_all:
+        unread = unread.filter(id__in=broadcast_ids or [])
+    receipts = [
+        BroadcastReceipt(broadcast_id=broadcast_id, user=user)
+        for broadcast_id in unread.values_list("id", flat=True)
+    ]
+    BroadcastReceipt.objects.bulk_create(receipts, ignore_conflicts=True)
+
+    transaction.on_commit(lambda: invalidate_unread(user.id))
+    return updated + len(receipts)
+
+
+# ---------------- Cursor feed & unread counter ----------------
+
+FEED_PAGE_SIZE = 20
+FEED_MAX_PAGE_SIZE = 100
+UNREAD_CACHE_TIMEOUT = 5 * 60
+BROADCAST_VERSION_KEY = "notif:broadcast_version"
+
+
+def encode_cursor(item):
+    raw = f"{item['created_at'].isoformat()}|{item['source']}|{item['id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(value):
+    """Raises ValueError for malformed cursors."""
+    try:
+        created_at, source, item_id = base64.urlsafe_b64decode(
+            value.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), source, int(item_id)
+    except (TypeError, UnicodeDecodeError, base64.binascii.Error) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def feed_page(user, cursor=None, limit=FEED_PAGE_SIZE, unread_only=False, since=None):
+    """
+    One page of the feed after `cursor` (an encoded cursor string),
+    optionally limited to items newer than `since`.
+    Returns (items, next_cursor); next_cursor is None on the last page.
+    """
+    decoded = decode_cursor(cursor) if cursor else None
+    rows = feed_head(user, limit + 1, unread_only=unread_only, cursor=decoded, since=since)
+    items = feed_items(rows[:limit])
+    next_cursor = encode_cursor(items[-1]) if len(rows) > limit else None
+    return items, next_cursor
+
+
+def _broadcast_version():
+    return cache.get_or_set(BROADCAST_VERSION_KEY, time.time_ns, None)
+
+
+def bump_broadcast_version():
+    cache.set(BROADCAST_VERSION_KEY, time.time_ns(), None)
+
+
+def _unread_key(user_id):
+    return f"notif:unread:{user_id}"
+
+
+def invalidate_unread(*user_ids):
+    cache.delete_many([_unread_key(user_id) for user_id in user_ids])
+
+
+def unread_count(user):
+    """
+    Unread personal + broadcast notifications, cached per user. The cached
+    value records the broadcast version it was computed at, so a new
+    broadcast invalidates every user's counter without touching each key.
+    """
+    version = _broadcast_version()
+    cached = cache.get(_unread_key(user.id))
+    if cached and cached[0] == version:
+        return cached[1]
+
+    count = Notification.objects.filter(to_user=user, is_read=False).count()
+    count += visible_broadcasts(user).exclude(receipts__user=user).count()
+
+    cache.set(_unread_key(user.id), (version, count), UNREAD_CACHE_TIMEOUT)
+    return count
@@ -2,4 +2,15 @@ from rest_framework.pagination import PageNumberPagination
 
 class EmployeePagination(PageNumberPagination):
     page_size = 25
-    page_query_param = 'page'
\ No newline at end of file
+    page_query_param = 'page'
+
+
+class EmployeeSearchPagination(EmployeePagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class TimesheetReportPagination(EmployeePagination):
+    page_size_query_param = 'page_size'
+    max_page_size = 500
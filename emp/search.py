@@ -0,0 +1,160 @@
+"""
+Employee directory search.
+
+Every EmployeeProfile has an EmployeeSearchDocument holding its searchable
+text, normalised to lower-case words:
+
+    name      first/last name and emp_id (weighted higher)
+    document  work email, department, designation, job title and location
+
+The document table is indexed per database (see migration 0016):
+
+    PostgreSQL  generated, weighted tsvector column with a GIN index
+    SQLite      FTS5 external-content table kept in step by triggers
+    otherwise   no index; terms are matched with icontains
+
+Documents are refreshed by the EmployeeProfile post_save signal; bulk
+writers call index_profiles() themselves. search() returns an
+EmployeeProfile queryset annotated with `search_rank` and ordered best
+first, so callers can filter and paginate it like any other queryset.
+"""
+import re
+
+from django.db import connection
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+from .models import EmployeeProfile, EmployeeSearchDocument
+
+BATCH_SIZE = 1000
+MAX_TERMS = 8
+
+FTS_TABLE = "emp_employeesearch_fts"
+
+NAME_FIELDS = ("first_name", "last_name", "emp_id")
+DOCUMENT_FIELDS = ("work_email", "department", "designation", "job_title", "location")
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_backend = None
+
+
+def normalize(*values):
+    """Lower-case words of `values`, punctuation dropped: "WZG-AI-0001" -> "wzg ai 0001"."""
+    return " ".join(
+        word for value in values if value
+        for word in _WORD.findall(str(value).lower())
+    )
+
+
+def terms(query):
+    return normalize(query).split()[:MAX_TERMS]
+
+
+def document_for(profile):
+    return EmployeeSearchDocument(
+        profile_id=profile.pk,
+        name=normalize(*(getattr(profile, field) for field in NAME_FIELDS)),
+        document=normalize(*(getattr(profile, field) for field in DOCUMENT_FIELDS)),
+    )
+
+
+def index_profiles(profiles, batch_size=BATCH_SIZE):
+    """Create or refresh the search documents of `profiles`."""
+    documents = [document_for(profile) for profile in profiles]
+    EmployeeSearchDocument.objects.bulk_create(
+        documents,
+        batch_size=batch_size,
+        update_conflicts=True,
+        unique_fields=["profile"],
+        update_fields=["name", "document"],
+    )
+    return len(documents)
+
+
+def rebuild(batch_size=BATCH_SIZE):
+    """Regenerate every document. Returns the number indexed."""
+    EmployeeSearchDocument.objects.all().delete()
+    indexed = 0
+    batch = []
+    for profile in EmployeeProfile.objects.only(
+            "pk", *NAME_FIELDS, *DOCUMENT_FIELDS).iterator(chunk_size=batch_size):
+        batch.append(profile)
+        if len(batch) >= batch_size:
+            indexed += index_profiles(batch, batch_size)
+            batch = []
+    if batch:
+        indexed += index_profiles(batch, batch_size)
+    return indexed
+
+
+def backend():
+    """"postgres", "fts5" or "basic", depending on what migration 0016 could create."""
+    global _backend
+    if _backend is None:
+        if connection.vendor == "postgresql":
+            _backend = "postgres"
+        elif connection.vendor == "sqlite" and FTS_TABLE in connection.introspection.table_names():
+            _backend = "fts5"
+        else:
+            _backend = "basic"
+    return _backend
+
+
+def _profile_pk():
+    return f"{connection.ops.quote_name(EmployeeProfile._meta.db_table)}.{connection.ops.quote_name('id')}"
+
+
+def _postgres(queryset, words):
+    query = " & ".join(f"{word}:*" for word in words)
+    table = EmployeeSearchDocument._meta.db_table
+    matches = RawSQL(
+        f"SELECT profile_id FROM {table} WHERE vector @@ to_tsquery('simple', %s)", (query,))
+    rank = RawSQL(
+        f"SELECT ts_rank(vector, to_tsquery('simple', %s)) FROM {table} "
+        f"WHERE profile_id = {_profile_pk()}", (query,), output_field=FloatField())
+    return queryset.filter(id__in=matches).annotate(search_rank=rank)
+
+
+def _fts5(queryset, words):
+    query = " ".join(f'"{word}"*' for word in words)
+    fts = connection.ops.quote_name(FTS_TABLE)
+    # Join the FTS table so MATCH runs once for the whole query; a rank
+    # subquery correlated on rowid would re-run it for every profile.
+    queryset = queryset.extra(
+        tables=[FTS_TABLE],
+        where=[f"{fts} MATCH %s", f"{fts}.rowid = {_profile_pk()}"],
+        params=[query],
+    )
+    # bm25 is lower-is-better; name hits weigh ten times the rest
+    rank = RawSQL(f"-bm25({fts}, 10.0, 1.0)", (), output_field=FloatField())
+    return queryset.annotate(search_rank=rank)
+
+
+def _basic(queryset, words):
+    for word in words:
+        queryset = queryset.filter(
+            Q(search_document__name__icontains=word) |
+            Q(search_document__document__icontains=word)
+        )
+    return queryset.annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+BACKENDS = {
+    "postgres": _postgres,
+    "fts5": _fts5,
+    "basic": _basic,
+}
+
+
+def search(query, queryset=None):
+    """
+    Profiles matching every word of `query` (prefix match), best first.
+    An empty query matches nothing.
+    """
+    if queryset is None:
+        queryset = EmployeeProfile.objects.all()
+    words = terms(query)
+    if not words:
+        return queryset.none()
+    return BACKENDS[backend()](queryset, words).order_by(
+        F("search_rank").desc(nulls_last=True), "first_name", "last_name", "id")
@@ -10,11 +10,15 @@ from .models import (
 )
 import re
 import unicodedata
+from urllib.parse import quote
 from django.contrib.auth import get_user_model
 from datetime import datetime
 from django.utils import timezone
 from django.urls import reverse
+from django.utils.http import RFC3986_SUBDELIMS
 from .constants import LEAVE_TYPE_CHOICES, EMPLOYEE_DEPARTMENT_CHOICES
+from .services import LeaveLedgerService
+from .fieldsets import SparseFieldsetSerializerMixin
 from decimal import Decimal
 from django.db import transaction
 
@@ -27,12 +31,22 @@ from rest_framework import serializers
 from .models import EmployeeProfile
 
 
-class EmployeeSerializer(serializers.ModelSerializer):
+class EmployeeSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = EmployeeProfile
         fields = "__all__"
 
 
+class EmployeeDirectorySerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    """Directory entry returned by employee search."""
+    rank = serializers.FloatField(source="search_rank", read_only=True)
+
+    class Meta:
+        model = EmployeeProfile
+        fields = ("id", "emp_id", "first_name", "last_name", "work_email",
+                  "department", "designation", "job_title", "location", "role", "rank")
+
+
 class ContactSerializer(serializers.Serializer):
     first_name = serializers.CharField(required=True, max_length=80)
     middle_name = serializers.CharField(
@@ -288,67 +302,67 @@ class EmployeeProfileReadSerializer(serializers.ModelSerializer):
     def get_masked_account_number(self, obj):
         return self.mask_number(obj.account_number)
 
+    # reverse() escapes path arguments with this safe set
+    URL_SAFE = RFC3986_SUBDELIMS + "/~:@"
+    EMP_ID_PLACEHOLDER = "__emp_id__"
+
+    def document_url(self, obj, doc_field):
+        """
+        Absolute URL of one of obj's protected documents.
+
+        The URL is reversed and made absolute once per doc_field and
+        cached in the serializer context, so a list of profiles does not
+        pay for reverse() and build_absolute_uri per row and field. An
+        emp_id that is not a valid path segment goes through reverse(),
+        which raises as before.
+        """
+        emp_id = obj.emp_id
+        if not emp_id or "/" in emp_id:
+            url = reverse("protected_employee_document", args=[emp_id, doc_field])
+            request = self.context.get("request")
+            return request.build_absolute_uri(url) if request else url
+
+        templates = self.context.setdefault("_document_url_templates", {})
+        if doc_field not in templates:
+            url = reverse("protected_employee_document",
+                          args=[self.EMP_ID_PLACEHOLDER, doc_field])
+            request = self.context.get("request")
+            if request:
+                url = request.build_absolute_uri(url)
+            templates[doc_field] = url.split(self.EMP_ID_PLACEHOLDER, 1)
+        head, tail = templates[doc_field]
+        return head + quote(emp_id, safe=self.URL_SAFE) + tail
+
     def get_protected_profile_photo_url(self, obj):
         if not obj.profile_photo:
             return None
-
-        request = self.context.get("request")
-
-        # REMOVE try/except block to expose configuration errors
-        url = reverse(
-            "protected_employee_document",
-            kwargs={"emp_id": obj.emp_id, "doc_field": "profile_photo"}
-        )
-
-        if request:
-            return request.build_absolute_uri(url)
-        return url
+        return self.document_url(obj, "profile_photo")
 
     def get_protected_aadhaar_image_url(self, obj):
-        request = self.context.get("request", None)
         try:
-            url = reverse("protected_employee_document",
-                          args=[obj.emp_id, "aadhaar_image"])
+            return self.document_url(obj, "aadhaar_image")
         except Exception:
             return None
-        if request:
-            return request.build_absolute_uri(url)
-        return url
 
     def get_protected_pan_image_url(self, obj):
-        request = self.context.get("request", None)
         try:
-            url = reverse("protected_employee_document",
-                          args=[obj.emp_id, "pan_image"])
+            return self.document_url(obj, "pan_image")
         except Exception:
             return None
-        if request:
-            return request.build_absolute_uri(url)
-        return url
 
     def get_protected_passport_image_url(self, obj):
-        request = self.context.get("request", None)
         try:
-            url = reverse("protected_employee_document",
-                          args=[obj.emp_id, "passport_image"])
+            return self.document_url(obj, "passport_image")
         except Exception:
             return None
-        if request:
-            return request.build_absolute_uri(url)
-        return url
 
     def get_protected_id_image_url(self, obj):
         if not obj.id_image:
             return None
-        request = self.context.get("request", None)
         try:
-            url = reverse("protected_employee_document",
-                          args=[obj.emp_id, "id_image"])
+            return self.document_url(obj, "id_image")
         except Exception:
             return None
-        if request:
-            return request.build_absolute_uri(url)
-        return url
 
     def get_team_lead(self, obj):
         if obj.team_lead:
@@ -540,6 +554,18 @@ class NotificationSerializer(serializers.ModelSerializer):
                   'is_read', 'created_at', 'extra')
 
 
+class NotificationFeedSerializer(serializers.Serializer):
+    """Personal and broadcast notifications, as returned by notifications.feed()."""
+    id = serializers.IntegerField()
+    title = serializers.CharField()
+    body = serializers.CharField()
+    notif_type = serializers.CharField()
+    is_read = serializers.BooleanField()
+    created_at = serializers.DateTimeField()
+    extra = serializers.JSONField(allow_null=True)
+    source = serializers.CharField()
+
+
 class ShiftSerializer(serializers.ModelSerializer):
     class Meta:
         model = Shift
@@ -703,27 +729,18 @@ class LeaveApplySerializer(serializers.Serializer):
             )
 
         # ✅ Leave balance check (ENUM-based)
-        lb = LeaveBalance.objects.filter(
-            profile=profile,
-            leave_type=leave_type
-        ).first()
-
-        if lb:
-            try:
-                available = Decimal(lb.total_allocated) - Decimal(lb.used)
-            except Exception:
-                available = None
-
-            if available is not None and Decimal(requested_days) > available:
-                label = dict(LEAVE_TYPE_CHOICES).get(leave_type, leave_type)
-                raise serializers.ValidationError(
-                    {
-                        "non_field_errors": (
-                            f"Insufficient leave balance for '{label}'. "
-                            f"Requested: {requested_days}, Available: {available}."
-                        )
-                    }
-                )
+        available = LeaveLedgerService.available(profile.id, leave_type)
+
+        if available is not None and Decimal(requested_days) > available:
+            label = dict(LEAVE_TYPE_CHOICES).get(leave_type, leave_type)
+            raise serializers.ValidationError(
+                {
+                    "non_field_errors": (
+                        f"Insufficient leave balance for '{label}'. "
+                        f"Requested: {requested_days}, Available: {available}."
+                    )
+                }
+            )
 
         # ✅ Store computed values
         data["calculated_days"] = requested_days
@@ -1,8 +1,21 @@
+from django.core.cache import cache
+from HRM.cache import invalidate_groups, group_version, GROUP_ATTENDANCE, GROUP_EMPLOYEES, GROUP_LEAVE
 from django.utils import timezone
 from django.db import transaction, IntegrityError
-from emp.models import Attendance
-from datetime import datetime, time
-from django.db.models import Q
+from django.contrib.auth import get_user_model
+from emp.models import (
+    Attendance, AttendanceMonthlySummary, EmployeeProfile, LeaveAccrualRun, LeaveBalance,
+    LeaveDay, LeaveLedgerEntry, LeaveRequest, Notification
+)
+from emp.constants import LEAVE_ACCRUAL_POLICY
+import calendar
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from django.db.models import (
+    Q, Count, Sum, Case, When, F, Value, IntegerField, Exists, OuterRef, Subquery,
+    DecimalField, ExpressionWrapper,
+)
+from django.db.models.functions import ExtractYear, ExtractMonth
 
 
 class AttendanceService:
@@ -39,6 +52,9 @@ class AttendanceService:
         attendance.compute_duration_and_overtime()
         attendance.save()
 
+        AttendanceRollupService.refresh(
+            attendance.user_id, attendance.date.year, attendance.date.month)
+
         return attendance, None
 
 
@@ -126,3 +142,781 @@ class AttendanceQueryService:
             return None
 
         return queryset.select_related("user").order_by("user__username")
+
+
+class AttendanceRollupService:
+    """
+    Maintains AttendanceMonthlySummary rows.
+    refresh() recomputes a single user-month after a write,
+    rebuild() regenerates a whole month (or everything) in bulk.
+    """
+
+    BATCH_SIZE = 1000
+
+    @staticmethod
+    def version_group(year):
+        return f"attendance_rollup:{year}"
+
+    @staticmethod
+    def get_version(year):
+        """
+        Cache version for a year's rollup. Readers that cache data derived
+        from the rollup include it in their keys. Kept with the other
+        invalidation groups in the shared cache, so every worker sees a bump.
+        """
+        return group_version(AttendanceRollupService.version_group(year))
+
+    @staticmethod
+    def bump_version(*years):
+        def _bump():
+            invalidate_groups(
+                GROUP_ATTENDANCE,
+                *(AttendanceRollupService.version_group(year) for year in years))
+
+        transaction.on_commit(_bump)
+
+    @staticmethod
+    def _aggregate(queryset):
+        regular = AttendanceReportService.REGULAR_WORK_SECONDS
+        worked = Q(status__in=("present", "halfday"))
+
+        return queryset.values(
+            "user_id",
+            year=ExtractYear("date"),
+            month=ExtractMonth("date"),
+        ).annotate(
+            days_present=Count("id", filter=Q(status="present")),
+            halfdays=Count("id", filter=Q(status="halfday")),
+            absent_days=Count("id", filter=Q(status="absent")),
+            total_seconds=Sum("duration_seconds", filter=worked, default=0),
+            overtime_seconds=Sum(
+                Case(
+                    When(
+                        duration_seconds__gt=regular,
+                        then=F("duration_seconds") - regular
+                    ),
+                    default=Value(0),
+                    output_field=IntegerField()
+                ),
+                default=0
+            ),
+            late_count=Count("id", filter=Q(late_arrivals=True)),
+        ).order_by()
+
+    @staticmethod
+    def _summary_fields(row):
+        return {
+            "days_present": row["days_present"],
+            "halfdays": row["halfdays"],
+            "absent_days": row["absent_days"],
+            "total_seconds": row["total_seconds"] or 0,
+            "overtime_seconds": row["overtime_seconds"] or 0,
+            "late_count": row["late_count"],
+        }
+
+    @staticmethod
+    def refresh(user_id, year, month):
+        rows = list(AttendanceRollupService._aggregate(
+            Attendance.objects.filter(
+                user_id=user_id, date__year=year, date__month=month)
+        ))
+
+        AttendanceRollupService.bump_version(year)
+
+        if not rows:
+            AttendanceMonthlySummary.objects.filter(
+                user_id=user_id, year=year, month=month).delete()
+            return None
+
+        summary, _ = AttendanceMonthlySummary.objects.update_or_create(
+            user_id=user_id,
+            year=year,
+            month=month,
+            defaults=AttendanceRollupService._summary_fields(rows[0])
+        )
+        return summary
+
+    @staticmethod
+    @transaction.atomic
+    def rebuild(year=None, month=None):
+        """
+        Recompute summaries from raw attendance.
+        Scope: everything, a whole year, or a single month.
+        Returns the number of summary rows written.
+        """
+        attendance = Attendance.objects.all()
+        summaries = AttendanceMonthlySummary.objects.all()
+        if year:
+            attendance = attendance.filter(date__year=year)
+            summaries = summaries.filter(year=year)
+        if month:
+            attendance = attendance.filter(date__month=month)
+            summaries = summaries.filter(month=month)
+
+        years = set(summaries.values_list("year", flat=True).distinct())
+        summaries.delete()
+
+        batch = []
+        written = 0
+        for row in AttendanceRollupService._aggregate(attendance).iterator():
+            years.add(row["year"])
+            batch.append(AttendanceMonthlySummary(
+                user_id=row["user_id"],
+                year=row["year"],
+                month=row["month"],
+                **AttendanceRollupService._summary_fields(row)
+            ))
+            if len(batch) >= AttendanceRollupService.BATCH_SIZE:
+                AttendanceMonthlySummary.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+
+        if batch:
+            AttendanceMonthlySummary.objects.bulk_create(batch)
+            written += len(batch)
+
+        AttendanceRollupService.bump_version(*years)
+        return written
+
+
+class LeaveCalendarService:
+    """
+    Maintains LeaveDay rows.
+    sync() rewrites the days of specific leave requests after a write,
+    rebuild() regenerates the whole table in bulk.
+    """
+
+    BATCH_SIZE = 1000
+
+    # Leaves in these states are not materialized.
+    INACTIVE_LEAVE_STATUSES = ("tl_rejected", "hr_rejected", "cancelled")
+    APPROVED_STATUSES = ("hr_approved",)
+
+    @staticmethod
+    def _days(leave, department):
+        day = leave.start_date
+        while day <= leave.end_date:
+            yield LeaveDay(
+                leave_id=leave.id,
+                profile_id=leave.profile_id,
+                date=day,
+                department=department,
+                leave_type=leave.leave_type,
+                status=leave.status,
+            )
+            day += timedelta(days=1)
+
+    @staticmethod
+    def _write(leaves, departments):
+        batch = []
+        written = 0
+        for leave in leaves:
+            if leave.status in LeaveCalendarService.INACTIVE_LEAVE_STATUSES:
+                continue
+            batch.extend(LeaveCalendarService._days(
+                leave, departments.get(leave.profile_id)))
+            if len(batch) >= LeaveCalendarService.BATCH_SIZE:
+                LeaveDay.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+
+        if batch:
+            LeaveDay.objects.bulk_create(batch)
+            written += len(batch)
+        return written
+
+    @staticmethod
+    @transaction.atomic
+    def sync(*leaves):
+        """Rewrite the calendar rows of the given leave requests."""
+        departments = dict(EmployeeProfile.objects.filter(
+            id__in={leave.profile_id for leave in leaves}
+        ).values_list("id", "department"))
+
+        LeaveDay.objects.filter(leave_id__in=[leave.id for leave in leaves]).delete()
+        return LeaveCalendarService._write(leaves, departments)
+
+    @staticmethod
+    def refresh_departments(profile_ids):
+        """Copy the current department onto the calendar rows of these employees."""
+        return LeaveDay.objects.filter(profile_id__in=profile_ids).update(
+            department=Subquery(EmployeeProfile.objects.filter(
+                id=OuterRef("profile_id")).values("department")[:1])
+        )
+
+    @staticmethod
+    @transaction.atomic
+    def rebuild():
+        """
+        Regenerate every calendar row from LeaveRequest.
+        Returns the number of rows written.
+        """
+        LeaveDay.objects.all().delete()
+        departments = dict(EmployeeProfile.objects.values_list("id", "department"))
+        leaves = LeaveRequest.objects.exclude(
+            status__in=LeaveCalendarService.INACTIVE_LEAVE_STATUSES
+        ).only(
+            "id", "profile_id", "start_date", "end_date", "leave_type", "status"
+        ).order_by().iterator(chunk_size=LeaveCalendarService.BATCH_SIZE)
+        return LeaveCalendarService._write(leaves, departments)
+
+    @staticmethod
+    def out_on(day, statuses=APPROVED_STATUSES):
+        """Calendar rows of everyone out on `day` with a leave in `statuses`."""
+        return LeaveDay.objects.filter(date=day, status__in=statuses)
+
+    @staticmethod
+    def calendar(start, end, department=None, statuses=APPROVED_STATUSES):
+        """
+        Everyone out between `start` and `end`, grouped by date, in one scan.
+        Returns [{"date", "employees": [...]}] for days with at least one absence.
+        """
+        days = LeaveDay.objects.filter(
+            date__range=(start, end), status__in=statuses)
+        if department:
+            days = days.filter(department=department)
+
+        calendar = {}
+        for row in days.order_by("date", "profile__emp_id").values(
+            "date", "department", "leave_type", "status", "leave_id",
+            "profile__emp_id", "profile__first_name", "profile__last_name",
+        ):
+            calendar.setdefault(row["date"], []).append({
+                "emp_id": row["profile__emp_id"],
+                "name": f"{row['profile__first_name']} {row['profile__last_name'] or ''}".strip(),
+                "department": row["department"],
+                "leave_type": row["leave_type"],
+                "status": row["status"],
+                "leave_id": row["leave_id"],
+            })
+
+        return [
+            {"date": day, "employees": employees}
+            for day, employees in calendar.items()
+        ]
+
+
+class LeaveRoutingService:
+    """
+    Picks the team lead who should act on a leave request.
+
+    The employee's own TL is used unless inactive or on leave in the
+    requested interval; otherwise the first available TL of the same
+    department (lowest id) takes it; otherwise the request goes straight
+    to HR. Availability for all candidates is resolved in one query that
+    joins them against overlapping leave requests. Department TL rosters
+    are cached and expire with the employees cache group.
+    """
+
+    ROSTER_CACHE_TIMEOUT = 10 * 60
+
+    # Leaves in these states do not make an approver unavailable
+    # (same rule as EmployeeProfile.is_on_leave).
+    INACTIVE_LEAVE_STATUSES = LeaveCalendarService.INACTIVE_LEAVE_STATUSES
+
+    @staticmethod
+    def roster_key(department):
+        return f"leave_routing:tl_roster:{department}:{group_version(GROUP_EMPLOYEES)}"
+
+    @staticmethod
+    def department_roster(department):
+        """Ids of active TLs in `department`, lowest first (cached)."""
+        User = get_user_model()
+        return cache.get_or_set(
+            LeaveRoutingService.roster_key(department),
+            lambda: list(User.objects.filter(
+                role=User.ROLE_TL,
+                is_active=True,
+                employeeprofile__department=department,
+            ).order_by("id").values_list("id", flat=True)),
+            LeaveRoutingService.ROSTER_CACHE_TIMEOUT
+        )
+
+    @staticmethod
+    def _blocking_leaves():
+        return LeaveRequest.objects.exclude(
+            status__in=LeaveRoutingService.INACTIVE_LEAVE_STATUSES)
+
+    @staticmethod
+    def _candidates(primary_ids, roster):
+        User = get_user_model()
+        return User.objects.filter(
+            Q(id__in=primary_ids) | Q(id__in=roster, role=User.ROLE_TL),
+            is_active=True,
+        )
+
+    @staticmethod
+    def _pick(primary_id, roster, available, exclude=None):
+        if primary_id != exclude and primary_id in available:
+            return available[primary_id]
+        for tl_id in roster:
+            if tl_id not in (primary_id, exclude) and tl_id in available:
+                return available[tl_id]
+        return None
+
+    @staticmethod
+    def resolve(profile, start, end):
+        """
+        Returns (approver, route_direct_to_hr) for a new leave request by
+        `profile` from `start` to `end`.
+        """
+        User = get_user_model()
+        if profile.user.role == User.ROLE_TL or not profile.team_lead_id:
+            return None, True
+
+        roster = LeaveRoutingService.department_roster(profile.department)
+        candidates = LeaveRoutingService._candidates(
+            [profile.team_lead_id], roster
+        ).annotate(
+            on_leave=Exists(LeaveRoutingService._blocking_leaves().filter(
+                profile__user=OuterRef("pk"),
+                start_date__lte=end,
+                end_date__gte=start,
+            ))
+        )
+
+        users = {user.id: user for user in candidates}
+        if profile.team_lead_id not in users:
+            # own TL is inactive
+            return None, True
+
+        available = {pk: user for pk, user in users.items() if not user.on_leave}
+        approver = LeaveRoutingService._pick(
+            profile.team_lead_id, roster, available)
+        return approver, approver is None
+
+    @staticmethod
+    @transaction.atomic
+    def reroute_pending(tl_user_id, start, end):
+        """
+        Reassign every pending leave waiting on `tl_user_id` that overlaps
+        the TL's absence from `start` to `end`. Uses a fixed number of
+        queries regardless of how many leaves or departments are involved.
+        Returns (rerouted, sent_to_hr).
+        """
+        from emp import notifications
+
+        User = get_user_model()
+        pending = list(LeaveRequest.objects.select_for_update(of=("self",)).filter(
+            tl_id=tl_user_id,
+            status="applied",
+            start_date__lte=end,
+            end_date__gte=start,
+        ).select_related("profile"))
+        if not pending:
+            return 0, 0
+
+        rosters = {
+            department: LeaveRoutingService.department_roster(department)
+            for department in {leave.profile.department for leave in pending}
+        }
+        candidate_ids = set(
+            LeaveRoutingService._candidates(
+                {leave.profile.team_lead_id for leave in pending},
+                [tl_id for roster in rosters.values() for tl_id in roster],
+            ).exclude(id=tl_user_id).values_list("id", flat=True)
+        )
+
+        busy = {}
+        for user_id, busy_start, busy_end in LeaveRoutingService._blocking_leaves().filter(
+            profile__user_id__in=candidate_ids,
+            start_date__lte=max(leave.end_date for leave in pending),
+            end_date__gte=min(leave.start_date for leave in pending),
+        ).values_list("profile__user_id", "start_date", "end_date"):
+            busy.setdefault(user_id, []).append((busy_start, busy_end))
+
+        users = User.objects.in_bulk(candidate_ids)
+        rerouted, to_hr, messages = [], [], []
+        for leave in pending:
+            available = {
+                pk: user for pk, user in users.items()
+                if not any(s <= leave.end_date and e >= leave.start_date
+                           for s, e in busy.get(pk, ()))
+            }
+            approver = LeaveRoutingService._pick(
+                leave.profile.team_lead_id, rosters[leave.profile.department],
+                available, exclude=tl_user_id)
+
+            if approver:
+                leave.tl = approver
+                rerouted.append(leave)
+                messages.append(Notification(
+                    to_user=approver,
+                    title=f"Leave request from {leave.profile.full_name()}",
+                    body=f"{leave.profile.full_name()} applied for {leave.leave_type} "
+                         f"from {leave.start_date} to {leave.end_date}.",
+                    notif_type="leave",
+                    extra={"leave_request_id": leave.id},
+                ))
+            else:
+                leave.tl = None
+                leave.status = "tl_approved"
+                to_hr.append(leave)
+
+        LeaveRequest.objects.bulk_update(rerouted + to_hr, ["tl", "status"])
+        if to_hr:
+            LeaveCalendarService.sync(*to_hr)
+        invalidate_groups(GROUP_LEAVE)
+        notifications.send(messages)
+        if to_hr:
+            notifications.dispatch(
+                notifications.roles(User.ROLE_HR, active_only=True),
+                title="Leave requests routed to HR",
+                body=f"{len(to_hr)} pending leave request(s) had no available team lead",
+                notif_type="leave",
+                extra={"leave_ids": [leave.id for leave in to_hr]}
+            )
+        return len(rerouted), len(to_hr)
+
+
+class LeaveLedgerService:
+    """
+    Every change to a leave balance goes through here: an entry is appended
+    to LeaveLedgerEntry and applied to the (profile, leave_type)
+    LeaveBalance row with an F() update in the same transaction, so
+    concurrent postings never lose updates. LeaveBalance is the cached
+    current balance; reconcile() checks it against the ledger.
+    """
+
+    BALANCE_FIELD = {"credit": "total_allocated", "debit": "used"}
+
+    @staticmethod
+    def _apply(profile_id, leave_type, entry_type, amount):
+        field = LeaveLedgerService.BALANCE_FIELD[entry_type]
+        updated = LeaveBalance.objects.filter(
+            profile_id=profile_id, leave_type=leave_type
+        ).update(**{field: F(field) + amount})
+        if not updated:
+            try:
+                with transaction.atomic():
+                    LeaveBalance.objects.create(
+                        profile_id=profile_id, leave_type=leave_type, **{field: amount})
+            except IntegrityError:
+                # created concurrently; apply on top of it
+                LeaveBalance.objects.filter(
+                    profile_id=profile_id, leave_type=leave_type
+                ).update(**{field: F(field) + amount})
+
+    @staticmethod
+    @transaction.atomic
+    def post(profile_id, leave_type, entry_type, amount, reason,
+             leave=None, created_by=None, note=""):
+        amount = Decimal(amount)
+        entry = LeaveLedgerEntry.objects.create(
+            profile_id=profile_id,
+            leave_type=leave_type,
+            entry_type=entry_type,
+            reason=reason,
+            amount=amount,
+            leave=leave,
+            created_by=created_by,
+            note=note,
+        )
+        LeaveLedgerService._apply(profile_id, leave_type, entry_type, amount)
+        return entry
+
+    @staticmethod
+    def credit(profile_id, leave_type, amount, reason="allocation", **kwargs):
+        return LeaveLedgerService.post(
+            profile_id, leave_type, "credit", amount, reason, **kwargs)
+
+    @staticmethod
+    @transaction.atomic
+    def debit_leave(leave, created_by=None):
+        """
+        Charge an approved leave to its balance. Idempotent: a leave that
+        has already been charged is left alone. Leaves whose type has no
+        balance row are not tracked.
+        """
+        balance = LeaveBalance.objects.select_for_update().filter(
+            profile_id=leave.profile_id, leave_type=leave.leave_type
+        ).first()
+        if balance is None:
+            return None
+
+        charged = LeaveLedgerEntry.objects.filter(
+            leave=leave, entry_type="debit"
+        ).aggregate(total=Sum("amount", default=0))["total"]
+        outstanding = Decimal(leave.days) - charged
+        if not outstanding:
+            return None
+
+        return LeaveLedgerService.post(
+            leave.profile_id, leave.leave_type, "debit", outstanding,
+            "leave" if not charged else "adjustment",
+            leave=leave, created_by=created_by)
+
+    @staticmethod
+    def available(profile_id, leave_type):
+        """
+        Current available days, or None when the type has no balance row.
+        """
+        return LeaveBalance.objects.filter(
+            profile_id=profile_id, leave_type=leave_type
+        ).values_list(
+            ExpressionWrapper(F("total_allocated") - F("used"),
+                              output_field=DecimalField()),
+            flat=True
+        ).first()
+
+    @staticmethod
+    def ledger_totals(profile_ids=None):
+        """{(profile_id, leave_type): {"total_allocated", "used"}} summed from the ledger."""
+        entries = LeaveLedgerEntry.objects.all()
+        if profile_ids is not None:
+            entries = entries.filter(profile_id__in=profile_ids)
+
+        totals = {}
+        for row in entries.values("profile_id", "leave_type").annotate(
+            credits=Sum("amount", filter=Q(entry_type="credit"), default=0),
+            debits=Sum("amount", filter=Q(entry_type="debit"), default=0),
+        ).order_by():
+            totals[(row["profile_id"], row["leave_type"])] = {
+                "total_allocated": row["credits"],
+                "used": row["debits"],
+            }
+        return totals
+
+    @staticmethod
+    def reconcile(profile_ids=None, fix=False):
+        """
+        Compare every LeaveBalance with its ledger.
+        Returns a list of mismatches; with fix=True, balances are reset to
+        the ledger totals (the ledger is the source of truth).
+        """
+        totals = LeaveLedgerService.ledger_totals(profile_ids)
+        balances = LeaveBalance.objects.all()
+        if profile_ids is not None:
+            balances = balances.filter(profile_id__in=profile_ids)
+
+        zero = {"total_allocated": Decimal(0), "used": Decimal(0)}
+        mismatches = []
+        seen = set()
+        for balance in balances:
+            key = (balance.profile_id, balance.leave_type)
+            seen.add(key)
+            expected = totals.get(key, zero)
+            if (balance.total_allocated, balance.used) != (
+                    expected["total_allocated"], expected["used"]):
+                mismatches.append({
+                    "profile_id": balance.profile_id,
+                    "leave_type": balance.leave_type,
+                    "balance": {"total_allocated": balance.total_allocated,
+                                "used": balance.used},
+                    "ledger": expected,
+                })
+
+        missing = [key for key in totals if key not in seen]
+        for profile_id, leave_type in missing:
+            mismatches.append({
+                "profile_id": profile_id,
+                "leave_type": leave_type,
+                "balance": None,
+                "ledger": totals[(profile_id, leave_type)],
+            })
+
+        if fix and mismatches:
+            with transaction.atomic():
+                for row in mismatches:
+                    LeaveBalance.objects.update_or_create(
+                        profile_id=row["profile_id"],
+                        leave_type=row["leave_type"],
+                        defaults=row["ledger"],
+                    )
+        return mismatches
+
+
+class LeaveAccrualService:
+    """
+    Credits monthly leave entitlements (emp.constants.LEAVE_ACCRUAL_POLICY)
+    to every active employee and lapses unused days above the carry-forward
+    cap at year end.
+
+    Employees are processed in chunks, each in its own transaction with
+    set-based writes. Every period is recorded as a LeaveAccrualRun: a
+    finished period is never repeated, and an interrupted one resumes,
+    skipping employees whose entries were already written.
+
+    Year end lapses from the live balance, so it must run after the year
+    is over and before the next year's first accrual; both entry points
+    raise ValueError when called out of that order.
+    """
+
+    BATCH_SIZE = 1000
+
+    @staticmethod
+    def monthly_amount(yearly, month):
+        """
+        Instalment for `month`, rounded so the twelve instalments add up
+        to `yearly` exactly.
+        """
+        def earned(months):
+            return (Decimal(yearly) * months / 12).quantize(Decimal("0.01"))
+        return earned(month) - earned(month - 1)
+
+    @staticmethod
+    def _done(kind, period):
+        return LeaveAccrualRun.objects.filter(
+            kind=kind, period=period, status="done").exists()
+
+    @staticmethod
+    def _start(kind, period):
+        run, _ = LeaveAccrualRun.objects.get_or_create(kind=kind, period=period)
+        return None if run.status == "done" else run
+
+    @staticmethod
+    def _finish(run):
+        LeaveAccrualRun.objects.filter(pk=run.pk).update(
+            status="done", finished_at=timezone.now())
+        run.refresh_from_db()
+        return run
+
+    @staticmethod
+    def _pending(run, chunk):
+        """
+        Lock the run (so concurrent runners take turns per chunk) and
+        drop employees it has already written entries for.
+        """
+        LeaveAccrualRun.objects.select_for_update().get(pk=run.pk)
+        done = set(LeaveLedgerEntry.objects.filter(
+            accrual_run=run, profile_id__in=chunk
+        ).values_list("profile_id", flat=True))
+        return [pk for pk in chunk if pk not in done]
+
+    @staticmethod
+    def _record(run, employees, entries):
+        LeaveAccrualRun.objects.filter(pk=run.pk).update(
+            employees=F("employees") + employees,
+            entries=F("entries") + entries,
+        )
+
+    @staticmethod
+    def _chunks(ids, batch_size):
+        for offset in range(0, len(ids), batch_size):
+            yield ids[offset:offset + batch_size]
+
+    @staticmethod
+    def run_monthly(year, month, batch_size=BATCH_SIZE):
+        """
+        Credit `month`'s instalment to everyone active who had joined by the
+        end of it. Returns the LeaveAccrualRun, or None if the month was
+        already accrued.
+        """
+        period = date(year, month, 1)
+        if (not LeaveAccrualService._done("monthly", period)
+                and LeaveAccrualRun.objects.filter(kind="monthly", period__year=year - 1).exists()
+                and not LeaveAccrualService._done("year_end", date(year - 1, 12, 31))):
+            raise ValueError(f"Run the {year - 1} year-end before accruing {year}.")
+        run = LeaveAccrualService._start("monthly", period)
+        if run is None:
+            return None
+
+        amounts = {
+            leave_type: LeaveAccrualService.monthly_amount(policy["yearly"], month)
+            for leave_type, policy in LEAVE_ACCRUAL_POLICY.items()
+        }
+        amounts = {leave_type: amount for leave_type, amount in amounts.items() if amount}
+
+        period_end = date(year, month, calendar.monthrange(year, month)[1])
+        eligible = list(EmployeeProfile.objects.filter(is_active=True).filter(
+            Q(date_of_joining__isnull=True) | Q(date_of_joining__lte=period_end)
+        ).order_by("id").values_list("id", flat=True))
+
+        note = f"Accrual {period:%Y-%m}"
+        for chunk in LeaveAccrualService._chunks(eligible, batch_size):
+            with transaction.atomic():
+                todo = LeaveAccrualService._pending(run, chunk)
+                if not todo:
+                    continue
+
+                LeaveBalance.objects.bulk_create([
+                    LeaveBalance(profile_id=pk, leave_type=leave_type)
+                    for pk in todo for leave_type in amounts
+                ], ignore_conflicts=True, batch_size=batch_size)
+
+                entries = LeaveLedgerEntry.objects.bulk_create([
+                    LeaveLedgerEntry(
+                        profile_id=pk,
+                        leave_type=leave_type,
+                        entry_type="credit",
+                        reason="accrual",
+                        amount=amount,
+                        accrual_run=run,
+                        note=note,
+                    )
+                    for pk in todo for leave_type, amount in amounts.items()
+                ], batch_size=batch_size)
+
+                for leave_type, amount in amounts.items():
+                    LeaveBalance.objects.filter(
+                        profile_id__in=todo, leave_type=leave_type
+                    ).update(total_allocated=F("total_allocated") + amount)
+
+                LeaveAccrualService._record(run, len(todo), len(entries))
+
+        return LeaveAccrualService._finish(run)
+
+    @staticmethod
+    def run_year_end(year, batch_size=BATCH_SIZE):
+        """
+        Lapse whatever each active employee has available above the
+        carry-forward cap of its leave type at the end of `year`. Returns
+        the LeaveAccrualRun, or None if the year was already closed.
+        """
+        period = date(year, 12, 31)
+        if not LeaveAccrualService._done("year_end", period):
+            if period >= timezone.localdate():
+                raise ValueError(f"{year} has not ended yet.")
+            if LeaveAccrualRun.objects.filter(kind="monthly", period__year=year + 1).exists():
+                raise ValueError(
+                    f"{year + 1} accruals have already run; the {year} year-end "
+                    "would lapse them too.")
+        run = LeaveAccrualService._start("year_end", period)
+        if run is None:
+            return None
+
+        caps = {
+            leave_type: Decimal(policy["carry_forward"])
+            for leave_type, policy in LEAVE_ACCRUAL_POLICY.items()
+            if policy.get("carry_forward") is not None
+        }
+        profiles = list(EmployeeProfile.objects.filter(
+            is_active=True).order_by("id").values_list("id", flat=True))
+
+        note = f"Year-end {year}"
+        for chunk in LeaveAccrualService._chunks(profiles, batch_size):
+            with transaction.atomic():
+                todo = LeaveAccrualService._pending(run, chunk)
+                if not todo:
+                    continue
+
+                entries = []
+                for balance in LeaveBalance.objects.select_for_update().filter(
+                    profile_id__in=todo, leave_type__in=caps
+                ):
+                    excess = balance.total_allocated - balance.used - caps[balance.leave_type]
+                    if excess <= 0:
+                        continue
+                    entries.append(LeaveLedgerEntry(
+                        profile_id=balance.profile_id,
+                        leave_type=balance.leave_type,
+                        entry_type="credit",
+                        reason="lapse",
+                        amount=-excess,
+                        accrual_run=run,
+                        note=note,
+                    ))
+
+                LeaveLedgerEntry.objects.bulk_create(entries, batch_size=batch_size)
+                # rows are locked above, so this clips exactly the balances
+                # the entries were computed from
+                for leave_type, cap in caps.items():
+                    LeaveBalance.objects.filter(
+                        profile_id__in=todo,
+                        leave_type=leave_type,
+                        total_allocated__gt=F("used") + cap,
+                    ).update(total_allocated=F("used") + cap)
+                LeaveAccrualService._record(
+                    run, len({entry.profile_id for entry in entries}), len(entries))
+
+        return LeaveAccrualService._finish(run)
@@ -1,9 +1,14 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
 from django.utils import timezone
-from emp.models import EmployeeProfile
+from emp.models import EmployeeProfile, Notification, Attendance, LeaveDay, LeaveRequest
 from emp.utils import generate_emp_id
+from emp.notifications import invalidate_unread
+from emp import search, typeahead
+from emp.services import LeaveCalendarService, LeaveRoutingService
+from HRM.cache import invalidate_groups, GROUP_ATTENDANCE, GROUP_LEAVE, GROUP_EMPLOYEES
 
 User = get_user_model()
 
@@ -35,3 +40,101 @@ def create_employee_profile(sender, instance, created, **kwargs):
     )
 
     profile.save()
+
+
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def clear_unread_notification_count(sender, instance, **kwargs):
+    """
+    Drop the cached unread counter when a user's notifications change.
+    Bulk paths (bulk_create / update) invalidate explicitly in emp.notifications.
+    """
+    transaction.on_commit(lambda: invalidate_unread(instance.to_user_id))
+
+
+CACHE_GROUPS_BY_MODEL = {
+    Attendance: (GROUP_ATTENDANCE,),
+    LeaveRequest: (GROUP_LEAVE,),
+    EmployeeProfile: (GROUP_EMPLOYEES,),
+}
+
+
+@receiver(post_save, sender=Attendance)
+@receiver(post_delete, sender=Attendance)
+@receiver(post_save, sender=LeaveRequest)
+@receiver(post_delete, sender=LeaveRequest)
+@receiver(post_save, sender=EmployeeProfile)
+@receiver(post_delete, sender=EmployeeProfile)
+def invalidate_cached_responses(sender, **kwargs):
+    """
+    Expire cached dashboard responses that depend on the changed model.
+    """
+    groups = CACHE_GROUPS_BY_MODEL[sender]
+    transaction.on_commit(lambda: invalidate_groups(*groups))
+
+
+@receiver(post_save, sender=LeaveRequest)
+def reroute_leaves_for_absent_tl(sender, instance, created, **kwargs):
+    """
+    When a TL applies for leave, hand the requests waiting on them for
+    those dates to another approver.
+    """
+    if not created or instance.status in LeaveRoutingService.INACTIVE_LEAVE_STATUSES:
+        return
+    tl_user = instance.profile.user
+    if tl_user.role != User.ROLE_TL:
+        return
+    transaction.on_commit(lambda: LeaveRoutingService.reroute_pending(
+        tl_user.id, instance.start_date, instance.end_date))
+
+
+LEAVE_CALENDAR_FIELDS = {"profile", "start_date", "end_date", "leave_type", "status"}
+
+
+@receiver(post_save, sender=LeaveRequest)
+def sync_leave_calendar(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Keep the LeaveDay rows of a leave request in step with it.
+    Deletes cascade; bulk paths call LeaveCalendarService explicitly.
+    """
+    if update_fields and not LEAVE_CALENDAR_FIELDS & set(update_fields):
+        return
+    LeaveCalendarService.sync(instance)
+
+
+@receiver(post_save, sender=EmployeeProfile)
+def sync_leave_calendar_department(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields and "department" not in update_fields):
+        return
+    LeaveDay.objects.filter(profile=instance).exclude(
+        department=instance.department).update(department=instance.department)
+
+
+SEARCH_FIELDS = set(search.NAME_FIELDS) | set(search.DOCUMENT_FIELDS)
+
+
+@receiver(post_save, sender=EmployeeProfile)
+def index_employee_for_search(sender, instance, update_fields=None, **kwargs):
+    """
+    Refresh the directory search document. Bulk writers call
+    emp.search.index_profiles themselves.
+    """
+    if update_fields and not SEARCH_FIELDS & set(update_fields):
+        return
+    search.index_profiles([instance])
+
+
+@receiver(post_save, sender=EmployeeProfile)
+def update_typeahead(sender, instance, **kwargs):
+    transaction.on_commit(lambda: typeahead.index.update(instance))
+
+
+@receiver(post_delete, sender=EmployeeProfile)
+def remove_from_typeahead(sender, instance, **kwargs):
+    """
+    Drop the entry here; other workers cannot see a delete through
+    updated_at, so they are told to rebuild.
+    """
+    pk = instance.pk
+    transaction.on_commit(lambda: typeahead.index.remove(pk))
+    transaction.on_commit(typeahead.invalidate)
@@ -0,0 +1,593 @@
+# emp/synthetic.py
+"""
+Deterministic synthetic HR dataset for load testing.
+
+Everything except primary keys and emp_ids is derived from the seed, the
+requested size and the end date, so two runs with the same arguments
+produce the same organisation, attendance history, leaves, timesheets,
+notifications, projects and support tickets.
+
+Rows are written with bulk_create in batches. save() hooks and model
+signals do not run, so derived fields (durations, day names, leave
+balances, the monthly attendance rollup) are filled in explicitly.
+"""
+import random
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from emp.constants import EMPLOYEE_DEPARTMENT_CHOICES
+from emp.models import (
+    Attendance,
+    EmployeeProfile,
+    LeaveBalance,
+    LeaveLedgerEntry,
+    LeaveRequest,
+    Notification,
+    TimesheetEntry,
+)
+from emp import search, typeahead
+from emp.services import AttendanceRollupService, LeaveCalendarService
+from emp.utils import reserve_emp_ids
+from projects.models import Project, ProjectModule, Task
+from support.models import SupportMessage, SupportTicket
+from HRM.cache import invalidate_groups, GROUP_ATTENDANCE, GROUP_LEAVE, GROUP_EMPLOYEES
+
+
+User = get_user_model()
+
+EMAIL_DOMAIN = "synthetic.example.com"
+
+FIRST_NAMES = [
+    "Aarav", "Aditi", "Akash", "Ananya", "Arjun", "Bhavya", "Chetan", "Deepa",
+    "Divya", "Farhan", "Gaurav", "Harini", "Ishaan", "Jyoti", "Karan", "Kavya",
+    "Lakshmi", "Manish", "Meera", "Naveen", "Neha", "Pooja", "Pranav", "Priya",
+    "Rahul", "Ramya", "Rohan", "Sanjay", "Shreya", "Siddharth", "Sneha",
+    "Suresh", "Swathi", "Tarun", "Uma", "Varun", "Vidya", "Vikram", "Yash",
+    "Zoya",
+]
+
+LAST_NAMES = [
+    "Agarwal", "Bhat", "Chowdary", "Das", "Desai", "Gupta", "Iyer", "Jain",
+    "Kapoor", "Kumar", "Menon", "Mishra", "Nair", "Patel", "Pillai", "Rao",
+    "Reddy", "Shah", "Sharma", "Singh", "Srinivasan", "Varma", "Verma",
+    "Yadav",
+]
+
+DEPARTMENTS = [
+    value for value, _ in EMPLOYEE_DEPARTMENT_CHOICES if value != "HR"
+]
+
+WORK_ITEMS = [
+    "Code review", "Bug fixing", "Sprint planning", "Client call",
+    "Documentation", "Feature development", "Testing", "Deployment",
+    "Design discussion", "Knowledge transfer",
+]
+
+LEAVE_TYPES = [("CASUAL", 45), ("SICK", 30), ("PAID", 20), ("UNPAID", 5)]
+
+LEAVE_ALLOCATION = {"CASUAL": 12, "SICK": 8, "PAID": 15}
+
+LEAVE_STATUSES = [
+    ("hr_approved", 60), ("applied", 8), ("tl_approved", 7),
+    ("tl_rejected", 6), ("hr_rejected", 5), ("cancelled", 7),
+    ("completed", 7),
+]
+
+APPROVED_LEAVE_STATUSES = ("hr_approved", "completed")
+
+NOTIFICATION_TITLES = {
+    "announcement": "Company announcement",
+    "meeting": "Meeting scheduled",
+    "birthday": "Birthday wishes",
+    "anniversary": "Work anniversary",
+    "leave": "Leave status updated",
+    "payroll": "Payslip generated",
+    "policy": "Policy updated",
+}
+
+# Timestamp fields whose auto_now / auto_now_add is suspended while
+# generating, so rows can carry historic dates.
+HISTORIC_TIMESTAMPS = [
+    (EmployeeProfile, "created_at"),
+    (Attendance, "created_at"),
+    (Attendance, "updated_at"),
+    (LeaveRequest, "applied_at"),
+    (Notification, "created_at"),
+    (Project, "created_at"),
+    (Task, "assigned_date"),
+    (SupportTicket, "created_at"),
+    (SupportTicket, "updated_at"),
+    (SupportMessage, "created_at"),
+]
+
+
+@contextmanager
+def historic_timestamps():
+    fields = [model._meta.get_field(name) for model, name in HISTORIC_TIMESTAMPS]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _weighted(rng, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights=weights)[0]
+
+
+def _weekdays(start, end):
+    day = start
+    while day <= end:
+        if day.weekday() < 5:
+            yield day
+        day += timedelta(days=1)
+
+
+class _BatchWriter:
+    """Buffers unsaved instances per model and bulk-inserts them in batches."""
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.pending = defaultdict(list)
+        self.counts = Counter()
+
+    def add(self, obj):
+        rows = self.pending[type(obj)]
+        rows.append(obj)
+        if len(rows) >= self.batch_size:
+            self.flush(type(obj))
+
+    def flush(self, model=None):
+        models = [model] if model else list(self.pending)
+        for m in models:
+            rows = self.pending.pop(m, [])
+            if rows:
+                m.objects.bulk_create(rows, batch_size=self.batch_size)
+                self.counts[m._meta.label] += len(rows)
+
+
+class SyntheticDataGenerator:
+    """
+    Builds an organisation of `employees` people:
+
+        management -> HR / IT / delivery managers -> project managers
+        -> team leads (one per `team_size` staff, per department) -> staff
+
+    with `years` of weekday attendance and timesheets up to `until`.
+    Requires a database that returns primary keys from bulk_create
+    (PostgreSQL, SQLite 3.35+).
+    """
+
+    MIN_EMPLOYEES = 10
+
+    def __init__(self, employees, years=1, seed=1, until=None, team_size=8,
+                 notifications=20, prefix="synth", password="Password@123",
+                 batch_size=1000, log=None):
+        if employees < self.MIN_EMPLOYEES:
+            raise ValueError(
+                f"At least {self.MIN_EMPLOYEES} employees are required")
+        if years < 1:
+            raise ValueError("years must be at least 1")
+        if team_size < 1:
+            raise ValueError("team_size must be at least 1")
+
+        self.employees = employees
+        self.years = years
+        self.seed = seed
+        self.until = until or timezone.localdate() - timedelta(days=1)
+        self.start = self.until - timedelta(days=365 * years - 1)
+        self.team_size = team_size
+        self.notifications = notifications
+        self.prefix = prefix
+        self.password = password
+        self.batch_size = batch_size
+        self.log = log or (lambda message: None)
+        self.tz = timezone.get_current_timezone()
+        self.writer = _BatchWriter(batch_size)
+
+        self.people = []
+        self.member_tasks = defaultdict(list)
+
+    def _rng(self, *scope):
+        return random.Random(":".join(str(part) for part in (self.seed,) + scope))
+
+    def _at(self, day, clock):
+        return datetime.combine(day, clock, tzinfo=self.tz)
+
+    def _random_moment(self, rng, start, end):
+        day = start + timedelta(days=rng.randint(0, (end - start).days))
+        return self._at(day, time(rng.randint(9, 18), rng.randint(0, 59)))
+
+    # ---------------- organisation ----------------
+
+    def _person(self, rng, role, department, lead=None):
+        person = {
+            "index": len(self.people),
+            "role": role,
+            "department": department,
+            "lead": lead,
+            "first_name": rng.choice(FIRST_NAMES),
+            "last_name": rng.choice(LAST_NAMES),
+            "joined": self.until - timedelta(
+                days=rng.randint(30, 365 * (self.years + 2))),
+            "is_active": rng.random() >= 0.03,
+        }
+        self.people.append(person)
+        return person
+
+    def plan(self):
+        """
+        Lay out roles, departments and reporting lines in memory.
+        """
+        rng = self._rng("plan")
+        n = self.employees
+
+        management = self._person(rng, User.ROLE_MANAGEMENT, None)
+        hr = [self._person(rng, User.ROLE_HR, "HR", management)
+              for _ in range(max(1, n // 100))]
+        it = [self._person(rng, User.ROLE_IT, "Networking", management)
+              for _ in range(max(1, n // 250))]
+        dms = [self._person(rng, User.ROLE_DM, rng.choice(DEPARTMENTS), management)
+               for _ in range(max(1, n // 250))]
+        pms = [self._person(rng, User.ROLE_PM, rng.choice(DEPARTMENTS), rng.choice(dms))
+               for _ in range(max(1, n // 100))]
+
+        staff = defaultdict(int)
+        for _ in range(n - len(self.people)):
+            staff[rng.choice(DEPARTMENTS)] += 1
+
+        self.leads_by_department = defaultdict(list)
+        for department in DEPARTMENTS:
+            remaining = staff[department]
+            while remaining:
+                tl = self._person(rng, User.ROLE_TL, department, rng.choice(pms))
+                self.leads_by_department[department].append(tl)
+                tl["team"] = []
+                remaining -= 1
+                for _ in range(min(self.team_size, remaining)):
+                    role = User.ROLE_INTERN if rng.random() < 0.05 else User.ROLE_EMPLOYEE
+                    tl["team"].append(self._person(rng, role, department, tl))
+                    remaining -= 1
+
+        self.hr, self.it, self.dms, self.pms = hr, it, dms, pms
+        self.tls = [tl for leads in self.leads_by_department.values() for tl in leads]
+
+    def create_people(self):
+        password = make_password(self.password)
+        emp_ids = reserve_emp_ids(len(self.people), purpose="synthetic")
+
+        for offset in range(0, len(self.people), self.batch_size):
+            batch = self.people[offset:offset + self.batch_size]
+            users = User.objects.bulk_create([
+                User(
+                    username=f"{self.prefix}{p['index']:06d}",
+                    email=f"{self.prefix}{p['index']:06d}@{EMAIL_DOMAIN}",
+                    first_name=p["first_name"],
+                    last_name=p["last_name"],
+                    role=p["role"],
+                    password=password,
+                    is_active=p["is_active"],
+                    date_joined=self._at(p["joined"], time(9, 0)),
+                )
+                for p in batch
+            ])
+            for p, user in zip(batch, users):
+                p["user_id"] = user.pk
+
+        for offset in range(0, len(self.people), self.batch_size):
+            batch = self.people[offset:offset + self.batch_size]
+            profiles = EmployeeProfile.objects.bulk_create([
+                EmployeeProfile(
+                    user_id=p["user_id"],
+                    emp_id=emp_ids[p["index"]],
+                    work_email=f"{self.prefix}{p['index']:06d}@{EMAIL_DOMAIN}",
+                    username=f"{self.prefix}{p['index']:06d}",
+                    first_name=p["first_name"],
+                    last_name=p["last_name"],
+                    department=p["department"],
+                    designation=p["role"].replace("_", " ").title(),
+                    role=p["role"],
+                    team_lead_id=p["lead"]["user_id"] if p["lead"] else None,
+                    date_of_joining=p["joined"],
+                    start_date=p["joined"],
+                    employment_type="Intern" if p["role"] == User.ROLE_INTERN else "Full Time",
+                    is_active=p["is_active"],
+                    exit_reason=None if p["is_active"] else "Resigned",
+                    created_at=self._at(p["joined"], time(9, 0)),
+                )
+                for p in batch
+            ])
+            for p, profile in zip(batch, profiles):
+                p["profile_id"] = profile.pk
+
+        self.writer.counts[User._meta.label] += len(self.people)
+        self.writer.counts[EmployeeProfile._meta.label] += len(self.people)
+
+    # ---------------- projects ----------------
+
+    def create_projects(self):
+        rng = self._rng("projects")
+        project_count = max(1, self.employees // 50)
+
+        projects = Project.objects.bulk_create([
+            Project(
+                name=f"Project {index + 1:04d}",
+                description="Synthetic project",
+                delivery_manager_id=rng.choice(self.dms)["user_id"],
+                project_manager_id=rng.choice(self.pms)["user_id"],
+                status=rng.choice(["in_progress", "in_progress", "at_risk",
+                                   "on_hold", "completed"]),
+                created_at=self._random_moment(rng, self.start, self.until),
+            )
+            for index in range(project_count)
+        ], batch_size=self.batch_size)
+
+        module_leads = []
+        modules = []
+        for project in projects:
+            for number in range(rng.randint(2, 5)):
+                tl = rng.choice(self.tls)
+                module_leads.append(tl)
+                modules.append(ProjectModule(
+                    project=project,
+                    name=f"{project.name} / Module {number + 1}",
+                    team_lead_id=tl["user_id"],
+                    status=rng.choice(["assigned", "in_progress", "completed"]),
+                ))
+        modules = ProjectModule.objects.bulk_create(modules, batch_size=self.batch_size)
+
+        tasks = []
+        owners = []
+        for module, tl in zip(modules, module_leads):
+            for member in tl["team"]:
+                for number in range(rng.randint(1, 2)):
+                    tasks.append(Task(
+                        module=module,
+                        title=f"{rng.choice(WORK_ITEMS)} #{number + 1}",
+                        assigned_to_id=member["user_id"],
+                        created_by_id=tl["user_id"],
+                        status=rng.choice(["assigned", "in_progress", "review", "completed"]),
+                        assigned_date=self.start + timedelta(
+                            days=rng.randint(0, (self.until - self.start).days)),
+                        due_date=self.until + timedelta(days=rng.randint(-60, 60)),
+                    ))
+                    owners.append(member["index"])
+        tasks = Task.objects.bulk_create(tasks, batch_size=self.batch_size)
+
+        for task, owner in zip(tasks, owners):
+            self.member_tasks[owner].append((task.pk, task.title))
+
+        self.writer.counts[Project._meta.label] += len(projects)
+        self.writer.counts[ProjectModule._meta.label] += len(modules)
+        self.writer.counts[Task._meta.label] += len(tasks)
+
+    # ---------------- per-employee activity ----------------
+
+    def _leaves(self, rng, person, start):
+        taken = set()
+        approved = set()
+        used = Counter()
+        window = (self.until - start).days
+
+        for _ in range(rng.randint(2, 6) * self.years):
+            first = start + timedelta(days=rng.randint(0, window))
+            days = list(_weekdays(first, first + timedelta(days=rng.randint(0, 4))))
+            if not days or taken.intersection(days):
+                continue
+            taken.update(days)
+
+            status = _weighted(rng, LEAVE_STATUSES)
+            leave_type = _weighted(rng, LEAVE_TYPES)
+            if status in APPROVED_LEAVE_STATUSES:
+                approved.update(days)
+                used[leave_type] += len(days)
+
+            hr_acted = status in ("hr_approved", "hr_rejected", "completed")
+            tl_acted = hr_acted or status in ("tl_approved", "tl_rejected")
+            applied_at = self._at(
+                first - timedelta(days=rng.randint(1, 14)), time(10, 0))
+            self.writer.add(LeaveRequest(
+                profile_id=person["profile_id"],
+                leave_type=leave_type,
+                start_date=days[0],
+                end_date=days[-1],
+                days=Decimal(len(days)),
+                reason="Personal",
+                applied_at=applied_at,
+                status=status,
+                tl_id=person["lead"]["user_id"] if tl_acted and person["lead"] else None,
+                hr_id=rng.choice(self.hr)["user_id"] if hr_acted else None,
+                last_action_at=applied_at + timedelta(days=1) if tl_acted else None,
+            ))
+
+        for leave_type, allocated in LEAVE_ALLOCATION.items():
+            balance = LeaveBalance(
+                profile_id=person["profile_id"],
+                leave_type=leave_type,
+                total_allocated=Decimal(allocated * self.years),
+                used=Decimal(used[leave_type]),
+            )
+            self.writer.add(balance)
+            for entry_type, amount in (("credit", balance.total_allocated),
+                                       ("debit", balance.used)):
+                if amount:
+                    self.writer.add(LeaveLedgerEntry(
+                        profile_id=person["profile_id"],
+                        leave_type=leave_type,
+                        entry_type=entry_type,
+                        reason="opening",
+                        amount=amount,
+                    ))
+        return approved
+
+    def _timesheet(self, rng, person, day, clock_in, worked):
+        tasks = self.member_tasks.get(person["index"])
+        cursor = clock_in
+        end = clock_in + timedelta(seconds=worked - 3600)
+        while cursor < end:
+            finish = min(cursor + timedelta(seconds=rng.randint(2 * 3600, 5 * 3600)), end)
+            if tasks and rng.random() < 0.7:
+                task_id, title = rng.choice(tasks)
+            else:
+                task_id, title = None, rng.choice(WORK_ITEMS)
+            self.writer.add(TimesheetEntry(
+                profile_id=person["profile_id"],
+                date=day,
+                day=day.strftime("%A"),
+                task=title,
+                start_time=cursor,
+                end_time=finish,
+                duration_seconds=int((finish - cursor).total_seconds()),
+                project_task_id=task_id,
+            ))
+            cursor = finish
+
+    def _attendance(self, rng, person, start, on_leave):
+        for day in _weekdays(start, self.until):
+            if day in on_leave or rng.random() < 0.03:
+                continue
+
+            roll = rng.random()
+            if roll < 0.05:
+                status, worked = "halfday", rng.randint(4 * 3600, 8 * 3600)
+            elif roll < 0.07:
+                status, worked = "absent", rng.randint(600, 2 * 3600 - 1)
+            else:
+                status, worked = "present", rng.randint(9 * 3600, 10 * 3600 + 1800)
+
+            clock_in = self._at(day, time(9, 0)) + timedelta(minutes=rng.randint(-30, 75))
+            clock_out = clock_in + timedelta(seconds=worked)
+            self.writer.add(Attendance(
+                user_id=person["user_id"],
+                date=day,
+                clock_in=clock_in,
+                clock_out=clock_out,
+                duration_time=clock_out - clock_in,
+                duration_seconds=worked,
+                status=status,
+                late_arrivals=clock_in.time() > time(9, 45),
+                created_at=clock_in,
+                updated_at=clock_out,
+            ))
+
+            if status != "absent":
+                self._timesheet(rng, person, day, clock_in, worked)
+
+    def _notifications(self, rng, person):
+        recent = self.until - timedelta(days=7)
+        for _ in range(self.notifications):
+            notif_type = rng.choice(list(NOTIFICATION_TITLES))
+            created_at = self._random_moment(rng, self.start, self.until)
+            self.writer.add(Notification(
+                to_user_id=person["user_id"],
+                title=NOTIFICATION_TITLES[notif_type],
+                body=f"{NOTIFICATION_TITLES[notif_type]} for {person['first_name']}",
+                notif_type=notif_type,
+                is_read=rng.random() < (0.3 if created_at.date() > recent else 0.8),
+                created_at=created_at,
+            ))
+
+    def create_activity(self):
+        for number, person in enumerate(self.people, start=1):
+            rng = self._rng("activity", person["index"])
+            start = max(person["joined"], self.start)
+
+            on_leave = self._leaves(rng, person, start)
+            self._attendance(rng, person, start, on_leave)
+            self._notifications(rng, person)
+
+            if number % self.batch_size == 0:
+                self.log(f"  activity: {number}/{len(self.people)} employees")
+        self.writer.flush()
+
+    # ---------------- support ----------------
+
+    def create_tickets(self):
+        rng = self._rng("support")
+        handlers = {"HR": self.hr, "PAYROLL": self.hr, "IT": self.it}
+        pending = []
+
+        def flush():
+            tickets = SupportTicket.objects.bulk_create(
+                [ticket for ticket, _ in pending], batch_size=self.batch_size)
+            for ticket, (_, messages) in zip(tickets, pending):
+                for message in messages:
+                    message.ticket = ticket
+                    self.writer.add(message)
+            self.writer.flush(SupportMessage)
+            self.writer.counts[SupportTicket._meta.label] += len(tickets)
+            pending.clear()
+
+        for person in self.people:
+            if rng.random() >= 0.3:
+                continue
+            for _ in range(rng.randint(1, 2)):
+                category = rng.choice(["HR", "IT", "PAYROLL", "PROJECT", "OTHER"])
+                handler = rng.choice(handlers[category]) if category in handlers else None
+                created_at = self._random_moment(rng, self.start, self.until)
+                ticket = SupportTicket(
+                    created_by_id=person["user_id"],
+                    category=category,
+                    priority=rng.choice(["LOW", "MEDIUM", "MEDIUM", "HIGH"]),
+                    subject=f"{category.title()} request",
+                    status=rng.choice(["OPEN", "IN_PROGRESS", "WAITING", "CLOSED", "CLOSED"]),
+                    assigned_to_id=handler["user_id"] if handler else None,
+                    created_at=created_at,
+                    updated_at=created_at,
+                )
+                messages = []
+                for number in range(rng.randint(1, 3)):
+                    sender = handler if handler and number % 2 else person
+                    messages.append(SupportMessage(
+                        sender_id=sender["user_id"],
+                        message="Following up on this request.",
+                        created_at=created_at + timedelta(hours=number),
+                    ))
+                pending.append((ticket, messages))
+
+            if len(pending) >= self.batch_size:
+                flush()
+        if pending:
+            flush()
+
+    # ---------------- entry point ----------------
+
+    def run(self):
+        """
+        Generate the dataset and rebuild the attendance rollup.
+        Returns {model label: rows written}.
+        """
+        if User.objects.filter(username__startswith=self.prefix).exists():
+            raise ValueError(
+                f"Users with prefix '{self.prefix}' already exist; "
+                "use another --prefix or a fresh database")
+
+        self.plan()
+        with historic_timestamps(), transaction.atomic():
+            self.log(f"Creating {len(self.people)} employees")
+            self.create_people()
+            self.log("Creating projects, modules and tasks")
+            self.create_projects()
+            self.log(f"Creating activity {self.start} .. {self.until}")
+            self.create_activity()
+            self.log("Creating support tickets")
+            self.create_tickets()
+
+        self.log("Rebuilding attendance rollup, leave calendar and search index")
+        AttendanceRollupService.rebuild()
+        LeaveCalendarService.rebuild()
+        search.rebuild()
+        invalidate_groups(GROUP_ATTENDANCE, GROUP_LEAVE, GROUP_EMPLOYEES)
+        typeahead.invalidate()
+        return dict(self.writer.counts)
@@ -0,0 +1,189 @@
+import csv
+import io
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from emp import search, typeahead
+from emp.importers import EmployeeSync
+from emp.models import EmployeeProfile, LeaveBalance
+from emp.serializers import EmployeeProfileReadSerializer
+from emp.services import LeaveAccrualService
+from HRM.cache import invalidate_groups, GROUP_EMPLOYEES
+
+User = get_user_model()
+
+
+def sync_rows(rows, **options):
+    fh = io.StringIO()
+    writer = csv.DictWriter(fh, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows(rows)
+    fh.seek(0)
+    return EmployeeSync(**options).run(csv.DictReader(fh))
+
+
+def employee_rows(count, **columns):
+    return [
+        {
+            "emp_id": f"WZG-AI-{n:04d}",
+            "work_email": f"employee{n}@example.com",
+            "first_name": "Employee",
+            "last_name": str(n),
+            **columns,
+        }
+        for n in range(1, count + 1)
+    ]
+
+
+class EmployeeSyncTests(TestCase):
+
+    def test_missing_employee_is_reactivated_when_back_in_file(self):
+        rows = employee_rows(20)
+        self.assertEqual(sync_rows(rows).created, 20)
+
+        result = sync_rows([row for row in rows if row["emp_id"] != "WZG-AI-0002"])
+        self.assertEqual(result.deactivated, 1)
+        profile = EmployeeProfile.objects.select_related("user").get(emp_id="WZG-AI-0002")
+        self.assertFalse(profile.is_active)
+        self.assertFalse(profile.user.is_active)
+
+        result = sync_rows(rows)
+        self.assertEqual((result.updated, result.unchanged, result.deactivated), (1, 19, 0))
+        profile.refresh_from_db()
+        profile.user.refresh_from_db()
+        self.assertTrue(profile.is_active)
+        self.assertTrue(profile.user.is_active)
+
+
+class EmployeeSearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        rows = employee_rows(4000, department="Engineering")
+        rows[-1]["first_name"] = "Engelbert"
+        sync_rows(rows)
+
+    def test_broad_query_ranks_in_one_pass(self):
+        # Every profile matches "eng"; ranking must not re-run the
+        # full-text query per row.
+        search.backend()
+        started = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            results = search.search("eng")
+            self.assertEqual(results.count(), 4000)
+            page = list(results.values_list("emp_id", flat=True)[:20])
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertEqual(page[0], "WZG-AI-4000")
+        self.assertEqual(len(queries), 2)
+        if search.backend() == "fts5":
+            for query in queries:
+                self.assertEqual(query["sql"].count(" MATCH "), 1, query["sql"])
+
+    def test_every_word_must_match(self):
+        self.assertEqual(
+            list(search.search("engelbert engineering").values_list("emp_id", flat=True)),
+            ["WZG-AI-4000"])
+        self.assertFalse(search.search("engelbert sales").exists())
+
+
+class TypeaheadIndexTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        sync_rows(employee_rows(50))
+
+    def setUp(self):
+        self.index = typeahead.TypeaheadIndex()
+        self.index.lookup("employee")
+
+    def lookup(self, query):
+        self.index._checked_at = 0.0
+        return [entry["emp_id"] for entry in self.index.lookup(query, active=None)]
+
+    def test_save_elsewhere_is_applied_without_rebuild(self):
+        EmployeeProfile.objects.filter(emp_id="WZG-AI-0007").update(
+            first_name="Zephyr", updated_at=timezone.now())
+        invalidate_groups(GROUP_EMPLOYEES)
+        with mock.patch.object(self.index, "_load", side_effect=AssertionError("rebuilt")):
+            self.assertEqual(self.lookup("zeph"), ["WZG-AI-0007"])
+
+    def test_delete_elsewhere_rebuilds(self):
+        # a create and a delete in the same window leave the count unchanged
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.create_user(
+                username="zephyr", email="zephyr@example.com", first_name="Zephyr")
+            EmployeeProfile.objects.filter(emp_id="WZG-AI-0007").delete()
+        self.assertEqual(self.lookup("0007"), [])
+        self.assertEqual(len(self.lookup("zeph")), 1)
+
+    def test_bulk_write_rebuilds(self):
+        EmployeeProfile.objects.filter(emp_id="WZG-AI-0007").update(first_name="Zephyr")
+        typeahead.invalidate()
+        self.assertEqual(self.lookup("zeph"), ["WZG-AI-0007"])
+
+
+class LeaveAccrualOrderTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        sync_rows(employee_rows(1))
+        cls.profile = EmployeeProfile.objects.get()
+
+    def casual(self):
+        return LeaveBalance.objects.get(profile=self.profile, leave_type="CASUAL").available()
+
+    def test_year_end_runs_between_december_and_january(self):
+        LeaveAccrualService.run_monthly(2024, 12)
+        with self.assertRaises(ValueError):
+            LeaveAccrualService.run_monthly(2025, 1)
+
+        LeaveAccrualService.run_year_end(2024)
+        self.assertEqual(self.casual(), 0)
+        LeaveAccrualService.run_monthly(2025, 1)
+        self.assertEqual(self.casual(), 1)
+        self.assertIsNone(LeaveAccrualService.run_year_end(2024))
+        # 2024 accruals exist, so closing 2023 now would lapse them
+        with self.assertRaises(ValueError):
+            LeaveAccrualService.run_year_end(2023)
+
+    def test_year_end_refuses_a_year_that_has_not_ended(self):
+        with self.assertRaises(ValueError):
+            LeaveAccrualService.run_year_end(timezone.localdate().year)
+
+
+class EmployeeProfileReadSerializerTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        sync_rows(employee_rows(5))
+
+    def setUp(self):
+        self.request = RequestFactory().get("/api/employees/")
+
+    def test_document_urls_match_reverse(self):
+        profile = EmployeeProfile.objects.first()
+        serializer = EmployeeProfileReadSerializer(context={"request": self.request})
+        for emp_id in ("WZG-AI-0001", "a b", "ü@:~x", "50%", "x?y#z"):
+            profile.emp_id = emp_id
+            for doc_field in ("aadhaar_image", "profile_photo"):
+                expected = self.request.build_absolute_uri(reverse(
+                    "protected_employee_document", args=[emp_id, doc_field]))
+                self.assertEqual(serializer.document_url(profile, doc_field), expected)
+
+    def test_list_matches_per_row(self):
+        profiles = EmployeeProfile.objects.select_related("user", "team_lead").order_by("id")
+        per_row = [
+            EmployeeProfileReadSerializer(profile, context={"request": self.request}).data
+            for profile in profiles
+        ]
+        listed = EmployeeProfileReadSerializer(
+            profiles, many=True, context={"request": self.request}).data
+        self.assertEqual(listed, per_row)
+        self.assertTrue(per_row[0]["protected_aadhaar_image_url"])
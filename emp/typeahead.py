@@ -0,0 +1,181 @@
+"""
+In-process prefix index for people pickers (team lead, project manager,
+task assignee).
+
+Each worker keeps every employee's name and emp_id tokens (normalised as in
+emp.search) in one sorted array, so a prefix lookup is a bisect plus a
+slice, with no database round trip. The index is built on the first lookup
+in a process and kept current three ways:
+
+    EmployeeProfile post_save / post_delete in this process update the
+    affected entry in place (emp/signals.py);
+
+    saves in other processes bump the employees cache group; a worker that
+    sees a new version (checked at most every VERSION_CHECK_INTERVAL
+    seconds) re-reads only the profiles whose updated_at moved since its
+    last sync;
+
+    deletes, which leave no row to re-read, and bulk writers, which bypass
+    updated_at, call invalidate() and every worker rebuilds from the
+    database.
+"""
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import timedelta
+
+from django.utils import timezone
+
+from HRM.cache import group_version, invalidate_groups, GROUP_EMPLOYEES
+
+from .models import EmployeeProfile
+from .search import normalize, terms
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+VERSION_CHECK_INTERVAL = 2
+
+# Bumped only by bulk writers; a new version means a full rebuild.
+REBUILD_GROUP = "typeahead"
+# A delta re-reads from this long before the previous sync, covering
+# transactions that committed late and clock skew between hosts.
+DELTA_OVERLAP = timedelta(seconds=60)
+
+FIELDS = ("id", "user_id", "username", "emp_id", "first_name", "last_name",
+          "role", "department", "is_active")
+
+
+def _entry(row):
+    return {
+        "id": row["id"],
+        "user_id": row["user_id"],
+        "username": row["username"],
+        "emp_id": row["emp_id"],
+        "name": f"{row['first_name'] or ''} {row['last_name'] or ''}".strip(),
+        "role": row["role"],
+        "department": row["department"],
+        "is_active": row["is_active"],
+    }
+
+
+def _tokens(entry):
+    return set(normalize(entry["name"], entry["emp_id"]).split())
+
+
+def invalidate():
+    """Make every worker rebuild its index (after deletes and bulk writes)."""
+    invalidate_groups(REBUILD_GROUP)
+
+
+class TypeaheadIndex:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._keys = []       # sorted (token, profile_id)
+        self._versions = None     # (REBUILD_GROUP, GROUP_EMPLOYEES) versions
+        self._synced_at = None
+        self._checked_at = 0.0
+
+    def _load(self, versions):
+        synced_at = timezone.now()
+        entries = {
+            row["id"]: _entry(row)
+            for row in EmployeeProfile.objects.values(*FIELDS).iterator()
+        }
+        keys = sorted(
+            (token, pk) for pk, entry in entries.items() for token in _tokens(entry))
+        with self._lock:
+            self._entries, self._keys = entries, keys
+            self._versions, self._synced_at = versions, synced_at
+
+    def _refresh(self, versions):
+        synced_at = timezone.now()
+        rows = list(EmployeeProfile.objects.filter(
+            updated_at__gte=self._synced_at - DELTA_OVERLAP).values(*FIELDS))
+        with self._lock:
+            for row in rows:
+                self._put(_entry(row))
+            self._versions, self._synced_at = versions, synced_at
+
+    def _ensure_fresh(self):
+        now = time.monotonic()
+        if self._versions is not None and now - self._checked_at < VERSION_CHECK_INTERVAL:
+            return
+        self._checked_at = now
+        versions = (group_version(REBUILD_GROUP), group_version(GROUP_EMPLOYEES))
+        if self._versions is None or versions[0] != self._versions[0]:
+            self._load(versions)
+        elif versions != self._versions:
+            self._refresh(versions)
+
+    def _remove(self, pk):
+        entry = self._entries.pop(pk, None)
+        if entry is None:
+            return
+        for token in _tokens(entry):
+            i = bisect_left(self._keys, (token, pk))
+            if i < len(self._keys) and self._keys[i] == (token, pk):
+                del self._keys[i]
+
+    def _put(self, entry):
+        self._remove(entry["id"])
+        self._entries[entry["id"]] = entry
+        for token in _tokens(entry):
+            insort(self._keys, (token, entry["id"]))
+
+    def update(self, profile):
+        """Apply one saved profile in place (no-op until the index is built)."""
+        if self._versions is None:
+            return
+        entry = _entry({field: getattr(profile, field) for field in FIELDS})
+        with self._lock:
+            self._put(entry)
+
+    def remove(self, pk):
+        if self._versions is None:
+            return
+        with self._lock:
+            self._remove(pk)
+
+    def _matches(self, prefix):
+        keys = self._keys
+        i = bisect_left(keys, (prefix,))
+        found = set()
+        while i < len(keys) and keys[i][0].startswith(prefix):
+            found.add(keys[i][1])
+            i += 1
+        return found
+
+    def lookup(self, query, roles=None, active=True, limit=DEFAULT_LIMIT):
+        """
+        Entries matching every word of `query` as a prefix of some name or
+        emp_id token, names starting with the first word first.
+        `active` None returns active and inactive employees.
+        """
+        words = terms(query)
+        if not words:
+            return []
+        self._ensure_fresh()
+
+        with self._lock:
+            # rarest word first keeps the intersection small
+            candidates = None
+            for matched in sorted((self._matches(word) for word in words), key=len):
+                candidates = matched if candidates is None else candidates & matched
+                if not candidates:
+                    return []
+            entries = [self._entries[pk] for pk in candidates]
+
+        if roles:
+            entries = [entry for entry in entries if entry["role"] in roles]
+        if active is not None:
+            entries = [entry for entry in entries if entry["is_active"] == active]
+
+        first = words[0]
+        entries.sort(key=lambda entry: (
+            not entry["name"].lower().startswith(first), entry["name"].lower(), entry["id"]))
+        return entries[:limit]
+
+
+index = TypeaheadIndex()
@@ -8,6 +8,12 @@ urlpatterns = [
 
     path('my-profile/', views.MyProfileView.as_view(), name='my-profile'),
 
+    path('employees/search/', views.EmployeeSearchAPIView.as_view(),
+         name='employee-search'),
+
+    path('employees/typeahead/', views.EmployeeTypeaheadAPIView.as_view(),
+         name='employee-typeahead'),
+
     path('my-profile/contact/', views.UpdateContactView.as_view(),
          name='my-profile-contact'),
 
@@ -61,6 +67,12 @@ urlpatterns = [
 
     path('notifications/', views.emp_notifications, name="emp_notifications"),
 
+    path('notifications/feed/', views.NotificationFeedAPIView.as_view(),
+         name="notification_feed"),
+
+    path('notifications/unread-count/', views.NotificationUnreadCountAPIView.as_view(),
+         name="notification_unread_count"),
+
     path('notifications/mark-read/', views.mark_notifications_read,
          name="mark_notifications_read"),
 
@@ -94,6 +106,9 @@ urlpatterns = [
     path('timesheet/hr/yearly/',
          views.TimesheetYearlyForHRAPIView.as_view(), name='timesheet_hr_yearly'),
 
+    path('timesheet/hr/report/',
+         views.TimesheetReportForHRAPIView.as_view(), name='timesheet_hr_report'),
+
     path('timesheet/tl/daily/',
          views.TimesheetDailyForTLAPIView.as_view(), name='timesheet_tl_daily'),
 
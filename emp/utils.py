@@ -1,17 +1,143 @@
-from django.db import transaction
-from .models import EmployeeIDSequence, EmployeeProfile
+from django.db import connection, connections, transaction
+from django.utils import timezone
+
+from .models import EmployeeIDBlock, EmployeeIDSequence, EmployeeProfile
 
 EMP_ID_PREFIX = "WZG-AI"
 EMP_ID_WIDTH = 4
 
+# Native sequence used on PostgreSQL (created in migration 0012). Other
+# backends fall back to the single EmployeeIDSequence row.
+EMP_ID_DB_SEQUENCE = "emp_employee_id_seq"
+
+
+def format_emp_id(number):
+    return f"{EMP_ID_PREFIX}-{number:0{EMP_ID_WIDTH}d}"
+
+
+def _uses_db_sequence():
+    return connection.vendor == "postgresql"
+
+
+def contiguous_runs(numbers):
+    """Split sorted numbers into contiguous (first, last) ranges."""
+    runs = []
+    for number in numbers:
+        if runs and number == runs[-1][1] + 1:
+            runs[-1][1] = number
+        else:
+            runs.append([number, number])
+    return runs
+
+
+def _record_blocks(numbers, purpose):
+    """
+    Write the EmployeeIDBlock rows for `numbers`.
+
+    PostgreSQL sequence values stay consumed when the caller's transaction
+    rolls back, so inside a transaction the rows are committed on a
+    connection of their own; otherwise a failed signup or import would
+    leave an unexplained gap. The EmployeeIDSequence bump rolls back with
+    its caller, so elsewhere the rows share the caller's transaction.
+    """
+    blocks = contiguous_runs(numbers)
+    if not blocks:
+        return
+    if not (_uses_db_sequence() and connection.in_atomic_block):
+        EmployeeIDBlock.objects.bulk_create([
+            EmployeeIDBlock(first=first, last=last, purpose=purpose)
+            for first, last in blocks
+        ])
+        return
+
+    qn = connection.ops.quote_name
+    columns = ", ".join(qn(name) for name in ("first", "last", "purpose", "created_at"))
+    now = timezone.now()
+    audit = connections.create_connection(connection.alias)
+    try:
+        with audit.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {qn(EmployeeIDBlock._meta.db_table)} ({columns}) "
+                "VALUES (%s, %s, %s, %s)",
+                [(first, last, purpose, now) for first, last in blocks]
+            )
+    finally:
+        audit.close()
+
+
+def reserve_emp_id_numbers(count, purpose=""):
+    """
+    Reserve `count` emp_id numbers in one round trip and record them in
+    EmployeeIDBlock.
+
+    On PostgreSQL the numbers come from a native sequence: nextval() never
+    waits on other transactions, so concurrent signups and imports do not
+    serialize (concurrent callers may interleave, giving several blocks).
+    Elsewhere the EmployeeIDSequence row is locked and bumped, which
+    yields one contiguous block.
+    """
+    if count < 1:
+        raise ValueError("count must be at least 1")
+
+    if _uses_db_sequence():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT nextval(%s) FROM generate_series(1, %s)",
+                [EMP_ID_DB_SEQUENCE, count]
+            )
+            numbers = sorted(row[0] for row in cursor.fetchall())
+    else:
+        with transaction.atomic():
+            seq, _ = EmployeeIDSequence.objects.select_for_update().get_or_create(id=1)
+            seq.last_value += count
+            seq.save(update_fields=["last_value", "updated_at"])
+            last = seq.last_value
+        numbers = list(range(last - count + 1, last + 1))
+
+    _record_blocks(numbers, purpose)
+    return numbers
+
+
+def reserve_emp_ids(count, purpose=""):
+    """Formatted emp_ids for `count` freshly reserved numbers."""
+    return [format_emp_id(n) for n in reserve_emp_id_numbers(count, purpose)]
+
 
-@transaction.atomic
 def generate_emp_id():
-    seq, _ = EmployeeIDSequence.objects.select_for_update().get_or_create(id=1)
-    seq.last_value += 1
-    seq.save(update_fields=["last_value"])
+    return reserve_emp_ids(1, purpose="signup")[0]
+
+
+def advance_emp_id_sequence(number, purpose="import"):
+    """
+    Make sure the allocator never hands out `number` or anything below it
+    (used after importing manually assigned emp_ids). The skipped range
+    is recorded as a block so the audit stays gap-free.
+    """
+    if number < 1:
+        return
+    if _uses_db_sequence():
+        # setval() could rewind past a concurrent nextval() and issue its
+        # number twice, so draw the sequence forward with nextval() instead;
+        # the numbers drawn are the skipped range.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT nextval(%s) FROM generate_series(1, %s - ("
+                "SELECT CASE WHEN is_called THEN last_value ELSE last_value - 1 END "
+                f"FROM {EMP_ID_DB_SEQUENCE}))",
+                [EMP_ID_DB_SEQUENCE, number]
+            )
+            numbers = sorted(row[0] for row in cursor.fetchall())
+    else:
+        with transaction.atomic():
+            seq, _ = EmployeeIDSequence.objects.select_for_update().get_or_create(id=1)
+            current = seq.last_value
+            if current >= number:
+                return
+            seq.last_value = number
+            seq.save(update_fields=["last_value", "updated_at"])
+        numbers = range(current + 1, number + 1)
 
-    return f"{EMP_ID_PREFIX}-{seq.last_value:0{EMP_ID_WIDTH}d}"
+    _record_blocks(numbers, purpose)
 
 
 def get_employee_profile_or_404(user):
@@ -1,7 +1,7 @@
 # emp/views.py
 from email import policy
 from emp.utils import generate_emp_id, get_employee_profile_or_404
-from emp.services import AttendanceQueryService, AttendanceReportService, AttendanceService
+from emp.services import AttendanceQueryService, AttendanceReportService, AttendanceService, LeaveCalendarService, LeaveRoutingService
 from .permissions import IsTLOnly, IsHROrManagement, IsTLorHRorOwner, IsEmployee
 from django.utils.dateparse import parse_date, parse_datetime
 from urllib.parse import unquote
@@ -15,6 +15,8 @@ from .serializers import (
 )
 from tl.serializers import TLAnnouncementSerializer
 from .models import TimesheetEntry, TimesheetDay, EmployeeProfile, Notification, Attendance
+from . import notifications
+from .fieldsets import SparseFieldsetViewMixin
 from tl.models import TLAnnouncement
 from django.db import transaction
 import json
@@ -23,7 +25,7 @@ from rest_framework.response import Response
 from rest_framework import status, generics
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404, render
-from django.db.models import Sum, Count, Q
+from django.db.models import Sum, Count, Q, Min, Max
 import calendar
 from datetime import timedelta, time
 from . import models, serializers
@@ -39,6 +41,7 @@ from django.core.exceptions import ValidationError as DjangoValidationError
 from django.http import FileResponse, Http404
 import mimetypes
 from login.models import User as LoginUser
+from HRM.cache import cache_response, GROUP_ATTENDANCE, GROUP_LEAVE, GROUP_EMPLOYEES
 
 
 User = get_user_model()
@@ -80,6 +83,73 @@ def _employee_display_name(prof):
     return getattr(prof, "emp_id", "")
 
 
+def _yearly_timesheet_report(prof, year):
+    """
+    Yearly timesheet report built from one query grouped by day, so memory
+    is O(days) rather than O(entries). A day's entries are fetched on
+    demand with ?date= (_timesheet_day_entries).
+    """
+    day_rows = TimesheetEntry.objects.filter(
+        profile=prof, date__year=year
+    ).values("date").annotate(
+        clock_in=Min("start_time"),
+        clock_out=Max("end_time"),
+        total_seconds=Sum("duration_seconds"),
+        entries_count=Count("id"),
+    ).order_by("date")
+
+    months = [{
+        "month": f"{year}-{month_num:02d}",
+        "total_hours": 0,
+        "days": [],
+    } for month_num in range(1, 13)]
+    month_seconds = [0] * 12
+
+    for row in day_rows:
+        seconds = row["total_seconds"] or 0
+        day = {
+            "date": row["date"].isoformat(),
+            "clock_in": row["clock_in"],
+            "clock_out": row["clock_out"],
+            "total_hours": round(seconds / 3600.0, 2),
+            "entries_count": row["entries_count"],
+        }
+        months[row["date"].month - 1]["days"].append(day)
+        month_seconds[row["date"].month - 1] += seconds
+
+    for month, seconds in zip(months, month_seconds):
+        month["total_hours"] = round(seconds / 3600.0, 2)
+
+    return {
+        "employee": _employee_display_name(prof),
+        "emp_id": prof.emp_id,
+        "year": str(year),
+        "year_total_hours": round(sum(month_seconds) / 3600.0, 2),
+        "months": months,
+    }
+
+
+def _timesheet_day_entries(prof, day):
+    """One day's entries: the drill-down behind a day of the yearly report."""
+    entries = list(TimesheetEntry.objects.filter(
+        profile=prof, date=day).order_by("start_time"))
+    total_seconds = sum(int(entry.duration_seconds or 0) for entry in entries)
+    return {
+        "employee": _employee_display_name(prof),
+        "emp_id": prof.emp_id,
+        "date": day.isoformat(),
+        "total_hours": round(total_seconds / 3600.0, 2),
+        "entries": TimesheetEntrySerializer(entries, many=True).data,
+    }
+
+
+def _parse_day(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        return None
+
+
 class MyProfileView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -148,14 +218,71 @@ class MyProfileView(APIView):
 from rest_framework.viewsets import ModelViewSet
 from .models import EmployeeProfile
 from .serializers import EmployeeSerializer
-from .pagination import EmployeePagination
+from .pagination import EmployeePagination, EmployeeSearchPagination, TimesheetReportPagination
+from . import search, typeahead
 
 
-class EmployeeViewSet(ModelViewSet):
+class EmployeeViewSet(SparseFieldsetViewMixin, ModelViewSet):
     queryset = EmployeeProfile.objects.all()
     serializer_class = EmployeeSerializer
     pagination_class = EmployeePagination
 
+
+class EmployeeSearchAPIView(SparseFieldsetViewMixin, generics.ListAPIView):
+    """
+    Ranked employee directory search over name, emp_id, work email,
+    department, designation, job title and location.
+    ?q= (required), department, role, include_inactive=true (HR/management),
+    page, page_size.
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = serializers.EmployeeDirectorySerializer
+    pagination_class = EmployeeSearchPagination
+
+    def get_queryset(self):
+        params = self.request.query_params
+        qs = EmployeeProfile.objects.all()
+
+        include_inactive = (
+            params.get("include_inactive") == "true" and
+            self.request.user.role in (LoginUser.ROLE_HR, LoginUser.ROLE_MANAGEMENT)
+        )
+        if not include_inactive:
+            qs = qs.filter(is_active=True)
+        if params.get("department"):
+            qs = qs.filter(department__iexact=params["department"])
+        if params.get("role"):
+            qs = qs.filter(role__iexact=params["role"])
+
+        return search.search(params.get("q", ""), qs)
+
+
+class EmployeeTypeaheadAPIView(APIView):
+    """
+    Prefix lookup for people pickers, served from the in-process index.
+    ?q= (required), role=tl,project_manager, active=true (default) | false | all,
+    limit (default 10, max 50).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        params = request.query_params
+        states = {"true": True, "false": False, "all": None}
+        if params.get("active", "true") not in states:
+            return Response({"detail": "active must be true, false or all."}, status=400)
+        active = states[params.get("active", "true")]
+        roles = [r for r in params.get("role", "").split(",") if r]
+        try:
+            limit = min(int(params.get("limit", typeahead.DEFAULT_LIMIT)), typeahead.MAX_LIMIT)
+        except ValueError:
+            return Response({"detail": "limit must be a number."}, status=400)
+
+        return Response({
+            "results": typeahead.index.lookup(
+                params.get("q", ""), roles=roles, active=active, limit=max(limit, 1))
+        })
+
+
 class ProtectedEmployeeDocumentView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -215,18 +342,16 @@ class ProtectedEmployeeDocumentView(APIView):
 class MyNotificationsList(generics.ListAPIView):
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
-    serializer_class = serializers.NotificationSerializer
+    serializer_class = serializers.NotificationFeedSerializer
 
     def get_queryset(self):
-        q = models.Notification.objects.filter(to_user=self.request.user)
-        if self.request.query_params.get('unread') in ('true', '1', 'True'):
-            q = q.filter(is_read=False)
-        return q
+        unread_only = self.request.query_params.get(
+            'unread') in ('true', '1', 'True')
+        return notifications.feed(self.request.user, unread_only=unread_only)
 
     def get(self, request, format=None):
-        notifications = Notification.objects.filter(
-            to_user=request.user).order_by('-created_at')
-        serializer = NotificationSerializer(notifications, many=True)
+        items = notifications.feed_items(self.get_queryset())
+        serializer = serializers.NotificationFeedSerializer(items, many=True)
         return Response({
             "success": True,
             "data": serializer.data
@@ -238,9 +363,75 @@ class MarkNotificationsRead(APIView):
 
     def post(self, request):
         ids = request.data.get('ids', [])
-        models.Notification.objects.filter(
-            id__in=ids, to_user=request.user).update(is_read=True)
-        return Response({"marked": len(ids)})
+        broadcast_ids = request.data.get('broadcast_ids', [])
+        marked = notifications.mark_read(
+            request.user, ids=ids, broadcast_ids=broadcast_ids)
+        return Response({"marked": marked})
+
+
+class NotificationFeedAPIView(APIView):
+    """
+    Cursor-paginated feed of personal and broadcast notifications.
+
+    ?cursor=<next_cursor>   continue after the previous page
+    ?limit=20               page size (max 100)
+    ?unread=true            unread items only
+    ?since=<ISO datetime>   polling: only items newer than this, newest
+                            first; when has_more, repeat with the same
+                            since and ?cursor=<next_cursor> for the rest
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        params = request.query_params
+        unread_only = params.get('unread') in ('true', '1', 'True')
+
+        try:
+            limit = int(params.get('limit', notifications.FEED_PAGE_SIZE))
+        except ValueError:
+            return Response({"detail": "limit must be an integer."}, status=400)
+        limit = max(1, min(limit, notifications.FEED_MAX_PAGE_SIZE))
+
+        payload = {"success": True}
+
+        since = None
+        if params.get('since'):
+            try:
+                since = parse_datetime(params['since'])
+            except ValueError:   # well formed but impossible, e.g. month 13
+                since = None
+            if not since:
+                return Response({"detail": "Invalid since. Use an ISO datetime."}, status=400)
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+
+        try:
+            items, next_cursor = notifications.feed_page(
+                request.user,
+                cursor=params.get('cursor'),
+                limit=limit,
+                unread_only=unread_only,
+                since=since,
+            )
+        except ValueError:
+            return Response({"detail": "Invalid cursor."}, status=400)
+        payload["next_cursor"] = next_cursor
+        if since:
+            payload["has_more"] = next_cursor is not None
+
+        payload["data"] = serializers.NotificationFeedSerializer(
+            items, many=True).data
+        payload["unread_count"] = notifications.unread_count(request.user)
+        return Response(payload)
+
+
+class NotificationUnreadCountAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response({
+            "unread_count": notifications.unread_count(request.user)
+        })
 
 
 class DashboardSummaryAPIView(APIView):
@@ -260,19 +451,18 @@ class DashboardSummaryAPIView(APIView):
             d = timezone.localdate()
             y, m = d.year, d.month
 
-        qs = models.Attendance.objects.filter(
-            user=user, date__year=y, date__month=m, status__in=['present', 'halfday'])
-        days_present = qs.count()
-        total_seconds = qs.aggregate(total=Sum('duration_seconds'))[
-            'total'] or 0
+        summary = models.AttendanceMonthlySummary.objects.filter(
+            user=user, year=y, month=m).first()
+        days_present = (summary.days_present +
+                        summary.halfdays) if summary else 0
+        total_seconds = summary.total_seconds if summary else 0
         monthly_summary = {'year': y, 'month': m, 'days_present': days_present, 'hours': round(
             total_seconds/3600.0, 2)}
 
         project_status = []
 
-        announcements = models.Notification.objects.filter(
-            to_user=user).order_by('-created_at')[:5]
-        ann_ser = serializers.NotificationSerializer(
+        announcements = notifications.feed_items(notifications.feed_head(user, 5))
+        ann_ser = serializers.NotificationFeedSerializer(
             announcements, many=True).data
 
         leave_counts = models.LeaveRequest.objects.filter(
@@ -491,7 +681,9 @@ class MyLeaveRequestsAPIView(generics.ListAPIView):
     serializer_class = serializers.LeaveRequestSerializer
 
     def get_queryset(self):
-        return models.LeaveRequest.objects.filter(profile=self.request.user.employeeprofile)
+        return models.LeaveRequest.objects.filter(
+            profile=self.request.user.employeeprofile
+        ).select_related("profile__user", "profile__team_lead")
 
 
 class HRCreateEmployeeAPIView(APIView):
@@ -622,14 +814,13 @@ class HRTLActionAPIView(APIView):
                     return Response({"detail": e.messages}, status=400)
 
                 # Notify HR
-                for hr_user in User.objects.filter(role__in=["hr", "management"]):
-                    models.Notification.objects.create(
-                        to_user=hr_user,
-                        title=f"TL approved leave: {lr.profile.full_name()}",
-                        body=f"Leave request {lr.id} is awaiting HR action.",
-                        notif_type="leave",
-                        extra={"leave_request_id": lr.id}
-                    )
+                notifications.dispatch(
+                    notifications.roles("hr", "management"),
+                    title=f"TL approved leave: {lr.profile.full_name()}",
+                    body=f"Leave request {lr.id} is awaiting HR action.",
+                    notif_type="leave",
+                    extra={"leave_request_id": lr.id}
+                )
 
                 return Response(
                     {
@@ -1076,11 +1267,23 @@ class TimesheetWorksheetForHRAPIView(APIView):
 
 
 class TimesheetYearlyForHRAPIView(APIView):
+    """
+    ?emp_id=&year=YYYY     per-day totals for the year
+    ?emp_id=&date=YYYY-MM-DD  that day's entries (drill-down)
+    """
     permission_classes = [IsAuthenticated, IsHROrManagement]
 
     def get(self, request):
         raw_emp_id = request.query_params.get("emp_id")
         raw_year = request.query_params.get("year")
+        raw_date = request.query_params.get("date")
+
+        if raw_emp_id and raw_date:
+            day = _parse_day(raw_date)
+            if not day:
+                return Response({"detail": "Invalid date. Use YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
+            prof = get_object_or_404(EmployeeProfile, emp_id=unquote(str(raw_emp_id)).strip())
+            return Response(_timesheet_day_entries(prof, day), status=status.HTTP_200_OK)
 
         if not raw_emp_id or not raw_year:
             return Response({"detail": "emp_id and year are required (YYYY)."}, status=status.HTTP_400_BAD_REQUEST)
@@ -1094,55 +1297,106 @@ class TimesheetYearlyForHRAPIView(APIView):
             return Response({"detail": "Invalid year. Use YYYY (e.g. 2025)."}, status=status.HTTP_400_BAD_REQUEST)
 
         prof = get_object_or_404(EmployeeProfile, emp_id=emp_id)
-        entries_qs = TimesheetEntry.objects.filter(
-            profile=prof, date__year=year).order_by("date", "start_time")
-
-        from collections import defaultdict
-        months_map = defaultdict(lambda: defaultdict(
-            lambda: {"entries": [], "total_seconds": 0, "clock_in": None, "clock_out": None}))
-
-        for e in entries_qs:
-            m = e.date.month
-            d = e.date.isoformat()
-            info = months_map[m][d]
-            info["entries"].append(TimesheetEntrySerializer(e).data)
-            sec = int(e.duration_seconds) if e.duration_seconds is not None else 0
-            info["total_seconds"] += sec
-            if info["clock_in"] is None or e.start_time < info["clock_in"]:
-                info["clock_in"] = e.start_time
-            if info["clock_out"] is None or e.end_time > info["clock_out"]:
-                info["clock_out"] = e.end_time
-
-        months = []
-        year_total_seconds = 0
-        for month_num in range(1, 13):
-            month_days = months_map.get(month_num, {})
-            days_list = []
-            month_total_seconds = 0
-            for d_iso in sorted(month_days.keys()):
-                info = month_days[d_iso]
-                month_total_seconds += info["total_seconds"]
-                days_list.append({
-                    "date": d_iso,
-                    "clock_in": info["clock_in"],
-                    "clock_out": info["clock_out"],
-                    "total_hours": round(info["total_seconds"] / 3600.0, 2),
-                    "entries_count": len(info["entries"]),
-                })
-            months.append({
-                "month": f"{timezone.datetime(year, month_num, 1).strftime('%Y-%m')}",
-                "total_hours": round(month_total_seconds / 3600.0, 2),
-                "days": days_list
-            })
-            year_total_seconds += month_total_seconds
 
-        return Response({
-            "employee": _employee_display_name(prof),
-            "emp_id": prof.emp_id,
-            "year": str(year),
-            "year_total_hours": round(year_total_seconds / 3600.0, 2),
-            "months": months
-        }, status=status.HTTP_200_OK)
+        return Response(
+            _yearly_timesheet_report(prof, year),
+            status=status.HTTP_200_OK)
+
+
+class TimesheetReportForHRAPIView(APIView):
+    """
+    Per-employee timesheet totals for many employees in one call.
+
+    Scope:  ?department=  |  ?team_lead=<TL emp_id>  |  (all active employees)
+    Period: ?date=YYYY-MM-DD  |  ?month=YYYY-MM  |  ?from=&to=  (default: current month)
+    ?include_days=false returns only per-employee totals.
+    Paginated over employees (?page=, ?page_size= up to 500).
+    """
+    permission_classes = [IsAuthenticated, IsHROrManagement]
+    pagination_class = TimesheetReportPagination
+
+    def _period(self, params):
+        today = timezone.localdate()
+        if params.get("date"):
+            d = parse_date(unquote(str(params["date"])).strip())
+            return d, d
+        if params.get("month"):
+            year, month = map(int, unquote(str(params["month"])).strip().split("-"))
+            return timezone.datetime(year, month, 1).date(), timezone.datetime(
+                year, month, calendar.monthrange(year, month)[1]).date()
+        if params.get("from") or params.get("to"):
+            d_from = parse_date(params.get("from") or params["to"])
+            d_to = parse_date(params.get("to") or params["from"])
+            return d_from, d_to
+        return today.replace(day=1), today
+
+    def get(self, request):
+        params = request.query_params
+
+        try:
+            d_from, d_to = self._period(params)
+        except (ValueError, TypeError):
+            return Response({"detail": "Invalid date format. Use YYYY-MM-DD or YYYY-MM."}, status=status.HTTP_400_BAD_REQUEST)
+        if not d_from or not d_to:
+            return Response({"detail": "Invalid date format. Use YYYY-MM-DD or YYYY-MM."}, status=status.HTTP_400_BAD_REQUEST)
+        if d_from > d_to:
+            return Response({"detail": "'from' must be <= 'to'."}, status=status.HTTP_400_BAD_REQUEST)
+
+        include_days = params.get("include_days", "true").lower() not in ("0", "false", "no")
+
+        profiles = EmployeeProfile.objects.filter(is_active=True)
+        if params.get("department"):
+            profiles = profiles.filter(
+                department__iexact=unquote(str(params["department"])).strip())
+        if params.get("team_lead"):
+            profiles = profiles.filter(
+                team_lead__employeeprofile__emp_id=unquote(str(params["team_lead"])).strip())
+        profiles = profiles.only(
+            "id", "emp_id", "first_name", "last_name", "department").order_by("emp_id")
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(profiles, request, view=self)
+
+        day_rows = TimesheetEntry.objects.filter(
+            profile_id__in=[p.id for p in page],
+            date__gte=d_from,
+            date__lte=d_to,
+        ).values("profile_id", "date").annotate(
+            clock_in=Min("start_time"),
+            clock_out=Max("end_time"),
+            total_seconds=Sum("duration_seconds"),
+            entries_count=Count("id"),
+        ).order_by("profile_id", "date")
+
+        days_by_profile = {}
+        for row in day_rows:
+            days_by_profile.setdefault(row["profile_id"], []).append(row)
+
+        results = []
+        for prof in page:
+            days = days_by_profile.get(prof.id, [])
+            total_seconds = sum(d["total_seconds"] or 0 for d in days)
+            item = {
+                "employee": _employee_display_name(prof),
+                "emp_id": prof.emp_id,
+                "department": prof.department,
+                "days_worked": len(days),
+                "total_hours_workdone": round(total_seconds / 3600.0, 2),
+            }
+            if include_days:
+                item["days"] = [{
+                    "date": d["date"].isoformat(),
+                    "clock_in": d["clock_in"],
+                    "clock_out": d["clock_out"],
+                    "total_hours_workdone": round((d["total_seconds"] or 0) / 3600.0, 2),
+                    "entries_count": d["entries_count"],
+                } for d in days]
+            results.append(item)
+
+        response = paginator.get_paginated_response(results)
+        response.data["from"] = d_from.isoformat()
+        response.data["to"] = d_to.isoformat()
+        return response
 
 
 class TimesheetDailyForTLAPIView(APIView):
@@ -1305,11 +1559,23 @@ class TimesheetWorksheetForTLAPIView(APIView):
 
 
 class TimesheetYearlyForTLAPIView(APIView):
+    """
+    ?emp_id=&year=YYYY     per-day totals for the year
+    ?emp_id=&date=YYYY-MM-DD  that day's entries (drill-down)
+    """
     permission_classes = [IsAuthenticated, IsTLOnly]
 
     def get(self, request):
         emp_id = request.query_params.get("emp_id")
         year_q = request.query_params.get("year")
+        date_q = request.query_params.get("date")
+
+        if emp_id and date_q:
+            day = _parse_day(date_q)
+            if not day:
+                return Response({"detail": "Invalid date. Use YYYY-MM-DD."}, status=400)
+            prof = get_object_or_404(EmployeeProfile, emp_id=emp_id)
+            return Response(_timesheet_day_entries(prof, day), status=200)
 
         if not emp_id or not year_q:
             return Response({"detail": "emp_id and year are required (YYYY)."}, status=400)
@@ -1322,55 +1588,10 @@ class TimesheetYearlyForTLAPIView(APIView):
             return Response({"detail": "Invalid year. Use YYYY (e.g. 2025)."}, status=400)
 
         prof = get_object_or_404(EmployeeProfile, emp_id=emp_id)
-        entries_qs = TimesheetEntry.objects.filter(
-            profile=prof, date__year=year).order_by("date", "start_time")
-
-        from collections import defaultdict
-        months_map = defaultdict(lambda: defaultdict(
-            lambda: {"entries": [], "total_seconds": 0, "clock_in": None, "clock_out": None}))
-
-        for e in entries_qs:
-            m = e.date.month
-            d = e.date.isoformat()
-            info = months_map[m][d]
-            info["entries"].append(TimesheetEntrySerializer(e).data)
-            sec = int(e.duration_seconds) if e.duration_seconds is not None else 0
-            info["total_seconds"] += sec
-            if info["clock_in"] is None or e.start_time < info["clock_in"]:
-                info["clock_in"] = e.start_time
-            if info["clock_out"] is None or e.end_time > info["clock_out"]:
-                info["clock_out"] = e.end_time
-
-        months = []
-        year_total_seconds = 0
-        for month_num in range(1, 13):
-            month_days = months_map.get(month_num, {})
-            days_list = []
-            month_total_seconds = 0
-            for d_iso in sorted(month_days.keys()):
-                info = month_days[d_iso]
-                month_total_seconds += info["total_seconds"]
-                days_list.append({
-                    "date": d_iso,
-                    "clock_in": info["clock_in"],
-                    "clock_out": info["clock_out"],
-                    "total_hours": round(info["total_seconds"] / 3600.0, 2),
-                    "entries_count": len(info["entries"]),
-                })
-            months.append({
-                "month": f"{timezone.datetime(year, month_num, 1).strftime('%Y-%m')}",
-                "total_hours": round(month_total_seconds / 3600.0, 2),
-                "days": days_list
-            })
-            year_total_seconds += month_total_seconds
 
-        return Response({
-            "employee": _employee_display_name(prof),
-            "emp_id": prof.emp_id,
-            "year": str(year),
-            "year_total_hours": round(year_total_seconds / 3600.0, 2),
-            "months": months
-        }, status=200)
+        return Response(
+            _yearly_timesheet_report(prof, year),
+            status=200)
 
 
 class PolicyListAPIView(generics.ListAPIView):
@@ -1386,18 +1607,14 @@ class PolicyCreateAPIView(generics.CreateAPIView):
 
     def perform_create(self, serializer):
         policy = serializer.save()
-        employees = User.objects.all()  # all employees
-        
-        notifications = [
-            Notification(
-                to_user=emp,
-                title=f"New Policy Added: {policy.title}",
-                body=f"A new policy '{policy.title}' has been added.",
-                notif_type='policy',
-                is_read=False
-            ) for emp in employees
-        ]
-        Notification.objects.bulk_create(notifications)
+
+        notifications.broadcast(
+            title=f"New Policy Added: {policy.title}",
+            body=f"A new policy '{policy.title}' has been added.",
+            notif_type='policy',
+            audience="all",
+            created_by=self.request.user
+        )
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -1427,17 +1644,13 @@ class PolicyUpdateAPIView(generics.UpdateAPIView):
     def perform_update(self, serializer):
         policy = serializer.save()
 
-        employees = User.objects.all()
-        notifications = [
-            Notification(
-                to_user=emp,
-                title=f"New Policy Added: {policy.title}",
-                body=f"A new policy '{policy.title}' has been added.",
-                notif_type='policy',
-                is_read=False
-            ) for emp in employees
-        ]
-        Notification.objects.bulk_create(notifications)
+        notifications.broadcast(
+            title=f"Policy Updated: {policy.title}",
+            body=f"The policy '{policy.title}' has been updated.",
+            notif_type='policy',
+            audience="all",
+            created_by=self.request.user
+        )
 
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop('partial', False)
@@ -1467,17 +1680,13 @@ class PolicyDeleteAPIView(generics.DestroyAPIView):
         policy_title = instance.title
         instance.delete()
 
-        employees = User.objects.all()
-        notifications = [
-            Notification(
-                to_user=emp,
-                title=f"New Policy Added: {policy.title}",
-                body=f"A new policy '{policy.title}' has been added.",
-                notif_type='policy',
-                is_read=False
-            ) for emp in employees
-        ]
-        Notification.objects.bulk_create(notifications)
+        notifications.broadcast(
+            title=f"Policy Removed: {policy_title}",
+            body=f"The policy '{policy_title}' has been removed.",
+            notif_type='policy',
+            audience="all",
+            created_by=self.request.user
+        )
 
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -1497,6 +1706,7 @@ class PolicyDeleteAPIView(generics.DestroyAPIView):
 class HRDashboardStatsAPIView(APIView):
     permission_classes = [IsHROrManagement]
 
+    @cache_response("hr_dashboard_stats", groups=(GROUP_ATTENDANCE, GROUP_LEAVE, GROUP_EMPLOYEES))
     def get(self, request):
         today = timezone.localdate()
 
@@ -1519,28 +1729,23 @@ class HRDashboardStatsAPIView(APIView):
         ).values("user").distinct().count()
 
         # 3. On leave today
-        on_leave_today = models.LeaveRequest.objects.filter(
-            start_date__lte=today,
-            end_date__gte=today,
-            status="hr_approved",
+        on_leave_today = LeaveCalendarService.out_on(today).filter(
             profile__is_active=True
         ).count()
 
-        # 4. Monthly attendance
-        monthly_attendance_qs = Attendance.objects.filter(
-            date__year=year,
-            date__month=month,
-            status__in=["present", "halfday"],
+        # 4. Monthly attendance (from the monthly rollup)
+        monthly = models.AttendanceMonthlySummary.objects.filter(
+            year=year,
+            month=month,
             user__employeeprofile__is_active=True
+        ).aggregate(
+            present=Sum("days_present", default=0),
+            halfdays=Sum("halfdays", default=0),
+            seconds=Sum("total_seconds", default=0),
         )
 
-        attendance_entries = monthly_attendance_qs.count()
-
-        total_work_seconds = (
-            monthly_attendance_qs.aggregate(
-                total=Sum("duration_seconds")
-            )["total"] or 0
-        )
+        attendance_entries = monthly["present"] + monthly["halfdays"]
+        total_work_seconds = monthly["seconds"]
 
         total_work_hours = round(total_work_seconds / 3600, 2)
 
@@ -1609,13 +1814,12 @@ class UpdateIdentificationView(APIView):
 @permission_classes([IsAuthenticated])
 def emp_notifications(request):
     """
-    Get all notifications for the logged-in employee, newest first
+    Get all notifications (personal and broadcast) for the logged-in
+    employee, newest first
     """
-    notifications = Notification.objects.filter(
-        to_user=request.user
-    ).order_by('-created_at')
+    items = notifications.feed_items(notifications.feed(request.user))
 
-    serializer = NotificationSerializer(notifications, many=True)
+    serializer = serializers.NotificationFeedSerializer(items, many=True)
     return Response({
         "success": True,
         "data": serializer.data
@@ -1629,10 +1833,7 @@ def mark_notifications_read(request):
     """
     Mark all unread notifications as read
     """
-    Notification.objects.filter(
-        to_user=request.user,
-        is_read=False
-    ).update(is_read=True)
+    notifications.mark_read(request.user)
 
     return Response({
         "success": True,
@@ -1730,47 +1931,8 @@ class LeaveApplyAPIView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        if request.user.role == 'tl':
-            route_direct_to_hr = True
-            actionable_tl = None
-        else:
-            route_direct_to_hr = False
-            actionable_tl = None
-
-        if not route_direct_to_hr:
-            primary_tl = getattr(prof, 'team_lead', None)
-            if primary_tl and not getattr(primary_tl, 'is_active', True):
-                primary_tl = None
-            actionable_tl = primary_tl
-
-            if not primary_tl:
-
-                route_direct_to_hr = True
-            else:
-
-                tl_profile = getattr(primary_tl, 'employeeprofile', None)
-                if tl_profile and tl_profile.is_on_leave(start, end):
-
-                    fallback_tls = (
-                        get_user_model()
-                        .objects.filter(
-                            role='tl',
-                            employeeprofile__department=prof.department,
-                            is_active=True
-                        )
-                        .exclude(id=primary_tl.id)
-                        .select_related('employeeprofile')
-                    )
-
-                    found_replacement = False
-                    for tl_user in fallback_tls:
-                        if not tl_user.employeeprofile.is_on_leave(start, end):
-                            actionable_tl = tl_user
-                            found_replacement = True
-                            break
-
-                    if not found_replacement:
-                        route_direct_to_hr = True
+        actionable_tl, route_direct_to_hr = LeaveRoutingService.resolve(
+            prof, start, end)
 
         duration_days = ser.validated_data.get('calculated_days')
         if duration_days is None:
@@ -1794,19 +1956,13 @@ class LeaveApplyAPIView(APIView):
             tl=tl_user,
         )
 
-        hr_users = User.objects.filter(
-            role__iexact="hr", is_active=True)
-
-        Notification.objects.bulk_create([
-            Notification(
-                to_user=hr_user,
-                title="New Leave Request",
-                body=f"{prof.full_name()} applied for leave",
-                notif_type="leave",
-                extra={"leave_id": lr.id}
-            )
-            for hr_user in hr_users
-        ])
+        notifications.dispatch(
+            notifications.roles(LoginUser.ROLE_HR, active_only=True),
+            title="New Leave Request",
+            body=f"{prof.full_name()} applied for leave",
+            notif_type="leave",
+            extra={"leave_id": lr.id}
+        )
 
         if not route_direct_to_hr and actionable_tl:
             models.Notification.objects.create(
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Announcement
+from .models import Announcement, PayrollRun
 
 
 @admin.register(Announcement)
@@ -8,6 +8,13 @@ class AnnouncementAdmin(admin.ModelAdmin):
     search_fields = ("title",)
 
 
+@admin.register(PayrollRun)
+class PayrollRunAdmin(admin.ModelAdmin):
+    list_display = ("id", "year", "month", "status",
+                    "processed", "total_employees", "created_at")
+    list_filter = ("status", "year", "month")
+
+
 # @admin.register(SalaryStructure)
 # class SalaryStructureAdmin(admin.ModelAdmin):
 #     list_display = (
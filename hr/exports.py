@@ -0,0 +1,188 @@
+# hr/exports.py
+"""
+Streaming CSV / XLSX writers for HR report exports.
+
+Both writers consume an iterable of row tuples and yield encoded chunks, so
+a StreamingHttpResponse can send an export of any size in constant memory.
+The XLSX writer produces a minimal single-sheet workbook with inline
+strings (no shared string table), which lets rows be written as they
+arrive instead of buffering the whole sheet.
+"""
+import csv
+import re
+import zipfile
+from datetime import date, datetime
+from xml.sax.saxutils import escape
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+
+CSV_CONTENT_TYPE = "text/csv"
+XLSX_CONTENT_TYPE = (
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+)
+FORMATS = ("csv", "xlsx")
+
+# Rows are rendered and flushed to the client in groups of this size.
+FLUSH_ROWS = 500
+
+_ILLEGAL_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def format_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return "Yes" if value else "No"
+    return value
+
+
+class _Echo:
+    """File-like object whose write() just returns the value (for csv.writer)."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(header, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow([format_value(v) for v in row])
+
+
+class _ChunkBuffer:
+    """
+    Write-only, unseekable sink for zipfile. zipfile falls back to data
+    descriptors for unseekable output, so entries are never rewritten.
+    """
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="{name}" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+
+_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<sheetData>'
+)
+
+_SHEET_TAIL = '</sheetData></worksheet>'
+
+
+def _xlsx_cell(value):
+    value = format_value(value)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f'<c><v>{value}</v></c>'
+    text = escape(_ILLEGAL_XML_CHARS.sub("", str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def _xlsx_row(values):
+    return "<row>" + "".join(_xlsx_cell(v) for v in values) + "</row>"
+
+
+def stream_xlsx(header, rows, sheet_name="Sheet1"):
+    buffer = _ChunkBuffer()
+    archive = zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED)
+
+    archive.writestr("[Content_Types].xml", _CONTENT_TYPES)
+    archive.writestr("_rels/.rels", _ROOT_RELS)
+    archive.writestr("xl/workbook.xml", _WORKBOOK.format(
+        name=escape(sheet_name[:31], {'"': "&quot;"})))
+    archive.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+    yield buffer.drain()
+
+    with archive.open("xl/worksheets/sheet1.xml", mode="w", force_zip64=True) as sheet:
+        pending = [_SHEET_HEAD, _xlsx_row(header)]
+        for row in rows:
+            pending.append(_xlsx_row(row))
+            if len(pending) >= FLUSH_ROWS:
+                sheet.write("".join(pending).encode("utf-8"))
+                pending = []
+                chunk = buffer.drain()
+                if chunk:
+                    yield chunk
+        pending.append(_SHEET_TAIL)
+        sheet.write("".join(pending).encode("utf-8"))
+
+    archive.close()
+    yield buffer.drain()
+
+
+def streaming_export(file_format, filename, header, rows, sheet_name="Sheet1"):
+    """
+    Build a StreamingHttpResponse for `rows` in the requested format.
+    `filename` is given without extension.
+    """
+    if file_format == "xlsx":
+        response = StreamingHttpResponse(
+            stream_xlsx(header, rows, sheet_name=sheet_name),
+            content_type=XLSX_CONTENT_TYPE
+        )
+    else:
+        response = StreamingHttpResponse(
+            stream_csv(header, rows),
+            content_type=CSV_CONTENT_TYPE
+        )
+        file_format = "csv"
+
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{file_format}"'
+    return response
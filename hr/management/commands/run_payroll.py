@@ -0,0 +1,56 @@
+from argparse import ArgumentTypeError
+from decimal import Decimal, InvalidOperation
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from hr.service import PayrollRunService
+
+
+def amount(value):
+    try:
+        value = Decimal(value)
+    except InvalidOperation:
+        raise ArgumentTypeError(f"'{value}' is not a number")
+    if not value.is_finite() or value < 0:
+        raise ArgumentTypeError("must be a non-negative number")
+    return value
+
+
+class Command(BaseCommand):
+    help = "Generate payslips for every active employee salary in a month"
+
+    def add_arguments(self, parser):
+        today = timezone.localdate()
+        parser.add_argument("--year", type=int, default=today.year)
+        parser.add_argument("--month", type=int, default=today.month)
+        parser.add_argument("--insurance", type=amount, default=Decimal(0))
+        parser.add_argument("--esi", type=amount, default=Decimal(0))
+        parser.add_argument(
+            "--batch-size", type=int, default=PayrollRunService.BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            run = PayrollRunService.start(
+                options["year"],
+                options["month"],
+                insurance=options["insurance"],
+                esi=options["esi"],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            f"Payroll run #{run.id} for {run.month:02d}/{run.year} started")
+
+        try:
+            PayrollRunService.execute(run, batch_size=options["batch_size"])
+        except Exception as e:
+            raise CommandError(f"Payroll run #{run.id} failed: {e}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Payroll run #{run.id} completed: "
+            f"{run.created_count} created, {run.updated_count} updated, "
+            f"{run.skipped_count} finalized skipped "
+            f"({run.processed}/{run.total_employees} employees)"
+        ))
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-18 07:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fail_duplicate_active_runs(apps, schema_editor):
+    """Keep the newest pending/running run per month; older ones are stale."""
+    PayrollRun = apps.get_model("hr", "PayrollRun")
+    seen = set()
+    for run in PayrollRun.objects.filter(
+            status__in=["pending", "running"]).order_by("-created_at", "-id"):
+        if (run.year, run.month) in seen:
+            run.status = "failed"
+            run.error = "Superseded by a newer run for the same month."
+            run.save(update_fields=["status", "error"])
+        seen.add((run.year, run.month))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hr', '0004_payrollrun'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(fail_duplicate_active_runs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='payrollrun',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['pending', 'running'])), fields=('year', 'month'), name='unique_active_payroll_run'),
+        ),
+    ]
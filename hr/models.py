@@ -36,3 +36,66 @@ class Announcement(models.Model):
 
     def __str__(self):
         return self.title
+
+
+class PayrollRun(models.Model):
+    """
+    One bulk payslip generation for a month. Progress is persisted per
+    batch so long runs can be polled from the API.
+    """
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("completed", "Completed"),
+        ("failed", "Failed"),
+    ]
+
+    year = models.PositiveIntegerField()
+    month = models.PositiveIntegerField()
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default="pending")
+
+    insurance = models.DecimalField(
+        max_digits=12, decimal_places=2, default=Decimal("0.00"))
+    esi = models.DecimalField(
+        max_digits=12, decimal_places=2, default=Decimal("0.00"))
+
+    total_employees = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    updated_count = models.PositiveIntegerField(default=0)
+    skipped_count = models.PositiveIntegerField(default=0)
+    error = models.TextField(null=True, blank=True)
+
+    triggered_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="payroll_runs"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # touched at start and after every batch; an active run silent for
+    # longer than PayrollRunService.STALE_AFTER is failed by the next start
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["year", "month"],
+                condition=models.Q(status__in=["pending", "running"]),
+                name="unique_active_payroll_run",
+            )
+        ]
+
+    def progress(self):
+        if not self.total_employees:
+            return 100.0 if self.status == "completed" else 0.0
+        return round(self.processed * 100.0 / self.total_employees, 2)
+
+    def __str__(self):
+        return f"Payroll {self.month}/{self.year} ({self.status})"
@@ -2,7 +2,9 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from emp.models import EmployeeProfile, Shift, Attendance, CalendarEvent, SalaryStructure, EmployeeSalary, Payslip, LeaveRequest, LeaveType, LeaveBalance
-from .models import Announcement
+from emp.services import AttendanceReportService
+from emp.fieldsets import SparseFieldsetSerializerMixin
+from .models import Announcement, PayrollRun
 from django.utils import timezone
 from datetime import datetime
 from decimal import Decimal
@@ -17,7 +19,7 @@ class UserBasicSerializer(serializers.ModelSerializer):
         fields = ('id', 'username', 'first_name', 'last_name', 'email', 'role')
 
 
-class EmployeeListSerializer(serializers.ModelSerializer):
+class EmployeeListSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     user = UserBasicSerializer(read_only=True)
 
     class Meta:
@@ -145,6 +147,9 @@ class AttendanceAdminSerializer(serializers.ModelSerializer):
         source="user.employeeprofile.department",
         read_only=True
     )
+    worked_seconds = serializers.IntegerField(
+        source="duration_seconds", read_only=True)
+    overtime_seconds = serializers.SerializerMethodField()
 
     class Meta:
         model = Attendance
@@ -159,10 +164,13 @@ class AttendanceAdminSerializer(serializers.ModelSerializer):
             "worked_seconds",
             "overtime_seconds",
             "late_arrivals",
-            "manual_entry",
             "note",
         )
 
+    def get_overtime_seconds(self, obj):
+        return max(
+            (obj.duration_seconds or 0) - AttendanceReportService.REGULAR_WORK_SECONDS, 0)
+
 
 class CalendarEventSerializer(serializers.ModelSerializer):
     class Meta:
@@ -229,6 +237,36 @@ class PayslipAdminSerializer(serializers.ModelSerializer):
         )
 
 
+class PayrollRunSerializer(serializers.ModelSerializer):
+    progress = serializers.SerializerMethodField()
+    triggered_by = serializers.StringRelatedField()
+
+    class Meta:
+        model = PayrollRun
+        fields = (
+            "id",
+            "year",
+            "month",
+            "status",
+            "progress",
+            "total_employees",
+            "processed",
+            "created_count",
+            "updated_count",
+            "skipped_count",
+            "insurance",
+            "esi",
+            "error",
+            "triggered_by",
+            "created_at",
+            "started_at",
+            "finished_at",
+        )
+
+    def get_progress(self, obj):
+        return obj.progress()
+
+
 class MySalaryDetailSerializer(serializers.ModelSerializer):
     basic = serializers.SerializerMethodField()
     hra = serializers.SerializerMethodField()
@@ -1,6 +1,14 @@
+import calendar
+from datetime import timedelta
+from decimal import Decimal
+from django.utils import timezone
 from django.utils.dateparse import parse_datetime
-from django.db.models import Q
+from django.db import IntegrityError, transaction
+from django.db.models import Q, Count, Sum, Case, When, F, Value, IntegerField
 from jsonschema import ValidationError
+from emp.models import Attendance, EmployeeSalary, Payslip
+from emp.services import AttendanceReportService, AttendanceRollupService
+from .models import PayrollRun
 
 
 class AttendanceCorrectionService:
@@ -15,6 +23,7 @@ class AttendanceCorrectionService:
         clock_out_str = data.get("clock_out")
         status = data.get("status")
         note = data.get("note", "Corrected by HR")
+        original_date = attendance.date
 
         # ---------------- Clock-in correction ----------------
         if clock_in_str:
@@ -59,4 +68,289 @@ class AttendanceCorrectionService:
         attendance.manual_entry = True
         attendance.save()
 
+        # ---------------- Monthly rollup ----------------
+        AttendanceRollupService.refresh(
+            attendance.user_id, attendance.date.year, attendance.date.month)
+        if (original_date.year, original_date.month) != (attendance.date.year, attendance.date.month):
+            AttendanceRollupService.refresh(
+                attendance.user_id, original_date.year, original_date.month)
+
         return attendance
+
+
+class PayrollService:
+    """
+    Payslip calculation shared by the single-employee endpoint and bulk runs.
+    """
+
+    PRESENT_STATUSES = ("present", "halfday")
+    PROFESSIONAL_TAX = Decimal("200")
+
+    @staticmethod
+    def working_days(year, month):
+        # Mon–Fri
+        cal = calendar.Calendar()
+        return sum(
+            1 for d in cal.itermonthdays2(year, month)
+            if d[0] != 0 and d[1] < 5
+        )
+
+    @staticmethod
+    def attendance_totals(year, month, user_ids=None):
+        """
+        Days present and overtime seconds per user for the month,
+        computed in a single grouped query.
+        Returns {user_id: (days_present, overtime_seconds)}.
+        """
+        regular = AttendanceReportService.REGULAR_WORK_SECONDS
+
+        qs = Attendance.objects.filter(
+            date__year=year,
+            date__month=month,
+            status__in=PayrollService.PRESENT_STATUSES
+        )
+        if user_ids is not None:
+            qs = qs.filter(user_id__in=user_ids)
+
+        rows = qs.values("user_id").annotate(
+            days_present=Count("id"),
+            overtime_seconds=Sum(
+                Case(
+                    When(
+                        duration_seconds__gt=regular,
+                        then=F("duration_seconds") - regular
+                    ),
+                    default=Value(0),
+                    output_field=IntegerField()
+                )
+            )
+        )
+
+        return {
+            row["user_id"]: (row["days_present"], row["overtime_seconds"] or 0)
+            for row in rows
+        }
+
+    @staticmethod
+    def compute(salary, working_days, days_present, overtime_seconds,
+                insurance=Decimal("0"), esi=Decimal("0")):
+        """
+        Returns the Payslip field values for one employee.
+        """
+        structure = salary.structure
+
+        monthly_gross = Decimal(structure.monthly_ctc)
+        prorata_gross = (
+            monthly_gross * Decimal(days_present) / Decimal(working_days)
+            if working_days else Decimal("0")
+        )
+
+        basic = structure.basic_amount()
+        hra = structure.hra_amount()
+        pf = structure.pf_amount()
+
+        professional_tax = PayrollService.PROFESSIONAL_TAX
+        insurance = Decimal(insurance or 0)
+        esi = Decimal(esi or 0)
+
+        hourly_rate = salary.hourly_rate(working_days)
+        overtime_amount = (
+            Decimal(overtime_seconds) / Decimal(3600)
+        ) * hourly_rate * structure.overtime_multiplier
+
+        total_deductions = pf + professional_tax + insurance + esi
+        net_amount = prorata_gross + overtime_amount - total_deductions
+
+        return {
+            "working_days": working_days,
+            "days_present": days_present,
+            "gross_amount": round(prorata_gross, 2),
+            "overtime_amount": round(overtime_amount, 2),
+            "deductions": round(total_deductions, 2),
+            "net_amount": round(net_amount, 2),
+            "details": {
+                "monthly_ctc": float(monthly_gross),
+                "basic": round(float(basic), 2),
+                "hra": round(float(hra), 2),
+                "pf": round(float(pf), 2),
+                "professional_tax": float(professional_tax),
+                "insurance": float(insurance),
+                "esi": float(esi),
+                "absent_days": working_days - days_present,
+                "overtime_amount": round(float(overtime_amount), 2),
+            },
+        }
+
+
+class PayrollRunService:
+    """
+    Generates payslips for every active EmployeeSalary in a month.
+    Attendance is aggregated once for the whole month and payslips are
+    written with one upsert per batch.
+    """
+
+    BATCH_SIZE = 500
+    # A run executes inside the request that started it; if that worker is
+    # killed the run stops heartbeating and would block the month forever.
+    STALE_AFTER = timedelta(minutes=10)
+
+    UPSERT_FIELDS = [
+        "working_days",
+        "days_present",
+        "gross_amount",
+        "overtime_amount",
+        "deductions",
+        "net_amount",
+        "details",
+        "generated_by",
+    ]
+
+    @staticmethod
+    def start(year, month, user=None, insurance=0, esi=0):
+        """
+        Creates the run record. Raises ValueError if a run for the same
+        month is already in progress; runs that stopped heartbeating are
+        failed first (fail_stale).
+        """
+        if not (1 <= month <= 12):
+            raise ValueError("Invalid month number (1..12).")
+
+        PayrollRunService.fail_stale(year, month)
+
+        # unique_active_payroll_run allows one pending/running run per
+        # month, so concurrent starts cannot both get through
+        try:
+            with transaction.atomic():
+                return PayrollRun.objects.create(
+                    year=year,
+                    month=month,
+                    insurance=Decimal(insurance or 0),
+                    esi=Decimal(esi or 0),
+                    triggered_by=user,
+                    heartbeat_at=timezone.now(),
+                )
+        except IntegrityError:
+            raise ValueError(
+                f"A payroll run for {month}/{year} is already in progress.")
+
+    @staticmethod
+    def fail_stale(year, month):
+        """
+        Mark pending/running runs for the month that stopped heartbeating
+        as failed. Returns the number of runs reclaimed.
+        """
+        now = timezone.now()
+        cutoff = now - PayrollRunService.STALE_AFTER
+        return PayrollRun.objects.filter(
+            year=year, month=month, status__in=["pending", "running"]
+        ).filter(
+            Q(heartbeat_at__lt=cutoff) |
+            Q(heartbeat_at__isnull=True, created_at__lt=cutoff)
+        ).update(
+            status="failed",
+            error="Abandoned: no progress for "
+                  f"{int(PayrollRunService.STALE_AFTER.total_seconds() // 60)} minutes.",
+            finished_at=now,
+        )
+
+    @staticmethod
+    def execute(run, batch_size=None):
+        batch_size = batch_size or PayrollRunService.BATCH_SIZE
+
+        salaries = (
+            EmployeeSalary.objects
+            .filter(is_active=True, profile__is_active=True)
+            .select_related("structure", "profile")
+            .order_by("id")
+        )
+
+        run.status = "running"
+        run.started_at = run.heartbeat_at = timezone.now()
+        run.total_employees = salaries.count()
+        run.save(update_fields=["status", "started_at", "heartbeat_at", "total_employees"])
+
+        try:
+            working_days = PayrollService.working_days(run.year, run.month)
+            totals = PayrollService.attendance_totals(run.year, run.month)
+
+            batch = []
+            for salary in salaries.iterator(chunk_size=batch_size):
+                batch.append(salary)
+                if len(batch) >= batch_size:
+                    PayrollRunService._write_batch(
+                        run, batch, working_days, totals)
+                    batch = []
+            if batch:
+                PayrollRunService._write_batch(
+                    run, batch, working_days, totals)
+
+        except Exception as e:
+            run.status = "failed"
+            run.error = str(e)
+            run.finished_at = timezone.now()
+            run.save(update_fields=["status", "error", "finished_at"])
+            raise
+
+        run.status = "completed"
+        run.finished_at = timezone.now()
+        run.save(update_fields=["status", "finished_at"])
+        return run
+
+    @staticmethod
+    @transaction.atomic
+    def _write_batch(run, salaries, working_days, totals):
+        profile_ids = [s.profile_id for s in salaries]
+
+        existing = dict(
+            Payslip.objects.filter(
+                year=run.year,
+                month=run.month,
+                profile_id__in=profile_ids
+            ).values_list("profile_id", "finalized")
+        )
+
+        payslips = []
+        skipped = 0
+        for salary in salaries:
+            # Finalized payslips are never regenerated
+            if existing.get(salary.profile_id):
+                skipped += 1
+                continue
+
+            days_present, overtime_seconds = totals.get(
+                salary.profile.user_id, (0, 0))
+
+            values = PayrollService.compute(
+                salary,
+                working_days,
+                days_present,
+                overtime_seconds,
+                insurance=run.insurance,
+                esi=run.esi,
+            )
+            payslips.append(Payslip(
+                profile_id=salary.profile_id,
+                year=run.year,
+                month=run.month,
+                generated_by_id=run.triggered_by_id,
+                **values
+            ))
+
+        Payslip.objects.bulk_create(
+            payslips,
+            update_conflicts=True,
+            unique_fields=["profile", "year", "month"],
+            update_fields=PayrollRunService.UPSERT_FIELDS,
+        )
+
+        updated = sum(1 for p in payslips if p.profile_id in existing)
+
+        PayrollRun.objects.filter(pk=run.pk).update(
+            processed=F("processed") + len(salaries),
+            created_count=F("created_count") + len(payslips) - updated,
+            updated_count=F("updated_count") + updated,
+            skipped_count=F("skipped_count") + skipped,
+            heartbeat_at=timezone.now(),
+        )
+        run.refresh_from_db(fields=[
+            "processed", "created_count", "updated_count", "skipped_count"])
@@ -30,6 +30,12 @@ urlpatterns = [
     path('attendance/', views.HRAttendanceListAPIView.as_view(),
          name='hr-attendance-list'),
 
+    path('attendance/export/', views.HRAttendanceExportAPIView.as_view(),
+         name='hr-attendance-export'),
+
+    path('timesheets/export/', views.HRTimesheetExportAPIView.as_view(),
+         name='hr-timesheet-export'),
+
     path('attendance/<int:pk>/', views.HRAttendanceRetrieveAPIView.as_view(),
          name='hr-attendance-detail'),
 
@@ -67,6 +73,12 @@ urlpatterns = [
     path('employees/<int:profile_id>/generate-payslip/',
          views.HRGeneratePayslipAPIView.as_view(), name='hr-generate-payslip'),
 
+    path('payroll/runs/', views.HRPayrollRunAPIView.as_view(),
+         name='hr-payroll-runs'),
+
+    path('payroll/runs/<int:pk>/', views.HRPayrollRunDetailAPIView.as_view(),
+         name='hr-payroll-run-detail'),
+
     path('leaves/', views.HRLeaveListAPIView.as_view(), name='hr-leave-list'),
 
     path('leaves/<int:pk>/', views.HRLeaveDetailAPIView.as_view(),
@@ -77,4 +89,7 @@ urlpatterns = [
 
     path('leave-dashboard/stats/', views.HRLeaveDashboardStatsAPIView.as_view(),
          name='hr-leave-dashboard-stats'),
+
+    path('leave-calendar/', views.HRLeaveCalendarAPIView.as_view(),
+         name='hr-leave-calendar'),
 ]
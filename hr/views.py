@@ -1,5 +1,5 @@
 # hr/views.py
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
 from tl.models import TLAnnouncement
 from rest_framework.decorators import api_view, permission_classes, authentication_classes
 from rest_framework import generics, status, permissions
@@ -8,8 +8,8 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
 from django.core.exceptions import ValidationError
-from emp.models import EmployeeProfile, Shift, Attendance, CalendarEvent, SalaryStructure, EmployeeSalary, Payslip, LeaveRequest, LeaveBalance, Notification
-from . import serializers, models
+from emp.models import EmployeeProfile, Shift, Attendance, CalendarEvent, SalaryStructure, EmployeeSalary, Payslip, LeaveRequest, Notification, TimesheetEntry
+from . import serializers, models, exports
 from .permissions import IsHR, IsHRorDMorPM, IsTL
 from projects.permissions import IsDM, IsPM
 from django.db.models import Sum, Count
@@ -18,15 +18,23 @@ import calendar
 from django.contrib.auth import get_user_model
 from .serializers import AnnouncementSerializer, MySalaryDetailSerializer
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from .models import Announcement
+from .models import Announcement, PayrollRun
 from django.db import IntegrityError, transaction
 from django.utils.dateparse import parse_datetime
-from .service import AttendanceCorrectionService
+from .service import AttendanceCorrectionService, PayrollService, PayrollRunService
+from emp.services import LeaveCalendarService, LeaveLedgerService
+from emp import notifications, search
+from emp.fieldsets import SparseFieldsetViewMixin
+from HRM.cache import cache_response, GROUP_ATTENDANCE, GROUP_LEAVE, GROUP_EMPLOYEES
+from datetime import date
+
+
+EXPORT_CHUNK_SIZE = 2000
 
 
 # hr/views.py
 
-class HRListInactiveEmployeesAPIView(generics.ListAPIView):
+class HRListInactiveEmployeesAPIView(SparseFieldsetViewMixin, generics.ListAPIView):
     """
     Shows a list of employees whose accounts are disabled.
     """
@@ -80,7 +88,7 @@ class HRUpdateEmployeeRoleAPIView(generics.UpdateAPIView):
     lookup_field = "pk"
 
 
-class HRListEmployeesAPIView(generics.ListAPIView):
+class HRListEmployeesAPIView(SparseFieldsetViewMixin, generics.ListAPIView):
     permission_classes = [IsAuthenticated, IsHRorDMorPM]
     serializer_class = serializers.EmployeeListSerializer
     pagination_class = None
@@ -90,6 +98,9 @@ class HRListEmployeesAPIView(generics.ListAPIView):
         role = self.request.query_params.get('role')
         if role:
             qs = qs.filter(user__role__iexact=role)
+        q = self.request.query_params.get('q')
+        if q:
+            qs = search.search(q, qs)
         return qs
 
 
@@ -136,6 +147,157 @@ class HRAttendanceListAPIView(generics.ListAPIView):
         return qs.order_by('-date')
 
 
+def _export_date_range(params):
+    """
+    Resolve ?from=&to= / ?month=YYYY-MM / ?year=YYYY into (start, end).
+    Raises ValueError on malformed input; returns (None, None) when unset.
+    """
+    if params.get("from") or params.get("to"):
+        start = date.fromisoformat(params.get("from") or params["to"])
+        end = date.fromisoformat(params.get("to") or params["from"])
+        if start > end:
+            raise ValueError("from must not be after to.")
+        return start, end
+
+    if params.get("month"):
+        y, m = map(int, params["month"].split("-"))
+        return date(y, m, 1), date(y, m, calendar.monthrange(y, m)[1])
+
+    if params.get("year"):
+        y = int(params["year"])
+        return date(y, 1, 1), date(y, 12, 31)
+
+    return None, None
+
+
+def _amount_param(data, name):
+    """Non-negative Decimal from request data (default 0); ValueError otherwise."""
+    try:
+        value = Decimal(str(data.get(name) or 0))
+    except InvalidOperation:
+        raise ValueError(f"{name} must be a number.")
+    if not value.is_finite() or value < 0:
+        raise ValueError(f"{name} must be a non-negative number.")
+    return value
+
+
+def _export_format(params):
+    file_format = (params.get("file_format") or "csv").lower()
+    if file_format not in exports.FORMATS:
+        raise ValueError(
+            f"file_format must be one of: {', '.join(exports.FORMATS)}.")
+    return file_format
+
+
+class HRAttendanceExportAPIView(APIView):
+    """
+    Stream attendance as CSV or XLSX.
+    Filters: user_id, department, month | year | from & to.
+    ?file_format=csv (default) | xlsx
+    """
+    permission_classes = [IsAuthenticated, IsHR]
+
+    HEADER = [
+        "Emp ID", "First Name", "Last Name", "Department", "Date",
+        "Clock In", "Clock Out", "Worked Hours", "Status", "Late Arrival", "Note",
+    ]
+
+    def get(self, request):
+        params = request.query_params
+        try:
+            file_format = _export_format(params)
+            start, end = _export_date_range(params)
+        except (ValueError, KeyError) as e:
+            return Response({"detail": str(e) or "Invalid date filter."}, status=400)
+        try:
+            user_id = int(params["user_id"]) if params.get("user_id") else None
+        except ValueError:
+            return Response({"detail": "user_id must be an integer."}, status=400)
+
+        qs = Attendance.objects.all()
+        if user_id is not None:
+            qs = qs.filter(user_id=user_id)
+        if params.get("department"):
+            qs = qs.filter(
+                user__employeeprofile__department__iexact=params["department"])
+        if start:
+            qs = qs.filter(date__range=(start, end))
+
+        rows = (
+            (
+                emp_id, first_name, last_name, department, day,
+                clock_in, clock_out,
+                round((seconds or 0) / 3600, 2),
+                att_status, late, note,
+            )
+            for (emp_id, first_name, last_name, department, day, clock_in,
+                 clock_out, seconds, att_status, late, note)
+            in qs.order_by("date", "user_id").values_list(
+                "user__employeeprofile__emp_id",
+                "user__employeeprofile__first_name",
+                "user__employeeprofile__last_name",
+                "user__employeeprofile__department",
+                "date", "clock_in", "clock_out", "duration_seconds",
+                "status", "late_arrivals", "note",
+            ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        )
+
+        suffix = f"{start}_{end}" if start else "all"
+        return exports.streaming_export(
+            file_format, f"attendance_{suffix}", self.HEADER, rows,
+            sheet_name="Attendance")
+
+
+class HRTimesheetExportAPIView(APIView):
+    """
+    Stream timesheet entries as CSV or XLSX.
+    Filters: emp_id, department, month | year | from & to.
+    ?file_format=csv (default) | xlsx
+    """
+    permission_classes = [IsAuthenticated, IsHR]
+
+    HEADER = [
+        "Emp ID", "First Name", "Last Name", "Department", "Date", "Day",
+        "Task", "Description", "Start Time", "End Time", "Hours",
+    ]
+
+    def get(self, request):
+        params = request.query_params
+        try:
+            file_format = _export_format(params)
+            start, end = _export_date_range(params)
+        except (ValueError, KeyError) as e:
+            return Response({"detail": str(e) or "Invalid date filter."}, status=400)
+
+        qs = TimesheetEntry.objects.all()
+        if params.get("emp_id"):
+            qs = qs.filter(profile__emp_id=params["emp_id"].strip())
+        if params.get("department"):
+            qs = qs.filter(profile__department__iexact=params["department"])
+        if start:
+            qs = qs.filter(date__range=(start, end))
+
+        rows = (
+            (
+                emp_id, first_name, last_name, department, day, weekday,
+                task, description, start_time, end_time,
+                round((seconds or 0) / 3600, 2),
+            )
+            for (emp_id, first_name, last_name, department, day, weekday,
+                 task, description, start_time, end_time, seconds)
+            in qs.order_by("date", "profile_id", "start_time").values_list(
+                "profile__emp_id", "profile__first_name", "profile__last_name",
+                "profile__department", "date", "day", "task", "description",
+                "start_time", "end_time", "duration_seconds",
+            ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        )
+
+        suffix = f"{start}_{end}" if start else "all"
+        return exports.streaming_export(
+            file_format, f"timesheets_{suffix}", self.HEADER, rows,
+            sheet_name="Timesheets")
+
+
 class HRAttendanceRetrieveAPIView(generics.RetrieveAPIView):
     permission_classes = [IsAuthenticated, IsHR]
     queryset = Attendance.objects.all()
@@ -218,18 +380,13 @@ def update_announcement(request, pk):
 
     updated_announcement = serializer.save()
 
-    employees = User.objects.filter(employeeprofile__isnull=False)
-
-    Notification.objects.bulk_create([
-        Notification(
-            to_user=emp,
-            title="Announcement Updated",
-            body=f"The announcement '{updated_announcement.title}' was updated.",
-            notif_type="announcement",
-            extra={"announcement_id": updated_announcement.id}
-        )
-        for emp in employees
-    ])
+    notifications.broadcast(
+        title="Announcement Updated",
+        body=f"The announcement '{updated_announcement.title}' was updated.",
+        notif_type="announcement",
+        extra={"announcement_id": updated_announcement.id},
+        created_by=request.user
+    )
 
     return Response(
         {"success": True, "data": serializer.data},
@@ -245,17 +402,12 @@ def delete_announcement(request, pk):
     title = announcement.title
     announcement.delete()
 
-    employees = User.objects.filter(employeeprofile__isnull=False)
-
-    Notification.objects.bulk_create([
-        Notification(
-            to_user=emp,
-            title="Announcement Deleted",
-            body=f"The announcement '{title}' was deleted.",
-            notif_type="announcement"
-        )
-        for emp in employees
-    ])
+    notifications.broadcast(
+        title="Announcement Deleted",
+        body=f"The announcement '{title}' was deleted.",
+        notif_type="announcement",
+        created_by=request.user
+    )
 
     return Response(
         {"success": True, "message": "Deleted successfully"},
@@ -318,17 +470,13 @@ def create_announcement(request):
                 }
             )
 
-        employees = User.objects.filter(employeeprofile__isnull=False)
-        Notification.objects.bulk_create([
-            Notification(
-                to_user=emp,
-                title=f"New Announcement: {announcement.title}",
-                body=announcement.description,
-                notif_type="announcement",
-                extra={"announcement_id": announcement.id}
-            )
-            for emp in employees
-        ])
+        notifications.broadcast(
+            title=f"New Announcement: {announcement.title}",
+            body=announcement.description,
+            notif_type="announcement",
+            extra={"announcement_id": announcement.id},
+            created_by=request.user
+        )
 
         return Response({
             "success": True,
@@ -385,90 +533,119 @@ class HRGeneratePayslipAPIView(APIView):
     def post(self, request, profile_id):
         profile = get_object_or_404(EmployeeProfile, id=profile_id)
 
-        year = int(request.data.get('year'))
-        month = int(request.data.get('month'))
+        try:
+            year = int(request.data.get('year'))
+            month = int(request.data.get('month'))
+        except (TypeError, ValueError):
+            return Response(
+                {"detail": "year and month are required (e.g. year=2025, month=1)."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not (1 <= month <= 12) or not (1 <= year <= 9999):
+            return Response(
+                {"detail": "month must be 1..12 and year 1..9999."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            insurance = _amount_param(request.data, 'insurance')
+            esi = _amount_param(request.data, 'esi')
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         es = profile.salary
-        structure = es.structure
 
-        # --- Working days (Mon–Fri) ---
-        cal = calendar.Calendar()
-        working_days = sum(
-            1 for d in cal.itermonthdays2(year, month)
-            if d[0] != 0 and d[1] < 5
+        working_days = PayrollService.working_days(year, month)
+        days_present, overtime_seconds = PayrollService.attendance_totals(
+            year, month, user_ids=[profile.user_id]
+        ).get(profile.user_id, (0, 0))
+
+        values = PayrollService.compute(
+            es,
+            working_days,
+            days_present,
+            overtime_seconds,
+            insurance=insurance,
+            esi=esi,
         )
 
-        attendances = Attendance.objects.filter(
-            user=profile.user,
-            date__year=year,
-            date__month=month,
-            status='completed'
+        payslip, _ = Payslip.objects.update_or_create(
+            profile=profile,
+            year=year,
+            month=month,
+            defaults={**values, 'generated_by': request.user}
         )
 
-        days_present = attendances.count()
-        absent_days = working_days - days_present
-
-        # --- Salary breakup ---
-        monthly_gross = Decimal(structure.monthly_ctc)
-
-        prorata_gross = (
-            monthly_gross * (days_present / working_days)
-            if working_days else 0
+        return Response(
+            serializers.PayslipAdminSerializer(payslip).data,
+            status=201
         )
 
-        basic = structure.basic_amount()
-        hra = structure.hra_amount()
-        pf = structure.pf_amount()
 
-        professional_tax = Decimal("200")
-        insurance = Decimal(request.data.get('insurance', 0))
-        esi = Decimal(request.data.get('esi', 0))
+class HRPayrollRunAPIView(APIView):
+    """
+    GET  -> recent payroll runs
+    POST -> generate payslips for every active salary in a month
+    """
+    permission_classes = [IsAuthenticated, IsHR]
 
-        # --- Overtime ---
-        overtime_seconds = attendances.aggregate(
-            total=Sum('overtime_seconds')
-        )['total'] or 0
+    def get(self, request):
+        runs = PayrollRun.objects.select_related('triggered_by')[:50]
+        return Response(serializers.PayrollRunSerializer(runs, many=True).data)
 
-        hourly_rate = es.hourly_rate(working_days)
-        overtime_amount = (
-            Decimal(overtime_seconds) / Decimal(3600)
-        ) * hourly_rate * structure.overtime_multiplier
+    def post(self, request):
+        try:
+            year = int(request.data.get('year'))
+            month = int(request.data.get('month'))
+        except (TypeError, ValueError):
+            return Response(
+                {"detail": "year and month are required (e.g. year=2025, month=1)."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not (1 <= month <= 12) or not (1 <= year <= 9999):
+            return Response(
+                {"detail": "month must be 1..12 and year 1..9999."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        total_deductions = pf + professional_tax + insurance + esi
-        net_amount = prorata_gross + overtime_amount - total_deductions
+        try:
+            insurance = _amount_param(request.data, 'insurance')
+            esi = _amount_param(request.data, 'esi')
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        payslip, _ = Payslip.objects.update_or_create(
-            profile=profile,
-            year=year,
-            month=month,
-            defaults={
-                'working_days': working_days,
-                'days_present': days_present,
-                'gross_amount': round(prorata_gross, 2),
-                'overtime_amount': round(overtime_amount, 2),
-                'deductions': round(total_deductions, 2),
-                'net_amount': round(net_amount, 2),
-                'details': {
-                    'monthly_ctc': monthly_gross,
-                    'basic': round(float(basic), 2),
-                    'hra': round(float(hra), 2),
-                    'pf': round(float(pf), 2),
-                    'professional_tax': professional_tax,
-                    'insurance': insurance,
-                    'esi': esi,
-                    'absent_days': absent_days,
-                    'overtime_amount': round(overtime_amount, 2)
-                },
-                'generated_by': request.user
-            }
-        )
+        try:
+            run = PayrollRunService.start(
+                year,
+                month,
+                user=request.user,
+                insurance=insurance,
+                esi=esi,
+            )
+        except ValueError as e:
+            return Response({"detail": str(e)}, status=status.HTTP_409_CONFLICT)
+
+        try:
+            PayrollRunService.execute(run)
+        except Exception:
+            # Failure details are recorded on the run itself
+            return Response(
+                serializers.PayrollRunSerializer(run).data,
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
 
         return Response(
-            serializers.PayslipAdminSerializer(payslip).data,
-            status=201
+            serializers.PayrollRunSerializer(run).data,
+            status=status.HTTP_201_CREATED
         )
 
 
+class HRPayrollRunDetailAPIView(generics.RetrieveAPIView):
+    permission_classes = [IsAuthenticated, IsHR]
+    serializer_class = serializers.PayrollRunSerializer
+    queryset = PayrollRun.objects.all()
+
+
 class HRLeaveListAPIView(generics.ListAPIView):
     permission_classes = [IsAuthenticated, IsHR]
     serializer_class = serializers.LeaveRequestAdminSerializer
@@ -521,19 +698,16 @@ class HRLeaveActionAPIView(APIView):
 
         try:
             if action == 'approve':
-                lr.apply_hr_approval(
-                    request.user,
-                    approve=True,
-                    remarks=remarks
-                )
-
-                try:
-                    lb = LeaveBalance.objects.get(
-                        profile=lr.profile, leave_type=lr.leave_type)
-                    lb.used += lr.days
-                    lb.save()
-                except LeaveBalance.DoesNotExist:
-                    pass
+                with transaction.atomic():
+                    # lock the request so concurrent approvals serialize and
+                    # the loser fails the status check instead of double-charging
+                    lr = LeaveRequest.objects.select_for_update().get(id=lr.id)
+                    lr.apply_hr_approval(
+                        request.user,
+                        approve=True,
+                        remarks=remarks
+                    )
+                    LeaveLedgerService.debit_leave(lr, created_by=request.user)
 
                 Notification.objects.create(
                     to_user=lr.profile.user,
@@ -579,6 +753,7 @@ class HRLeaveActionAPIView(APIView):
 class HRLeaveDashboardStatsAPIView(APIView):
     permission_classes = [IsAuthenticated, IsHR]
 
+    @cache_response("hr_leave_dashboard_stats", groups=(GROUP_ATTENDANCE, GROUP_LEAVE, GROUP_EMPLOYEES))
     def get(self, request):
         today = timezone.localdate()
 
@@ -593,10 +768,8 @@ class HRLeaveDashboardStatsAPIView(APIView):
 
         # 3. On Leave Employees (Approved leaves active today)
         # Note: This is used to calculate absent employees
-        on_leave_employees = LeaveRequest.objects.filter(
-            start_date__lte=today,
-            end_date__gte=today,
-            status__in=['hr_approved', 'tl_approved']
+        on_leave_employees = LeaveCalendarService.out_on(
+            today, statuses=['hr_approved', 'tl_approved']
         ).count()
 
         # 4. Absent Employees (Total - Present - On Leave)
@@ -614,3 +787,40 @@ class HRLeaveDashboardStatsAPIView(APIView):
             "absent_today": absent_employees,
             "leave_requests": pending_leaves
         })
+
+
+class HRLeaveCalendarAPIView(APIView):
+    """
+    Who is out, day by day.
+    Range: month | year | from & to (default: current month, at most 366 days).
+    Filters: department, status (comma separated, default hr_approved).
+    """
+    permission_classes = [IsAuthenticated, IsHR]
+
+    MAX_DAYS = 366
+
+    def get(self, request):
+        params = request.query_params
+        try:
+            start, end = _export_date_range(params)
+        except (ValueError, KeyError) as e:
+            return Response({"detail": str(e) or "Invalid date filter."}, status=400)
+
+        if start is None:
+            today = timezone.localdate()
+            start = today.replace(day=1)
+            end = today.replace(day=calendar.monthrange(today.year, today.month)[1])
+        if (end - start).days >= self.MAX_DAYS:
+            return Response(
+                {"detail": f"Range must not exceed {self.MAX_DAYS} days."}, status=400)
+
+        statuses = LeaveCalendarService.APPROVED_STATUSES
+        if params.get("status"):
+            statuses = [s.strip() for s in params["status"].split(",") if s.strip()]
+
+        return Response({
+            "from": start,
+            "to": end,
+            "days": LeaveCalendarService.calendar(
+                start, end, department=params.get("department"), statuses=statuses),
+        })
@@ -0,0 +1,203 @@
+import calendar
+from collections import defaultdict
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Count, F, Q, Sum
+
+from emp.models import Attendance, AttendanceMonthlySummary, EmployeeProfile, LeaveDay
+from emp.services import AttendanceRollupService, LeaveCalendarService
+from HRM.cache import group_version, GROUP_EMPLOYEES
+
+
+User = get_user_model()
+
+
+class AttendanceTrendService:
+    """
+    Monthly attendance percentage (present + 0.5 * halfday over possible
+    employee-days) for one or more years, overall and per department.
+
+    Every requested year is computed from the monthly rollup in a single
+    grouped query. Results are cached per year, keyed on the rollup version
+    so any attendance change for that year invalidates them.
+    """
+
+    CACHE_TIMEOUT = 60 * 60
+    MAX_YEARS = 10
+    UNASSIGNED = "Unassigned"
+
+    @staticmethod
+    def cache_key(year):
+        # headcounts come from the employee tables, so their version counts too
+        version = AttendanceRollupService.get_version(year)
+        return f"attendance_trend:{year}:{version}:{group_version(GROUP_EMPLOYEES)}"
+
+    @staticmethod
+    def _percentage(effective, headcount, year, month):
+        total_possible = headcount * calendar.monthrange(year, month)[1]
+        return round(
+            (effective / total_possible) * 100, 2
+        ) if total_possible > 0 else 0
+
+    @staticmethod
+    def _months(values, headcount, year):
+        return {
+            calendar.month_abbr[month]: AttendanceTrendService._percentage(
+                values.get(month, 0), headcount, year, month)
+            for month in range(1, 13)
+        }
+
+    @staticmethod
+    def _compute(years):
+        total_employees = User.objects.count()
+        dept_headcount = {
+            row["department"]: row["total"]
+            for row in EmployeeProfile.objects.values("department").annotate(
+                total=Count("id")).order_by()
+        }
+
+        rows = AttendanceMonthlySummary.objects.filter(
+            year__in=years
+        ).values(
+            "year",
+            "month",
+            department=F("user__employeeprofile__department"),
+        ).annotate(
+            present=Sum("days_present"),
+            halfdays=Sum("halfdays"),
+        ).order_by()
+
+        overall = {year: defaultdict(float) for year in years}
+        by_dept = {year: defaultdict(lambda: defaultdict(float))
+                   for year in years}
+        for row in rows:
+            effective = row["present"] + 0.5 * row["halfdays"]
+            overall[row["year"]][row["month"]] += effective
+            by_dept[row["year"]][row["department"]][row["month"]] += effective
+
+        results = {}
+        for year in years:
+            departments = set(dept_headcount) | set(by_dept[year])
+            results[year] = {
+                "attendance_trend_percentage": AttendanceTrendService._months(
+                    overall[year], total_employees, year),
+                "departments": {
+                    dept or AttendanceTrendService.UNASSIGNED:
+                        AttendanceTrendService._months(
+                            by_dept[year].get(dept, {}),
+                            dept_headcount.get(dept, 0),
+                            year
+                        )
+                    for dept in sorted(departments, key=lambda d: d or "")
+                },
+            }
+        return results
+
+    @staticmethod
+    def get_trend(years):
+        """
+        Returns {year: {"attendance_trend_percentage": {...},
+                        "departments": {dept: {...}}}}.
+        """
+        keys = {year: AttendanceTrendService.cache_key(year) for year in years}
+        cached = cache.get_many(keys.values())
+
+        results = {}
+        missing = []
+        for year, key in keys.items():
+            if key in cached:
+                results[year] = cached[key]
+            else:
+                missing.append(year)
+
+        if missing:
+            computed = AttendanceTrendService._compute(missing)
+            cache.set_many(
+                {keys[year]: computed[year] for year in missing},
+                AttendanceTrendService.CACHE_TIMEOUT
+            )
+            results.update(computed)
+
+        return results
+
+
+class DepartmentPresenceService:
+    """
+    Per-department headcount, present, half-day and on-leave counts for a
+    date or a date range, computed with a fixed number of grouped queries
+    regardless of how many departments or days are requested.
+    """
+
+    MAX_DAYS = 31
+
+    @staticmethod
+    def report(start, end):
+        """
+        Returns (headcount, days) where headcount is {department: total} and
+        days is {date: {department: {"present", "halfday", "on_leave"}}}.
+        """
+        headcount = {
+            row["department"]: row["total"]
+            for row in EmployeeProfile.objects.values("department").annotate(
+                total=Count("id")).order_by()
+        }
+
+        days = {
+            start + timedelta(days=offset): defaultdict(
+                lambda: {"present": 0, "halfday": 0, "on_leave": 0})
+            for offset in range((end - start).days + 1)
+        }
+
+        attendance = Attendance.objects.filter(
+            date__range=(start, end)
+        ).values(
+            "date",
+            department=F("user__employeeprofile__department"),
+        ).annotate(
+            present=Count("id", filter=Q(status="present")),
+            halfday=Count("id", filter=Q(status="halfday")),
+        ).order_by()
+
+        for row in attendance:
+            counts = days[row["date"]][row["department"]]
+            counts["present"] = row["present"]
+            counts["halfday"] = row["halfday"]
+
+        on_leave = LeaveDay.objects.filter(
+            status__in=LeaveCalendarService.APPROVED_STATUSES,
+            date__range=(start, end),
+        ).values("date", "department").annotate(
+            total=Count("profile", distinct=True)
+        ).order_by()
+
+        for row in on_leave:
+            days[row["date"]][row["department"]]["on_leave"] = row["total"]
+
+        return headcount, days
+
+    @staticmethod
+    def summarize(headcount, date, departments):
+        names = sorted(set(headcount) | set(departments),
+                       key=lambda d: (d is None, d or ""))
+        rows = []
+        for name in names:
+            counts = departments.get(name) or {
+                "present": 0, "halfday": 0, "on_leave": 0}
+            rows.append({
+                "department": name,
+                "present": counts["present"],
+                "total": headcount.get(name, 0),
+                "halfday": counts["halfday"],
+                "on_leave": counts["on_leave"],
+            })
+
+        return {
+            "date": date,
+            "total_present": sum(row["present"] for row in rows),
+            "total_halfday": sum(row["halfday"] for row in rows),
+            "total_on_leave": sum(row["on_leave"] for row in rows),
+            "total_employees": sum(headcount.values()),
+            "departments": rows,
+        }
@@ -55,5 +55,7 @@ urlpatterns = [
 
     path("admin/risk-alerts/", views.RiskAlertsAPIView.as_view(),name="risk-alerts"),
 
+    path("admin/cache-stats/", views.CacheStatsAPIView.as_view(), name="admin-cache-stats"),
+
 ]
 
@@ -1,5 +1,6 @@
 from datetime import date, time
 import calendar
+import os
 
 from django.utils import timezone
 from django.utils.timezone import now
@@ -11,7 +12,10 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from management.models import LongLeave
+from management.services import AttendanceTrendService, DepartmentPresenceService
+from emp.services import LeaveCalendarService
 from emp.models import LeaveRequest, Attendance, EmployeeProfile
+from HRM.cache import cache_response, stats as cache_stats, GROUP_EMPLOYEES
 
 
 User = get_user_model()
@@ -52,11 +56,8 @@ class ADMINOnLeaveAPIView(APIView):
 
         today = date.today()
 
-        leaves = LeaveRequest.objects.filter(
-            status="hr_approved",
-            start_date__lte=today,
-            end_date__gte=today
-        ).select_related("profile__user")
+        leaves = LeaveCalendarService.out_on(today).select_related(
+            "leave", "profile__user")
 
         return Response({
             "current_total": leaves.count(),
@@ -64,7 +65,7 @@ class ADMINOnLeaveAPIView(APIView):
                 {
                     "employee_name": leave.profile.user.get_full_name(),
                     "leave_type": leave.leave_type,
-                    "days": leave.days
+                    "days": leave.leave.days
                 }
                 for leave in leaves
             ]
@@ -239,17 +240,11 @@ class ADMINEmployeesOnLeaveDeptWiseAPIView(APIView):
 
         dept_counts = {dept: 0 for dept in departments}
 
-        leave_profiles = LeaveRequest.objects.filter(
-            status="approved",
-            start_date__lte=today,
-            end_date__gte=today
-        ).values_list("profile", flat=True)
-
         dept_breakdown = (
-            EmployeeProfile.objects
-            .filter(id__in=leave_profiles)
+            LeaveCalendarService.out_on(today)
             .values("department")
-            .annotate(total=Count("id"))
+            .annotate(total=Count("profile", distinct=True))
+            .order_by()
         )
 
         for item in dept_breakdown:
@@ -273,41 +268,58 @@ class ADMINAttendanceTrendAPIView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-
-        current_year = now().year
-        total_employees = User.objects.count()
-
-        monthly_data = {}
-
-        for month in range(1, 13):
-
-            days = calendar.monthrange(current_year, month)[1]
-            total_possible = total_employees * days
-
-            attendance = Attendance.objects.filter(
-                date__year=current_year,
-                date__month=month
+        """
+        ?year=2025                       single year (default: current year)
+        ?from_year=2023&to_year=2025     year range
+        ?by_department=true              add per-department breakdown
+        """
+        params = request.query_params
+        by_department = params.get("by_department", "").lower() in (
+            "1", "true", "yes")
+
+        try:
+            if params.get("from_year") or params.get("to_year"):
+                from_year = int(params.get("from_year") or params["to_year"])
+                to_year = int(params.get("to_year") or from_year)
+                year_range = True
+            else:
+                from_year = to_year = int(params.get("year", now().year))
+                year_range = False
+        except ValueError:
+            return Response({"detail": "Invalid year."}, status=400)
+
+        if not (1 <= from_year <= 9999 and 1 <= to_year <= 9999):
+            return Response({"detail": "Year must be between 1 and 9999."}, status=400)
+        if from_year > to_year:
+            return Response(
+                {"detail": "from_year must not be after to_year."}, status=400)
+        if to_year - from_year >= AttendanceTrendService.MAX_YEARS:
+            return Response(
+                {"detail": f"At most {AttendanceTrendService.MAX_YEARS} years per request."},
+                status=400
             )
 
-            effective_present = attendance.aggregate(
-                total=Sum(
-                    Case(
-                        When(status="present", then=Value(1)),
-                        When(status="halfday", then=Value(0.5)),
-                        default=Value(0),
-                        output_field=FloatField()
-                    )
-                )
-            )["total"] or 0
+        trend = AttendanceTrendService.get_trend(
+            list(range(from_year, to_year + 1)))
 
-            percentage = round(
-                (effective_present / total_possible) * 100, 2
-            ) if total_possible > 0 else 0
+        def _payload(data):
+            payload = {
+                "attendance_trend_percentage": data["attendance_trend_percentage"]
+            }
+            if by_department:
+                payload["departments"] = data["departments"]
+            return payload
 
-            monthly_data[calendar.month_abbr[month]] = percentage
+        if not year_range:
+            return Response(_payload(trend[from_year]))
 
         return Response({
-            "attendance_trend_percentage": monthly_data
+            "from_year": from_year,
+            "to_year": to_year,
+            "years": {
+                str(year): _payload(trend[year])
+                for year in range(from_year, to_year + 1)
+            }
         })
 
 
@@ -317,44 +329,46 @@ class ADMINAttendanceTrendAPIView(APIView):
 
 @api_view(["GET"])
 def total_present_api(request):
+    """
+    ?date=YYYY-MM-DD              single day (default: today)
+    ?from=YYYY-MM-DD&to=...       date range, one entry per day
+    """
+    params = request.query_params
+
+    try:
+        if params.get("from") or params.get("to"):
+            start = date.fromisoformat(params.get("from") or params["to"])
+            end = date.fromisoformat(params.get("to") or params["from"])
+            date_range = True
+        else:
+            start = end = date.fromisoformat(
+                params["date"]) if params.get("date") else now().date()
+            date_range = False
+    except ValueError:
+        return Response({"detail": "Invalid date. Use YYYY-MM-DD."}, status=400)
+
+    if start > end:
+        return Response({"detail": "from must not be after to."}, status=400)
+    if (end - start).days >= DepartmentPresenceService.MAX_DAYS:
+        return Response(
+            {"detail": f"At most {DepartmentPresenceService.MAX_DAYS} days per request."},
+            status=400
+        )
 
-    today = now().date()
-
-    total_present = Attendance.objects.filter(
-        date=today,
-        status="present"
-    ).count()
-
-    total_employees = EmployeeProfile.objects.count()
-
-    departments = EmployeeProfile.objects.values("department").distinct()
-
-    department_list = []
-
-    for dept in departments:
-
-        dept_name = dept["department"]
-
-        total = EmployeeProfile.objects.filter(
-            department=dept_name
-        ).count()
-
-        present = Attendance.objects.filter(
-            user__employeeprofile__department=dept_name,
-            date=today,
-            status="present"
-        ).count()
+    headcount, days = DepartmentPresenceService.report(start, end)
 
-        department_list.append({
-            "department": dept_name,
-            "present": present,
-            "total": total
-        })
+    if not date_range:
+        return Response(
+            DepartmentPresenceService.summarize(headcount, start, days[start]))
 
     return Response({
-        "total_present": total_present,
-        "total_employees": total_employees,
-        "departments": department_list
+        "from": start,
+        "to": end,
+        "total_employees": sum(headcount.values()),
+        "days": [
+            DepartmentPresenceService.summarize(headcount, day, departments)
+            for day, departments in sorted(days.items())
+        ]
     })
 
 
@@ -670,6 +684,7 @@ class adminAttritionDashboardAPIView(APIView):
 
     permission_classes = [IsAuthenticated, Ismanagement]
 
+    @cache_response("admin_attrition_dashboard", groups=(GROUP_EMPLOYEES,))
     def get(self, request):
 
         # total employees
@@ -866,4 +881,17 @@ class RiskAlertsAPIView(APIView):
 
         serializer = RiskAlertSerializer(alerts, many=True)
 
-        return Response(serializer.data)
\ No newline at end of file
+        return Response(serializer.data)
+
+
+class CacheStatsAPIView(APIView):
+    """
+    Hit/miss counters of the response cache for the worker serving the request.
+    """
+    permission_classes = [IsAuthenticated, Ismanagement]
+
+    def get(self, request):
+        return Response({
+            "pid": os.getpid(),
+            "stats": cache_stats.snapshot(),
+        })
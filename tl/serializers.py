@@ -3,11 +3,12 @@ from .models import TLAnnouncement
 from rest_framework import serializers
 from emp.models import EmployeeProfile
 from hr.serializers import UserBasicSerializer
+from emp.fieldsets import SparseFieldsetSerializerMixin
 from django.utils import timezone
 from datetime import timedelta, datetime
 
 
-class TeamMemberSerializer(serializers.ModelSerializer):
+class TeamMemberSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     user = UserBasicSerializer(read_only=True)
 
     class Meta:
@@ -0,0 +1,131 @@
+from datetime import timedelta
+
+from emp.models import Attendance, CalendarEvent, EmployeeProfile, LeaveRequest
+from emp.services import LeaveCalendarService
+
+
+class TeamAvailabilityService:
+    """
+    Member x day availability grid for a team or department.
+
+    Uses four queries (members, attendance, approved leave intervals,
+    holidays) whatever the team size or range; leave coverage is resolved
+    per member by sweeping their intervals sorted by start date.
+    """
+
+    MAX_DAYS = 92
+
+    PRESENT = "present"
+    HALFDAY = "halfday"
+    WORKING = "working"
+    ABSENT = "absent"
+    ON_LEAVE = "on_leave"
+    HOLIDAY = "holiday"
+
+    @staticmethod
+    def _covered_days(intervals, days):
+        """
+        Days of `days` (sorted) that fall inside any of `intervals`, which
+        must be sorted by start. Overlapping intervals are merged on the fly.
+        """
+        covered = set()
+        i = 0
+        active_end = None
+        for day in days:
+            while i < len(intervals) and intervals[i][0] <= day:
+                if active_end is None or intervals[i][1] > active_end:
+                    active_end = intervals[i][1]
+                i += 1
+            if active_end is not None and day <= active_end:
+                covered.add(day)
+        return covered
+
+    @staticmethod
+    def _cell(day, attendance, on_leave, holidays):
+        if day in holidays:
+            return TeamAvailabilityService.HOLIDAY
+        if attendance in (TeamAvailabilityService.PRESENT,
+                          TeamAvailabilityService.HALFDAY,
+                          TeamAvailabilityService.WORKING):
+            return attendance
+        if day in on_leave:
+            return TeamAvailabilityService.ON_LEAVE
+        return attendance
+
+    @staticmethod
+    def matrix(members, start, end):
+        """
+        `members` is an EmployeeProfile queryset. Returns
+        {"days", "holidays", "members": [{..., "cells"}], "summary"} where
+        each member's cells line up with "days" and hold present, halfday,
+        working, absent, on_leave, holiday or None (nothing recorded).
+        """
+        days = [start + timedelta(days=offset)
+                for offset in range((end - start).days + 1)]
+
+        people = list(members.filter(is_active=True).values(
+            "id", "user_id", "emp_id", "first_name", "last_name", "department"
+        ).order_by("first_name", "last_name", "id"))
+        user_ids = [person["user_id"] for person in people]
+        profile_ids = [person["id"] for person in people]
+
+        attendance = {}
+        for user_id, day, status in Attendance.objects.filter(
+            user_id__in=user_ids, date__range=(start, end)
+        ).values_list("user_id", "date", "status"):
+            attendance[(user_id, day)] = status
+
+        intervals = {}
+        for profile_id, leave_start, leave_end in LeaveRequest.objects.filter(
+            profile_id__in=profile_ids,
+            status__in=LeaveCalendarService.APPROVED_STATUSES,
+            start_date__lte=end,
+            end_date__gte=start,
+        ).order_by("start_date").values_list("profile_id", "start_date", "end_date"):
+            intervals.setdefault(profile_id, []).append((leave_start, leave_end))
+
+        holidays = dict(CalendarEvent.objects.filter(
+            event_type="holiday", date__range=(start, end)
+        ).order_by("date").values_list("date", "title"))
+
+        summary = {
+            day: {"present": 0, "halfday": 0, "absent": 0, "on_leave": 0}
+            for day in days
+        }
+        rows = []
+        for person in people:
+            on_leave = TeamAvailabilityService._covered_days(
+                intervals.get(person["id"], ()), days)
+            cells = []
+            for day in days:
+                cell = TeamAvailabilityService._cell(
+                    day, attendance.get((person["user_id"], day)), on_leave, holidays)
+                if cell == TeamAvailabilityService.WORKING:
+                    summary[day]["present"] += 1
+                elif cell in summary[day]:
+                    summary[day][cell] += 1
+                cells.append(cell)
+
+            rows.append({
+                "emp_id": person["emp_id"],
+                "name": f"{person['first_name']} {person['last_name'] or ''}".strip(),
+                "department": person["department"],
+                "cells": cells,
+            })
+
+        return {
+            "days": days,
+            "holidays": [
+                {"date": day, "title": title} for day, title in holidays.items()
+            ],
+            "members": rows,
+            "summary": [summary[day] for day in days],
+        }
+
+    @staticmethod
+    def team(tl_user_id):
+        return EmployeeProfile.objects.filter(team_lead_id=tl_user_id)
+
+    @staticmethod
+    def department(name):
+        return EmployeeProfile.objects.filter(department__iexact=name)
@@ -12,6 +12,9 @@ urlpatterns = [
     path("team/dashboard/", views.TLDashboardAPIView.as_view(),
          name="team-dashboard"),
 
+    path("team/availability/", views.TeamAvailabilityAPIView.as_view(),
+         name="team-availability"),
+
     path("tl/list/", views.TeamLeadListAPIView.as_view(), name="tl-list"),
 
     path("leave/pending/", views.TLPendingLeaveAPIView.as_view(),
@@ -6,13 +6,17 @@ from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
 from django.db.models import Count, Sum
 from django.utils import timezone
+from datetime import date, timedelta
 from django.contrib.auth import get_user_model
-from emp.models import EmployeeProfile, LeaveRequest, Attendance, CalendarEvent, Notification
+from emp.models import EmployeeProfile, LeaveRequest, Attendance, AttendanceMonthlySummary, CalendarEvent, Notification
 from .models import TLAnnouncement
+from emp import notifications, search
+from emp.fieldsets import SparseFieldsetViewMixin
 from emp.permissions import IsHROrManagement
 from emp.serializers import LeaveRequestSerializer, AttendanceReadSerializer, CalendarEventSerializer
 from .serializers import TeamMemberSerializer, TLAnnouncementSerializer
 from .permissions import IsTL
+from .services import TeamAvailabilityService
 from rest_framework.decorators import api_view, authentication_classes, permission_classes
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from django.db import IntegrityError
@@ -22,7 +26,7 @@ from django.db import transaction
 User = get_user_model()
 
 
-class TLTeamMembersAPIView(generics.ListAPIView):
+class TLTeamMembersAPIView(SparseFieldsetViewMixin, generics.ListAPIView):
     permission_classes = [IsAuthenticated, IsTL]
     serializer_class = TeamMemberSerializer
 
@@ -39,7 +43,7 @@ class TLPendingLeaveAPIView(generics.ListAPIView):
         return LeaveRequest.objects.filter(
             tl=self.request.user,
             status="applied"
-        ).select_related("profile")
+        ).select_related("profile__user", "profile__team_lead")
 
 
 class TLApproveRejectLeaveAPIView(APIView):
@@ -167,15 +171,18 @@ class TLDashboardAPIView(APIView):
 
         today = timezone.localdate()
         y, m = today.year, today.month
-        attendance_qs = Attendance.objects.filter(
+        monthly = AttendanceMonthlySummary.objects.filter(
             user__in=team_members.values_list("user", flat=True),
-            date__year=y,
-            date__month=m
+            year=y,
+            month=m
+        ).aggregate(
+            present=Sum("days_present", default=0),
+            halfdays=Sum("halfdays", default=0),
+            seconds=Sum("total_seconds", default=0),
         )
 
-        total_present = attendance_qs.count()
-        total_seconds = attendance_qs.aggregate(
-            total=Sum("duration_seconds"))["total"] or 0
+        total_present = monthly["present"] + monthly["halfdays"]
+        total_seconds = monthly["seconds"]
 
         meetings = CalendarEvent.objects.filter(
             event_type="meeting",
@@ -196,6 +203,51 @@ class TLDashboardAPIView(APIView):
         })
 
 
+class TeamAvailabilityAPIView(APIView):
+    """
+    Member x day availability grid.
+    TLs see their own team; HR/management pass ?team_lead=<user id> or
+    ?department=. Range: ?from=&to= (YYYY-MM-DD, default the next 14 days,
+    at most TeamAvailabilityService.MAX_DAYS).
+    """
+    permission_classes = [IsAuthenticated, IsTL | IsHROrManagement]
+
+    def get(self, request):
+        params = request.query_params
+        try:
+            start = date.fromisoformat(params["from"]) if params.get(
+                "from") else timezone.localdate()
+            end = date.fromisoformat(params["to"]) if params.get(
+                "to") else start + timedelta(days=13)
+        except ValueError:
+            return Response({"detail": "from/to must be YYYY-MM-DD."}, status=400)
+
+        if start > end:
+            return Response({"detail": "from must not be after to."}, status=400)
+        if (end - start).days >= TeamAvailabilityService.MAX_DAYS:
+            return Response(
+                {"detail": f"Range must not exceed {TeamAvailabilityService.MAX_DAYS} days."},
+                status=400)
+
+        if request.user.role == LoginUser.ROLE_TL:
+            members = TeamAvailabilityService.team(request.user.id)
+        elif params.get("team_lead"):
+            if not params["team_lead"].isdigit():
+                return Response({"detail": "team_lead must be a user id."}, status=400)
+            members = TeamAvailabilityService.team(params["team_lead"])
+        elif params.get("department"):
+            members = TeamAvailabilityService.department(params["department"])
+        else:
+            return Response(
+                {"detail": "team_lead or department is required."}, status=400)
+
+        return Response({
+            "from": start,
+            "to": end,
+            **TeamAvailabilityService.matrix(members, start, end),
+        })
+
+
 class TeamLeadListAPIView(APIView):
     permission_classes = [IsHROrManagement]
 
@@ -212,6 +264,9 @@ class TeamLeadListAPIView(APIView):
             qs = qs.filter(employeeprofile__department__iexact=dept)
 
         profiles = EmployeeProfile.objects.filter(user__in=qs)
+        q = request.query_params.get('q')
+        if q:
+            profiles = search.search(q, profiles)
         ser = TeamMemberSerializer(profiles, many=True)
         return Response(ser.data)
 
@@ -297,20 +352,12 @@ def tl_create_announcement(request):
                 }
             )
 
-        employees = EmployeeProfile.objects.filter(
-            team_lead=request.user,
-            is_active=True
-        ).select_related('user')
-
-        Notification.objects.bulk_create([
-            Notification(
-                to_user=emp.user,
-                title=announcement.title,
-                body=announcement.description,
-                notif_type="announcement"
-            )
-            for emp in employees
-        ])
+        notifications.dispatch(
+            notifications.team(request.user.id),
+            title=announcement.title,
+            body=announcement.description,
+            notif_type="announcement"
+        )
 
         response_serializer = TLAnnouncementSerializer(announcement)
 